@@ -6,16 +6,18 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 
+from app.read_routing import RoutingSession, init_read_engine
+
 # Instantiate extensions at module scope
-db = SQLAlchemy()  # Database ORM
+db = SQLAlchemy(session_options={'class_': RoutingSession})  # Database ORM
 login = LoginManager()  # Login/session manager
 
 
-def create_app():
+def create_app(test_config=None):
     """
     Create and configure the Flask application.
 
-    - Loads configuration from config.Config
+    - Loads configuration from config.Config, then any `test_config` overrides
     - Initializes extensions (SQLAlchemy, LoginManager)
     - Registers shell context so you can `flask shell` and have db & models pre-imported
     - Imports views so that routes are registered
@@ -24,11 +26,17 @@ def create_app():
 
     # Load settings from config.py
     app.config.from_object('config.Config')  # type: ignore
+    if test_config:
+        app.config.update(test_config)
 
     # Initialize Flask extensions with the app
     db.init_app(app)
     login.init_app(app)
 
+    # Read-only engine for dashboards and history (SQLite file or replica)
+    with app.app_context():
+        init_read_engine(app, db.engine)
+
     # Redirect unauthorized users to the login page
     login.login_view = 'login'
 
@@ -56,8 +64,27 @@ def create_app():
 
     # Import and register our view‐blueprint
     from app.views import bp as main_bp  # blueprint defined below
-    from app import observers
     app.register_blueprint(main_bp)
 
+    # Sensor status observers (idempotent, create_app runs once per test)
+    from app.observers import register_observers
+    register_observers()
+
+    # Session events that keep the in-memory sensor registry current
+    from app.sensor_registry import register_registry_events
+    register_registry_events()
+
+    # `flask` CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+
+    # Periodic background jobs (staleness sweep, ...)
+    from app.scheduler import init_scheduler
+    init_scheduler(app)
+
+    # Status-change transport (in-process, or outbox table shared by workers)
+    from app.event_bus import init_event_bus
+    init_event_bus(app)
+
     return app
 
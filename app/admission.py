@@ -0,0 +1,156 @@
+"""
+Admission control for feedback submissions.
+
+Before anything touches the database, each submission is checked against a
+token bucket for its user and one for its sensor, then against the recent
+submissions of that user for that sensor. A repeat within
+FEEDBACK_DEDUP_SECONDS becomes an update of the earlier row instead of a
+new one. All state is in-process and bounded: idle buckets and expired
+entries are dropped from the front of insertion-ordered dicts.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Hashable, Optional, Tuple
+
+from flask import current_app
+
+ACCEPT, MERGE, REJECT = 'accept', 'merge', 'reject'
+
+
+class TokenBucketLimiter:
+    """
+    One token bucket per key: up to `burst` requests at once, refilled at
+    `rate` tokens per second.
+    """
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: 'OrderedDict[Hashable, Tuple[float, float]]' = OrderedDict()
+
+    def allow(self, key: Hashable, now: float) -> bool:
+        tokens, last = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        self._buckets[key] = (tokens, now)
+        self._evict_idle(now)
+        return allowed
+
+    def _evict_idle(self, now: float):
+        # A bucket idle long enough to refill is the same as no bucket
+        refill = self.burst / self.rate if self.rate > 0 else float('inf')
+        while self._buckets:
+            key, (_, last) = next(iter(self._buckets.items()))
+            if now - last < refill:
+                break
+            del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+@dataclass
+class Admission:
+    action: str                          # ACCEPT, MERGE or REJECT
+    feedback_id: Optional[int] = None    # row to update when merging
+    previous_rating: Optional[str] = None
+    previous_at: Optional[datetime] = None
+    reason: Optional[str] = None         # 'user' or 'sensor' when rejected
+
+
+class FeedbackAdmission:
+    """
+    Per-process limiter and deduplicator for feedback submissions.
+    """
+    def __init__(self, user_rate: float, user_burst: float, sensor_rate: float,
+                 sensor_burst: float, dedup_seconds: float, clock=time.monotonic):
+        self.users = TokenBucketLimiter(user_rate, user_burst)
+        self.sensors = TokenBucketLimiter(sensor_rate, sensor_burst)
+        self.dedup_seconds = dedup_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (user_id, sensor_id) -> (seen at, feedback id, rating, submitted_at)
+        self._recent: 'OrderedDict[Tuple[int, int], tuple]' = OrderedDict()
+        self.counters: Dict[str, int] = dict.fromkeys(
+            ('accepted', 'merged', 'rejected_user', 'rejected_sensor'), 0)
+
+    def admit(self, user_id: int, sensor_id: int) -> Admission:
+        """
+        Decide what to do with a submission. Merges still spend a user token
+        (so one user cannot rewrite a row in a loop) but not a sensor token.
+        """
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            if not self.users.allow(user_id, now):
+                self.counters['rejected_user'] += 1
+                return Admission(REJECT, reason='user')
+            recent = self._recent.get((user_id, sensor_id))
+            if recent is not None and now - recent[0] < self.dedup_seconds:
+                self.counters['merged'] += 1
+                _, feedback_id, rating, submitted_at = recent
+                return Admission(MERGE, feedback_id, rating, submitted_at)
+            if not self.sensors.allow(sensor_id, now):
+                self.counters['rejected_sensor'] += 1
+                return Admission(REJECT, reason='sensor')
+            self.counters['accepted'] += 1
+            return Admission(ACCEPT)
+
+    def remember(self, user_id: int, sensor_id: int, feedback_id: int, rating: str,
+                 submitted_at: datetime):
+        """
+        Record the row a submission wrote, once it has been committed. The
+        dedup window runs from the first submission, so a user can rate the
+        same sensor as a new row once per window.
+        """
+        with self._lock:
+            key = (user_id, sensor_id)
+            # Assigning to an existing key keeps its place, so the dict stays
+            # ordered by seen_at and _expire can stop at the first live entry
+            seen_at = self._recent.get(key, (self._clock(),))[0]
+            self._recent[key] = (seen_at, feedback_id, rating, submitted_at)
+
+    def forget(self, feedback_id: int = None):
+        """
+        Drop dedup entries (for one feedback row, or all of them).
+        """
+        with self._lock:
+            if feedback_id is None:
+                self._recent.clear()
+                return
+            for key in [k for k, v in self._recent.items() if v[1] == feedback_id]:
+                del self._recent[key]
+
+    def _expire(self, now: float):
+        while self._recent:
+            key, entry = next(iter(self._recent.items()))
+            if now - entry[0] < self.dedup_seconds:
+                break
+            del self._recent[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters, tracked_users=len(self.users),
+                        tracked_sensors=len(self.sensors), dedup_entries=len(self._recent))
+
+
+def get_feedback_admission() -> FeedbackAdmission:
+    """
+    Return the app's feedback admission controller, creating it on first use.
+    """
+    admission = current_app.extensions.get('feedback_admission')
+    if admission is None:
+        config = current_app.config
+        admission = current_app.extensions['feedback_admission'] = FeedbackAdmission(
+            user_rate=config.get('FEEDBACK_USER_PER_MINUTE', 2) / 60.0,
+            user_burst=config.get('FEEDBACK_USER_BURST', 5),
+            sensor_rate=config.get('FEEDBACK_SENSOR_PER_MINUTE', 120) / 60.0,
+            sensor_burst=config.get('FEEDBACK_SENSOR_BURST', 300),
+            dedup_seconds=config.get('FEEDBACK_DEDUP_SECONDS', 600),
+        )
+    return admission
@@ -0,0 +1,145 @@
+"""
+Suppression of noisy sensor status alerts.
+
+Alerting observers (maintenance, calibration) see status changes only after
+they have settled. Every change is held for ALERT_MIN_DWELL_SECONDS; a
+sensor that changes back within that time produces no alert at all. A
+sensor with ALERT_FLAP_THRESHOLD changes inside ALERT_FLAP_WINDOW_SECONDS
+is flapping: it is reported once, and its alerts are held until it has been
+quiet for a whole window. Settled changes are released together by a
+periodic flush, so the observers get one grouped digest per flush.
+
+The state lives in one process. With the outbox event bus, SuppressedAlerts
+is a deployment-wide observer, so only the worker holding the shared cursor
+feeds this suppressor and it sees every worker's changes exactly once. The
+other workers' suppressors stay empty. A worker that takes the cursor over
+starts with fresh state: changes the previous holder was still holding back
+are not alerted.
+
+Per-sensor state is a fixed-size record, and held sensors sit in two
+insertion-ordered dicts whose release times only grow, so each event costs
+O(1) and a flush only looks at the sensors it releases.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from flask import current_app
+
+from app.observer import StatusChange
+
+
+class _SensorAlertState:
+    __slots__ = ('delivered', 'current', 'changed_at', 'changes', 'flapping')
+
+    def __init__(self, status: str, threshold: int):
+        self.delivered = status                  # last status the observers were told about
+        self.current = status
+        self.changed_at = 0.0
+        self.changes = deque(maxlen=threshold)   # times of the latest changes
+        self.flapping = False
+
+
+@dataclass
+class AlertDigest:
+    changes: List[StatusChange] = field(default_factory=list)   # settled, net changes
+    flapping: List[int] = field(default_factory=list)           # sensors that started flapping
+
+
+class AlertSuppressor:
+    """
+    Per-sensor dwell time and flap detection in front of alerting observers.
+    """
+    def __init__(self, min_dwell: float = 120, flap_window: float = 900,
+                 flap_threshold: int = 4, clock=time.monotonic):
+        self.min_dwell = min_dwell
+        self.flap_window = flap_window
+        self.flap_threshold = flap_threshold
+        self.clock = clock
+        self.sensors: Dict[int, _SensorAlertState] = {}
+        self._dwelling: 'OrderedDict[int, _SensorAlertState]' = OrderedDict()
+        self._flapping: 'OrderedDict[int, _SensorAlertState]' = OrderedDict()
+        self._new_flapping: List[int] = []
+        self._lock = threading.Lock()
+        self.counters = {'changes': 0, 'delivered': 0, 'suppressed': 0, 'flaps': 0}
+
+    def observe(self, changes: List[StatusChange], now: float = None):
+        """
+        Record status changes; nothing is delivered until flush().
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            for sensor_id, old_status, new_status in changes:
+                self._observe(sensor_id, old_status, new_status, now)
+
+    def _observe(self, sensor_id: int, old_status: str, new_status: str, now: float):
+        state = self.sensors.get(sensor_id)
+        if state is None:
+            state = self.sensors[sensor_id] = _SensorAlertState(old_status, self.flap_threshold)
+        state.current = new_status
+        state.changed_at = now
+        state.changes.append(now)
+        self.counters['changes'] += 1
+
+        if not state.flapping and len(state.changes) == self.flap_threshold \
+                and now - state.changes[0] <= self.flap_window:
+            state.flapping = True
+            self._dwelling.pop(sensor_id, None)
+            self._new_flapping.append(sensor_id)
+            self.counters['flaps'] += 1
+
+        # Re-queue at the back: queues stay ordered by last change
+        queue = self._flapping if state.flapping else self._dwelling
+        queue.pop(sensor_id, None)
+        queue[sensor_id] = state
+
+    def flush(self, now: float = None) -> AlertDigest:
+        """
+        Release sensors that have settled. Each contributes one change from
+        the last delivered status to the current one, or nothing if it ended
+        where it started.
+        """
+        now = self.clock() if now is None else now
+        digest = AlertDigest()
+        with self._lock:
+            self._release(self._dwelling, self.min_dwell, now, digest)
+            self._release(self._flapping, self.flap_window, now, digest)
+            digest.flapping, self._new_flapping = self._new_flapping, []
+        return digest
+
+    def _release(self, queue, hold: float, now: float, digest: AlertDigest):
+        while queue:
+            sensor_id, state = next(iter(queue.items()))
+            if now - state.changed_at < hold:
+                break
+            del queue[sensor_id]
+            state.flapping = False
+            state.changes.clear()
+            if state.current == state.delivered:
+                self.counters['suppressed'] += 1
+            else:
+                digest.changes.append((sensor_id, state.delivered, state.current))
+                state.delivered = state.current
+                self.counters['delivered'] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters, dwelling=len(self._dwelling), flapping=len(self._flapping))
+
+
+def get_alert_suppressor() -> AlertSuppressor:
+    """
+    Return the app's alert suppressor, creating it on first use.
+    """
+    suppressor = current_app.extensions.get('alert_suppressor')
+    if suppressor is None:
+        config = current_app.config
+        suppressor = current_app.extensions['alert_suppressor'] = AlertSuppressor(
+            min_dwell=config.get('ALERT_MIN_DWELL_SECONDS', 120),
+            flap_window=config.get('ALERT_FLAP_WINDOW_SECONDS', 900),
+            flap_threshold=config.get('ALERT_FLAP_THRESHOLD', 4),
+        )
+    return suppressor
@@ -3,42 +3,18 @@ Dummy AI/ML module for analyzing sensors and feedback.
 """
 
 import random
-from typing import List
-from app.models import Sensor, Feedback
-from datetime import datetime, timedelta
+from typing import Dict, List
+from app.models import Sensor
+from datetime import datetime
 from dataclasses import dataclass
-
-@dataclass
-class OutdoorCondition:
-    timestamp: datetime
-    temp: float       # °C
-    humidity: float   # % RH
-    code: str         # e.g. 'Sunny', 'Cloudy'
+from app.weather import OutdoorCondition, OutdoorTimeline, DemoOutdoorProvider
+from app.suggestions import SuggestionEngine, ThermostatDecision
 
 def get_demo_outdoor_data():
     """
     Return a fixed list of hourly outdoor readings for demo purposes.
     """
-    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
-    # build 6 hours of past data plus current hour
-    demo = []
-    for hours_ago, (t, h, c) in enumerate([
-        (15.2, 55, 'Cloudy'),
-        (14.8, 57, 'Cloudy'),
-        (14.5, 60, 'Partly Cloudy'),
-        (14.0, 62, 'Sunny'),
-        (13.7, 65, 'Sunny'),
-        (13.5, 67, 'Fog'),
-    ]):
-        demo.append(
-            OutdoorCondition(
-                timestamp=now - timedelta(hours=5 - hours_ago),
-                temp=t,
-                humidity=h,
-                code=c
-            )
-        )
-    return demo
+    return DemoOutdoorProvider().fetch()
 
 def summarize_sensors(sensors: List[Sensor]) -> str:
     """
@@ -51,14 +27,15 @@ def summarize_sensors(sensors: List[Sensor]) -> str:
     return f"[Dummy AI] {base}"
 
 
-def summarize_feedback(feedbacks: List[Feedback]) -> str:
+def summarize_feedback(rating_counts: Dict[str, int]) -> str:
     """
-    Returns a simple summary of feedback rating distribution, tagged as a dummy AI result.
+    Returns a simple summary of feedback rating distribution (rating -> count),
+    tagged as a dummy AI result.
     """
-    total = len(feedbacks)
-    hot = sum(fb.rating == 'hot' for fb in feedbacks)
-    ok = sum(fb.rating == 'ok' for fb in feedbacks)
-    cold = sum(fb.rating == 'cold' for fb in feedbacks)
+    total = sum(rating_counts.values())
+    hot = rating_counts.get('hot', 0)
+    ok = rating_counts.get('ok', 0)
+    cold = rating_counts.get('cold', 0)
     base = f"Total feedbacks: {total}; Hot: {hot}; OK: {ok}; Cold: {cold}"
     return f"[Dummy AI] {base}"
 
@@ -82,36 +59,58 @@ def simulate_live_temperatures(sensors):
     return temps
 
 
-def suggest_thermostat_adjustments(sensors, feedbacks, live_temps):
+def suggest_thermostat_adjustments(sensors, live_temps, setpoints=None, engine=None, now=None):
     """
-    Generate dummy thermostat adjustment suggestions based on live temps and feedback.
-    For each sensor/location:
-      - If temp > ACCEPTABLE_HIGH or more 'hot' feedbacks, suggest lowering target by 1°C.
-      - If temp < ACCEPTABLE_LOW or more 'cold' feedbacks, suggest raising target by 1°C.
-      - Otherwise, report settings are OK.
-    Returns a dict mapping sensor.location to suggestion string.
-    """
-    # Build feedback counts per sensor
-    feedback_counts = {s.id: {'hot': 0, 'ok': 0, 'cold': 0} for s in sensors}
-    for fb in feedbacks:
-        if fb.sensor_id in feedback_counts:
-            feedback_counts[fb.sensor_id][fb.rating] += 1
+    Evaluate thermostat decisions for all sensors in one batch.
 
-    suggestions = {}
+    - sensors: list of Sensor objects or registry records (their decayed
+      feedback scores are used)
+    - live_temps: dict sensor.id -> current temp
+    - setpoints: dict heating zone -> (low, high); other zones use
+      ACCEPTABLE_LOW/ACCEPTABLE_HIGH
+    - engine: SuggestionEngine holding hysteresis/cooldown state between
+      calls (a fresh, stateless one if omitted)
+
+    Returns a dict mapping sensor.id to ThermostatDecision.
+    """
+    engine = engine or SuggestionEngine()
+    setpoints = setpoints or {}
+    now = now or datetime.utcnow()
+    ids, zones, temps, lows, highs, hot, cold = [], [], [], [], [], [], []
     for sensor in sensors:
-        loc = sensor.location
-        temp = live_temps.get(sensor.id, None)
-        counts = feedback_counts.get(sensor.id, {})
-        hot = counts.get('hot', 0)
-        cold = counts.get('cold', 0)
-
-        if temp is not None and (temp > ACCEPTABLE_HIGH or hot > cold):
-            suggestions[loc] = f"Current temp {temp}°C; consider lowering thermostat by 1°C."
-        elif temp is not None and (temp < ACCEPTABLE_LOW or cold > hot):
-            suggestions[loc] = f"Current temp {temp}°C; consider raising thermostat by 1°C."
+        low, high = setpoints.get(sensor.zone_name, (ACCEPTABLE_LOW, ACCEPTABLE_HIGH))
+        scores = sensor.feedback_scores(now)
+        temp = live_temps.get(sensor.id)
+        ids.append(sensor.id)
+        zones.append(sensor.zone_name)
+        temps.append(float('nan') if temp is None else temp)
+        lows.append(low)
+        highs.append(high)
+        hot.append(scores['hot'])
+        cold.append(scores['cold'])
+    decisions = engine.evaluate(ids, zones, temps, lows, highs, hot, cold, now=now.timestamp())
+    return {decision.sensor_id: decision for decision in decisions}
+
+
+def suggest_zone_adjustments(hierarchy, setpoints=None):
+    """
+    Generate one thermostat suggestion per heating zone in a single pass over
+    the zones' precomputed rollups (average temperature and feedback counts),
+    against each zone's setpoint band (default ACCEPTABLE_LOW/ACCEPTABLE_HIGH).
+    Returns a dict mapping heating zone name to suggestion string.
+    """
+    setpoints = setpoints or {}
+    suggestions = {}
+    for name, _, rollup in hierarchy.zone_rollups():
+        low, high = setpoints.get(name, (ACCEPTABLE_LOW, ACCEPTABLE_HIGH))
+        temp = rollup.avg_temp
+        shown = round(temp, 1) if temp is not None else None
+        if temp is not None and (temp > high or rollup.hot > rollup.cold):
+            suggestions[name] = f"Zone avg {shown}°C; consider lowering thermostat by 1°C."
+        elif temp is not None and (temp < low or rollup.cold > rollup.hot):
+            suggestions[name] = f"Zone avg {shown}°C; consider raising thermostat by 1°C."
         else:
-            suggestions[loc] = f"Current temp {temp}°C; settings are within the comfortable range."
-
+            suggestions[name] = f"Zone avg {shown}°C; settings are within the comfortable range."
     return suggestions
 
 @dataclass
@@ -128,25 +127,27 @@ class SensorFeatureVector:
     outdoor_temp: float = None
     outdoor_humidity: float = None
     weather_code: str = None
-
-def aggregate_sensor_features(sensors, feedbacks, live_temps, historical_temps, outdoor_data=None):
+    hot_score: float = None
+    cold_score: float = None
+    ok_score: float = None
+    forecast_temp: float = None
+    forecast_slope: float = None
+
+def aggregate_sensor_features(sensors, feedback_counts, live_temps, historical_temps, outdoor_data=None,
+                              forecasts=None):
     """
     Build feature vectors for each sensor to feed into AI/ML model.
 
-    - sensors: list of Sensor objects
-    - feedbacks: list of Feedback objects
+    - sensors: list of Sensor objects or registry records (app.sensor_registry)
+    - feedback_counts: dict sensor.id -> {'hot': n, 'ok': n, 'cold': n}
     - live_temps: dict sensor.id -> current temp
     - historical_temps: dict sensor.id -> list of (timestamp, temp)
-    - outdoor_data: list of objects with attributes (timestamp, temp, humidity, code)
+    - outdoor_data: OutdoorTimeline, or list of objects with attributes
+      (timestamp, temp, humidity, code)
+    - forecasts: dict sensor.id -> Forecast (see app.forecast)
 
     Returns: list of SensorFeatureVector
     """
-    # Count feedback by rating per sensor
-    fb_counts = {s.id: {'hot':0,'ok':0,'cold':0} for s in sensors}
-    for fb in feedbacks:
-        if fb.sensor_id in fb_counts:
-            fb_counts[fb.sensor_id][fb.rating] += 1
-
     # Compute 1h average temperature
     cutoff = datetime.utcnow().timestamp() - 3600
     avg_1h = {}
@@ -154,17 +155,20 @@ def aggregate_sensor_features(sensors, feedbacks, live_temps, historical_temps,
         recent = [temp for ts, temp in readings if ts.timestamp() >= cutoff]
         avg_1h[sid] = sum(recent)/len(recent) if recent else live_temps.get(sid, 0)
 
-    # Optionally index latest outdoor data
-    latest_out = None
-    if outdoor_data:
-        latest_out = sorted(outdoor_data, key=lambda o: o.timestamp)[-1]
+    # Outdoor data is joined by nearest timestamp on a sorted timeline
+    if outdoor_data is not None and not isinstance(outdoor_data, OutdoorTimeline):
+        outdoor_data = OutdoorTimeline(outdoor_data)
 
     # Build feature vectors
     now = datetime.utcnow()
+    forecasts = forecasts or {}
     feature_list = []
     for s in sensors:
         sid = s.id
-        cf = fb_counts.get(sid, {})
+        cf = feedback_counts.get(sid, {})
+        fc = forecasts.get(sid)
+        out = outdoor_data.nearest(now) if outdoor_data else None
+        scores = s.feedback_scores(now)
         vec = SensorFeatureVector(
             sensor_id=sid,
             location=s.location,
@@ -175,9 +179,14 @@ def aggregate_sensor_features(sensors, feedbacks, live_temps, historical_temps,
             cold_feedback_count=cf.get('cold',0),
             ok_feedback_count=cf.get('ok',0),
             total_feedback_count=sum(cf.values()),
-            outdoor_temp=(latest_out.temp if latest_out else None),
-            outdoor_humidity=(latest_out.humidity if latest_out else None),
-            weather_code=(latest_out.code if latest_out else None)
+            outdoor_temp=(out.temp if out else None),
+            outdoor_humidity=(out.humidity if out else None),
+            weather_code=(out.code if out else None),
+            hot_score=scores['hot'],
+            cold_score=scores['cold'],
+            ok_score=scores['ok'],
+            forecast_temp=(fc.temp if fc else None),
+            forecast_slope=(fc.slope if fc else None)
         )
         feature_list.append(vec)
     return feature_list
\ No newline at end of file
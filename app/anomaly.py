@@ -0,0 +1,148 @@
+"""
+Online anomaly detection for incoming temperature readings.
+
+Each sensor gets a small fixed-size detector (EWMA mean/variance, last value,
+flatline start), so memory is constant per sensor and each reading costs a
+handful of float operations. Ingest request threads and the scheduler share
+one monitor, so detectors are created, updated and dropped under its lock.
+"""
+
+import math
+import threading
+from typing import Dict, Optional
+
+from flask import current_app
+
+# Events returned by SensorAnomalyDetector.update
+ZSCORE = 'z-score'
+RATE = 'rate'
+FLATLINE = 'flatline'
+RECOVERED = 'recovered'
+
+
+class SensorAnomalyDetector:
+    """
+    Streaming detector for one sensor. update() returns an event name only when
+    the sensor changes between healthy and faulty, otherwise None.
+    """
+    __slots__ = ('mean', 'var', 'count', 'last_value', 'last_time',
+                 'flat_since', 'faulty', 'good_streak')
+
+    def __init__(self):
+        self.mean = 0.0
+        self.var = 0.0
+        self.count = 0
+        self.last_value = 0.0
+        self.last_time = 0.0
+        self.flat_since = 0.0
+        self.faulty = False
+        self.good_streak = 0
+
+    def update(self, ts: float, value: float, monitor: 'AnomalyMonitor') -> Optional[str]:
+        if self.count == 0:
+            self.mean = self.last_value = value
+            self.last_time = self.flat_since = ts
+            self.count = 1
+            return None
+
+        reason = None
+        dt = ts - self.last_time
+        # Over short gaps the rate is measured across min_rate_seconds, or
+        # ordinary jitter between frequent readings looks like a fast change
+        if dt > 0 and abs(value - self.last_value) * 60.0 / max(dt, monitor.min_rate_seconds) > monitor.max_rate:
+            reason = RATE
+        elif self.count >= monitor.warmup:
+            std = max(math.sqrt(self.var), monitor.min_std)
+            if abs(value - self.mean) / std > monitor.z_limit:
+                reason = ZSCORE
+
+        if abs(value - self.last_value) > monitor.flat_epsilon:
+            self.flat_since = ts
+        elif reason is None and ts - self.flat_since >= monitor.flatline_seconds:
+            reason = FLATLINE
+
+        # Outliers still feed the baseline so a genuine level shift is re-learned
+        diff = value - self.mean
+        incr = monitor.alpha * diff
+        self.mean += incr
+        self.var = (1.0 - monitor.alpha) * (self.var + diff * incr)
+        self.count += 1
+        self.last_value = value
+        self.last_time = ts
+
+        if reason is not None:
+            self.good_streak = 0
+            if not self.faulty:
+                self.faulty = True
+                return reason
+            return None
+        if self.faulty:
+            self.good_streak += 1
+            if self.good_streak >= monitor.recovery:
+                self.faulty = False
+                self.good_streak = 0
+                return RECOVERED
+        return None
+
+
+class AnomalyMonitor:
+    """
+    Holds one detector per sensor and the thresholds they share.
+    """
+    def __init__(self, alpha=0.1, z_limit=4.0, max_rate=2.0, flatline_seconds=6 * 3600,
+                 warmup=10, recovery=5, min_std=0.2, flat_epsilon=1e-6, min_rate_seconds=60.0):
+        self.alpha = alpha
+        self.z_limit = z_limit
+        self.max_rate = max_rate              # °C per minute
+        self.min_rate_seconds = min_rate_seconds
+        self.flatline_seconds = flatline_seconds
+        self.warmup = warmup
+        self.recovery = recovery
+        self.min_std = min_std
+        self.flat_epsilon = flat_epsilon
+        self._detectors: Dict[int, SensorAnomalyDetector] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'AnomalyMonitor':
+        return cls(
+            alpha=config.get('ANOMALY_EWMA_ALPHA', 0.1),
+            z_limit=config.get('ANOMALY_Z_LIMIT', 4.0),
+            max_rate=config.get('ANOMALY_MAX_RATE', 2.0),
+            min_rate_seconds=config.get('ANOMALY_RATE_MIN_SECONDS', 60),
+            flatline_seconds=config.get('ANOMALY_FLATLINE_SECONDS', 6 * 3600),
+            warmup=config.get('ANOMALY_WARMUP', 10),
+            recovery=config.get('ANOMALY_RECOVERY', 5),
+        )
+
+    def __len__(self) -> int:
+        return len(self._detectors)
+
+    def observe(self, sensor_id: int, ts: float, value: float) -> Optional[str]:
+        """
+        Feed one reading (ts in epoch seconds); returns a fault/recovery event or None.
+        """
+        with self._lock:
+            detector = self._detectors.get(sensor_id)
+            if detector is None:
+                detector = self._detectors[sensor_id] = SensorAnomalyDetector()
+            return detector.update(ts, value, self)
+
+    def is_faulty(self, sensor_id: int) -> bool:
+        with self._lock:
+            detector = self._detectors.get(sensor_id)
+            return detector is not None and detector.faulty
+
+    def forget(self, sensor_id: int):
+        with self._lock:
+            self._detectors.pop(sensor_id, None)
+
+
+def get_anomaly_monitor() -> AnomalyMonitor:
+    """
+    Return the app's anomaly monitor, creating it from config on first use.
+    """
+    monitor = current_app.extensions.get('anomaly_monitor')
+    if monitor is None:
+        monitor = current_app.extensions['anomaly_monitor'] = AnomalyMonitor.from_config(current_app.config)
+    return monitor
@@ -0,0 +1,204 @@
+"""
+Archive of old temperature readings in per-sensor, per-month column files.
+
+Readings older than READING_RETENTION_DAYS are moved out of the
+temperature_readings table into
+
+    ARCHIVE_DIR/<sensor_id>/<YYYY-MM>/ts.npy    uint32 ms since the month start
+                                      temp.npy  float32 calibrated temperature
+                                      raw.npy   float32 raw temperature (NaN if unknown)
+
+About 12 bytes a reading against roughly 60 in the table and its index.
+Files are plain .npy so they can be opened with mmap_mode='r'. A range
+query binary-searches the sorted time column and reads only that slice.
+"""
+
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from flask import current_app
+
+from app import db
+from app.models import TemperatureReading
+
+COLUMNS = ('ts', 'temp', 'raw')
+MANIFEST = 'manifest.json'
+MONTH_DIR = re.compile(r'^\d{4}-\d{2}$')
+
+
+def month_start(ts: datetime) -> datetime:
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(start: datetime) -> datetime:
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+class ReadingArchive:
+    """
+    Reads and writes the archive rooted at `root`.
+    """
+    def __init__(self, root: str):
+        self.root = root
+
+    def _dir(self, sensor_id: int, month: datetime, suffix: str = '') -> str:
+        # Work directories (suffix '.tmp' or '.old') are hidden: '.<YYYY-MM><suffix>'
+        name = month.strftime('%Y-%m')
+        return os.path.join(self.root, str(sensor_id), f'.{name}{suffix}' if suffix else name)
+
+    @property
+    def archived_before(self) -> Optional[datetime]:
+        """
+        Everything older than this has been moved out of the live table.
+        """
+        try:
+            with open(os.path.join(self.root, MANIFEST)) as fh:
+                return datetime.fromisoformat(json.load(fh)['archived_before'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _set_archived_before(self, cutoff: datetime):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, MANIFEST + '.tmp')
+        with open(tmp, 'w') as fh:
+            json.dump({'archived_before': cutoff.isoformat()}, fh)
+        os.replace(tmp, os.path.join(self.root, MANIFEST))
+
+    def sensor_ids(self) -> List[int]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(int(name) for name in os.listdir(self.root) if name.isdigit())
+
+    def months(self, sensor_id: int) -> List[datetime]:
+        path = os.path.join(self.root, str(sensor_id))
+        if not os.path.isdir(path):
+            return []
+        months = set()
+        for name in os.listdir(path):
+            # A month moved aside by a write that did not finish still counts
+            if name.startswith('.') and name.endswith('.old'):
+                name = name[1:-len('.old')]
+            if MONTH_DIR.match(name):
+                months.add(datetime.strptime(name, '%Y-%m'))
+        return sorted(months)
+
+    def open_month(self, sensor_id: int, month: datetime) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Memory-mapped (ts, temp, raw) columns for one sensor-month.
+        """
+        path = self._dir(sensor_id, month)
+        if not os.path.isdir(path):
+            # Between the two renames of write_month, or after a crash there
+            path = self._dir(sensor_id, month, '.old')
+        return tuple(np.load(os.path.join(path, f'{col}.npy'), mmap_mode='r') for col in COLUMNS)
+
+    def write_month(self, sensor_id: int, month: datetime, offsets: np.ndarray,
+                    temps: np.ndarray, raws: np.ndarray):
+        """
+        Merge readings into a sensor-month, keeping it sorted by time. A
+        reading already archived at the same millisecond is replaced, so an
+        interrupted archive run can simply be repeated.
+        """
+        path, aside = self._dir(sensor_id, month), self._dir(sensor_id, month, '.old')
+        if not os.path.isdir(path) and os.path.isdir(aside):
+            os.replace(aside, path)      # an earlier write stopped between its renames
+        if os.path.isdir(path):
+            old = [np.asarray(col) for col in self.open_month(sensor_id, month)]
+            offsets = np.concatenate([old[0], offsets])
+            temps = np.concatenate([old[1], temps])
+            raws = np.concatenate([old[2], raws])
+        # Stable sort, then keep the last (newest-written) value per timestamp
+        order = np.argsort(offsets, kind='stable')
+        offsets, temps, raws = offsets[order], temps[order], raws[order]
+        keep = np.append(offsets[1:] != offsets[:-1], True)
+        columns = (offsets[keep].astype(np.uint32), temps[keep].astype(np.float32),
+                   raws[keep].astype(np.float32))
+
+        # Write a complete copy beside the old one, move the old one aside,
+        # swap the copy in and only then delete the old one
+        tmp = self._dir(sensor_id, month, '.tmp')
+        shutil.rmtree(tmp, ignore_errors=True)
+        shutil.rmtree(aside, ignore_errors=True)
+        os.makedirs(tmp)
+        for col, values in zip(COLUMNS, columns):
+            np.save(os.path.join(tmp, f'{col}.npy'), values)
+        if os.path.isdir(path):
+            os.replace(path, aside)
+        os.replace(tmp, path)
+        shutil.rmtree(aside, ignore_errors=True)
+
+    def read(self, sensor_id: int, since: datetime, until: datetime = None
+             ) -> Iterator[Tuple[datetime, float, Optional[float]]]:
+        """
+        Yield (timestamp, temperature, raw) for since <= timestamp < until.
+        """
+        for month in self.months(sensor_id):
+            end = next_month(month)
+            if end <= since or (until is not None and month >= until):
+                continue
+            ts, temp, raw = self.open_month(sensor_id, month)
+            lo = np.searchsorted(ts, max(0, _offset_ms(since, month)), side='left')
+            hi = len(ts) if until is None or until >= end else np.searchsorted(ts, _offset_ms(until, month), side='left')
+            if lo >= hi:
+                continue
+            base = np.datetime64(month, 'ms')
+            stamps = (base + np.asarray(ts[lo:hi]).astype('timedelta64[ms]')).astype(datetime)
+            raws = np.asarray(raw[lo:hi], dtype=np.float64)
+            for stamp, value, raw_value in zip(stamps.tolist(), np.asarray(temp[lo:hi], dtype=np.float64).tolist(),
+                                               raws.tolist()):
+                yield stamp, value, (None if raw_value != raw_value else raw_value)
+
+
+def _offset_ms(ts: datetime, month: datetime) -> int:
+    return int((ts - month) // timedelta(milliseconds=1))
+
+
+def archive_readings(cutoff: datetime = None, sensor_batch: int = 500) -> int:
+    """
+    Move readings older than `cutoff` (default: READING_RETENTION_DAYS ago)
+    into the archive, one month and batch of sensors at a time. Files are
+    written before the rows are deleted. Returns the number of rows moved.
+    """
+    cutoff = cutoff or datetime.utcnow() - timedelta(days=current_app.config.get('READING_RETENTION_DAYS', 30))
+    archive = get_reading_archive()
+    table = TemperatureReading.__table__
+    moved = 0
+    while True:
+        oldest = db.session.scalar(db.select(db.func.min(table.c.timestamp)).where(table.c.timestamp < cutoff))
+        if oldest is None:
+            break
+        month = month_start(oldest)
+        window_end = min(next_month(month), cutoff)
+        in_window = db.and_(table.c.timestamp >= month, table.c.timestamp < window_end)
+        sensor_ids = db.session.scalars(db.select(table.c.sensor_id).where(in_window).distinct()).all()
+        for i in range(0, len(sensor_ids), sensor_batch):
+            batch = sensor_ids[i:i + sensor_batch]
+            rows = db.session.execute(
+                db.select(table.c.sensor_id, table.c.timestamp, table.c.temperature, table.c.raw_temperature)
+                  .where(in_window).where(table.c.sensor_id.in_(batch))
+                  .order_by(table.c.sensor_id, table.c.timestamp)
+            ).all()
+            by_sensor: Dict[int, list] = {}
+            for sensor_id, ts, temp, raw in rows:
+                by_sensor.setdefault(sensor_id, []).append(
+                    (_offset_ms(ts, month), temp, np.nan if raw is None else raw))
+            for sensor_id, readings in by_sensor.items():
+                offsets, temps, raws = (np.array(col) for col in zip(*readings))
+                archive.write_month(sensor_id, month, offsets, temps, raws)
+            db.session.execute(db.delete(table).where(in_window).where(table.c.sensor_id.in_(batch)))
+            db.session.commit()
+            moved += len(rows)
+    archive._set_archived_before(max(cutoff, archive.archived_before or cutoff))
+    return moved
+
+
+def get_reading_archive() -> ReadingArchive:
+    """
+    Return the archive under ARCHIVE_DIR.
+    """
+    return ReadingArchive(current_app.config['ARCHIVE_DIR'])
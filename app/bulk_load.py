@@ -0,0 +1,151 @@
+"""
+Streaming bulk loader for historical temperature readings (CSV or NDJSON).
+
+Rows are read one at a time, validated, mapped from sensor name to id
+through an in-memory index, then calibrated and inserted in large chunks,
+one transaction per chunk, so memory use is bounded by the chunk size
+rather than the file.
+Secondary indexes on the readings table are dropped for the load and
+rebuilt once at the end.
+"""
+
+import csv
+import gzip
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+
+from app import db
+from app.models import Sensor, TemperatureReading
+from app.ingest import parse_timestamp
+from app.heartbeat import record_heartbeats, recent_heartbeats
+from app.calibration import correct_readings
+from app.snapshot import mark_dashboard_stale
+
+# Plausible physical range for an indoor sensor, °C
+MIN_TEMP = -50.0
+MAX_TEMP = 100.0
+
+
+@dataclass
+class LoadStats:
+    rows: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def _open(path: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', newline='')
+    return open(path, newline='')
+
+
+def iter_rows(fh, fmt: str) -> Iterator[dict]:
+    if fmt == 'csv':
+        yield from csv.DictReader(fh)
+    else:
+        for line in fh:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield {}
+
+
+def build_sensor_index() -> Tuple[Dict[str, Optional[int]], Set[int]]:
+    """
+    Return ({sensor name: id}, {all ids}) from one query.
+    Names shared by several sensors map to None.
+    """
+    by_name: Dict[str, Optional[int]] = {}
+    ids = set()
+    for sensor_id, name in db.session.execute(db.select(Sensor.id, Sensor.name)):
+        by_name[name] = None if name in by_name else sensor_id
+        ids.add(sensor_id)
+    return by_name, ids
+
+
+def load_readings(path: str, fmt: str = None, chunk_size: int = 50000,
+                  defer_indexes: bool = True,
+                  progress: Callable[[LoadStats], None] = None) -> LoadStats:
+    """
+    Load readings from `path`. Each row needs a timestamp, a temperature and
+    either sensor_id or sensor (the sensor's name).
+    """
+    fmt = fmt or ('csv' if '.csv' in path else 'ndjson')
+    sensors, known_ids = build_sensor_index()
+    stats = LoadStats()
+    latest = {}
+    table = TemperatureReading.__table__
+    indexes = list(table.indexes) if defer_indexes else []
+    start = time.perf_counter()
+
+    conn = db.session.connection()
+    for index in indexes:
+        index.drop(bind=conn)
+    db.session.commit()
+    try:
+        chunk = []
+        with _open(path) as fh:
+            for row in iter_rows(fh, fmt):
+                stats.rows += 1
+                try:
+                    if row.get('sensor_id') not in (None, ''):
+                        sensor_id = int(row['sensor_id'])
+                        if sensor_id not in known_ids:
+                            raise ValueError(sensor_id)
+                    else:
+                        sensor_id = sensors[row['sensor']]
+                        if sensor_id is None:
+                            raise ValueError('ambiguous sensor name')
+                    temp = float(row['temperature'])
+                    if not math.isfinite(temp) or not MIN_TEMP <= temp <= MAX_TEMP:
+                        raise ValueError(temp)
+                    if not row['timestamp']:
+                        raise ValueError('missing timestamp')
+                    ts = parse_timestamp(row['timestamp'])
+                except (AttributeError, KeyError, TypeError, ValueError):
+                    stats.rejected += 1
+                    continue
+                chunk.append({'sensor_id': sensor_id, 'timestamp': ts, 'raw_temperature': temp})
+                if sensor_id not in latest or latest[sensor_id] < ts:
+                    latest[sensor_id] = ts
+                if len(chunk) >= chunk_size:
+                    _flush(chunk, stats, start, progress)
+                    chunk = []
+        if chunk:
+            _flush(chunk, stats, start, progress)
+        # Only readings recent enough to count as a heartbeat advance last_seen;
+        # otherwise the next sweep would mark every backfilled sensor offline
+        record_heartbeats(recent_heartbeats(latest))
+        mark_dashboard_stale()
+        db.session.commit()
+    finally:
+        db.session.rollback()
+        conn = db.session.connection()
+        for index in indexes:
+            index.create(bind=conn)
+        db.session.commit()
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def _flush(chunk, stats: LoadStats, start: float, progress):
+    corrected = correct_readings([r['sensor_id'] for r in chunk], [r['timestamp'] for r in chunk],
+                                 [r['raw_temperature'] for r in chunk])
+    for row, temp in zip(chunk, corrected.tolist()):
+        row['temperature'] = temp
+    db.session.execute(db.insert(TemperatureReading.__table__), chunk)
+    db.session.commit()
+    stats.inserted += len(chunk)
+    stats.elapsed = time.perf_counter() - start
+    if progress is not None:
+        progress(stats)
@@ -0,0 +1,141 @@
+"""
+Numeric sensor calibration: corrected = raw * gain + offset.
+
+A calibration applies to readings taken at or after its effective_from,
+until the sensor's next calibration. Coefficients are cached per sensor as
+sorted NumPy arrays, so correcting a batch costs one searchsorted per
+sensor and no queries once the sensors are cached. calibrate_sensor drops
+a sensor's entry after it commits; CALIBRATION_CACHE_TTL bounds how long
+other worker processes can keep serving old coefficients.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from flask import current_app
+
+from app import db
+from app.models import Calibration
+
+# (effective_from epoch seconds, gains, offsets), sorted by time
+Coefficients = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class CalibrationCache:
+    """
+    Per-sensor calibration coefficients, loaded in bulk on first use.
+    Shared by request threads and the scheduler thread: the entries dict is
+    never changed in place but replaced under a lock (copy-on-write), so a
+    reader keeps a consistent dict for as long as it needs it.
+    """
+    def __init__(self, ttl: float = 300.0, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: Dict[int, Optional[Coefficients]] = {}
+        self._loaded_at = clock()
+        self._generation = 0          # bumped by invalidate(), so stale loads are not stored
+        self._lock = threading.Lock()
+
+    def invalidate(self, sensor_id: int = None):
+        """
+        Forget one sensor's coefficients (or all of them).
+        """
+        with self._lock:
+            if sensor_id is None:
+                self._entries = {}
+            else:
+                self._entries = {sid: coef for sid, coef in self._entries.items() if sid != sensor_id}
+            self._generation += 1
+
+    def _ensure(self, sensor_ids: Iterable[int]) -> Dict[int, Optional[Coefficients]]:
+        """
+        Return an entries dict that covers `sensor_ids`.
+        """
+        with self._lock:
+            if self._clock() - self._loaded_at > self.ttl:
+                self._entries = {}
+                self._loaded_at = self._clock()
+                self._generation += 1
+            entries, generation = self._entries, self._generation
+        missing = {int(sid) for sid in sensor_ids} - entries.keys()
+        if not missing:
+            return entries
+        rows = db.session.execute(
+            db.select(Calibration.sensor_id, Calibration.effective_from,
+                      Calibration.gain, Calibration.offset)
+              .where(Calibration.sensor_id.in_(missing))
+              .where(db.or_(Calibration.gain.is_not(None), Calibration.offset.is_not(None)))
+              .order_by(Calibration.sensor_id, Calibration.effective_from, Calibration.id)
+        ).all()
+        grouped: Dict[int, list] = {sid: [] for sid in missing}
+        for sid, effective_from, gain, offset in rows:
+            grouped[sid].append((effective_from.timestamp(),
+                                 1.0 if gain is None else gain,
+                                 0.0 if offset is None else offset))
+        loaded = {sid: tuple(np.array(col, dtype=np.float64) for col in zip(*cals)) if cals else None
+                  for sid, cals in grouped.items()}
+        with self._lock:
+            if self._generation == generation:
+                self._entries = {**self._entries, **loaded}
+        return {**entries, **loaded}
+
+    def coefficients(self, sensor_id: int) -> Optional[Coefficients]:
+        return self._ensure((sensor_id,))[sensor_id]
+
+    def correct(self, sensor_ids, times, raw) -> np.ndarray:
+        """
+        Return calibrated values for aligned arrays of sensor ids, epoch-second
+        timestamps and raw readings. Readings before a sensor's first
+        calibration (or from uncalibrated sensors) pass through unchanged.
+        """
+        sensor_ids = np.asarray(sensor_ids, dtype=np.int64)
+        times = np.asarray(times, dtype=np.float64)
+        corrected = np.array(raw, dtype=np.float64)
+        if not len(sensor_ids):
+            return corrected
+        unique = np.unique(sensor_ids)
+        entries = self._ensure(unique.tolist())
+        for sid in unique.tolist():
+            coef = entries[sid]
+            if coef is None:
+                continue
+            starts, gains, offsets = coef
+            mask = sensor_ids == sid if len(unique) > 1 else slice(None)
+            idx = np.searchsorted(starts, times[mask], side='right') - 1
+            active = idx >= 0
+            values = corrected[mask]
+            values[active] = values[active] * gains[idx[active]] + offsets[idx[active]]
+            corrected[mask] = values
+        return corrected
+
+
+def correct_readings(sensor_ids, timestamps: Iterable[datetime], raw) -> np.ndarray:
+    """
+    Calibrate a batch of readings with the app's coefficient cache.
+    """
+    times = [ts.timestamp() for ts in timestamps]
+    return get_calibration_cache().correct(sensor_ids, times, raw)
+
+
+def get_calibration_cache() -> CalibrationCache:
+    """
+    Return the app's calibration cache, creating it on first use.
+    """
+    cache = current_app.extensions.get('calibration_cache')
+    if cache is None:
+        cache = current_app.extensions['calibration_cache'] = CalibrationCache(
+            ttl=current_app.config.get('CALIBRATION_CACHE_TTL', 300)
+        )
+    return cache
+
+
+def invalidate_calibration(sensor_id: int):
+    """
+    Drop a sensor's cached coefficients; call after a calibration commits.
+    """
+    cache = current_app.extensions.get('calibration_cache')
+    if cache is not None:
+        cache.invalidate(sensor_id)
@@ -0,0 +1,319 @@
+"""
+Batch comfort analytics over hourly temperature rollups and feedback.
+
+Readings from the last ANALYTICS_WINDOW_HOURS are averaged per sensor and
+hour in SQL, giving an aligned sensors x hours matrix (NaN where a sensor did
+not report). From it, all in NumPy:
+
+- cross-sensor temperature correlations: each sensor's most similar sensors,
+  and how well it tracks the other sensors in its heating zone
+- per heating zone, the correlation between the temperature at the time of
+  a feedback and its rating (hot +1, ok 0, cold -1)
+- complaint rates per 1 °C band of that temperature
+
+Correlations are computed in blocks of rows, so memory stays proportional to
+block size x sensors even for thousands of sensors. The report is cached per
+process and refreshed by a scheduler job every ANALYTICS_INTERVAL seconds.
+"""
+
+import calendar
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
+from flask import current_app
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import BigInteger
+
+from app import db
+from app.models import Feedback, TemperatureReading
+from app.sensor_registry import get_sensor_registry
+from app.read_routing import read_replica
+
+RATING_SCORES = {'hot': 1.0, 'ok': 0.0, 'cold': -1.0}
+
+
+@dataclass
+class HourlyMatrix:
+    sensor_ids: np.ndarray      # (S,) sensor ids, sorted
+    start_hour: int             # epoch hour of column 0
+    temps: np.ndarray           # (S, H) mean temperature per hour, NaN if none
+
+    def row_of(self, sensor_ids) -> np.ndarray:
+        """
+        Row index for each sensor id, or -1 for sensors without readings.
+        """
+        sensor_ids = np.asarray(sensor_ids, dtype=np.int64)
+        if not len(self.sensor_ids):
+            return np.full(len(sensor_ids), -1)
+        pos = np.clip(np.searchsorted(self.sensor_ids, sensor_ids), 0, len(self.sensor_ids) - 1)
+        return np.where(self.sensor_ids[pos] == sensor_ids, pos, -1)
+
+
+@dataclass
+class ComfortAnalytics:
+    computed_at: datetime
+    window_hours: int
+    sensors_analysed: int = 0
+    # [{'sensor_id', 'zone', 'zone_coherence', 'neighbours': [{'sensor_id', 'r'}]}]
+    sensors: List[dict] = field(default_factory=list)
+    # [{'zone', 'feedback', 'r'}]
+    zones: List[dict] = field(default_factory=list)
+    # [{'band', 'feedback', 'hot_rate', 'cold_rate'}]
+    bands: List[dict] = field(default_factory=list)
+
+
+def _epoch_hour(ts: datetime) -> int:
+    return calendar.timegm(ts.timetuple()) // 3600
+
+
+class epoch_seconds(FunctionElement):
+    """
+    Whole seconds since 1970 of a naive UTC timestamp column, in SQL.
+    """
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(epoch_seconds)
+def _epoch_seconds(element, compiler, **kw):
+    return 'CAST(EXTRACT(EPOCH FROM %s) AS BIGINT)' % compiler.process(element.clauses, **kw)
+
+
+@compiles(epoch_seconds, 'sqlite')
+def _epoch_seconds_sqlite(element, compiler, **kw):
+    return "CAST(strftime('%%s', %s) AS INTEGER)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(epoch_seconds, 'mysql')
+def _epoch_seconds_mysql(element, compiler, **kw):
+    return "TIMESTAMPDIFF(SECOND, '1970-01-01', %s)" % compiler.process(element.clauses, **kw)
+
+
+def load_hourly_matrix(since: datetime, until: datetime) -> HourlyMatrix:
+    """
+    Hourly mean temperature per sensor, aggregated by the database.
+    """
+    hour = (epoch_seconds(TemperatureReading.timestamp) // 3600).label('hour')
+    rows = db.session.execute(
+        db.select(TemperatureReading.sensor_id, hour, db.func.avg(TemperatureReading.temperature))
+          .where(TemperatureReading.timestamp >= since)
+          .where(TemperatureReading.timestamp < until)
+          .group_by(TemperatureReading.sensor_id, hour)
+    ).all()
+    start_hour = _epoch_hour(since)
+    n_hours = max(1, _epoch_hour(until) - start_hour + 1)
+    if not rows:
+        return HourlyMatrix(np.empty(0, dtype=np.int64), start_hour, np.empty((0, n_hours)))
+    sensor_col, hour_col, temp_col = (np.array(col) for col in zip(*rows))
+    sensor_ids, rows_idx = np.unique(sensor_col.astype(np.int64), return_inverse=True)
+    temps = np.full((len(sensor_ids), n_hours), np.nan)
+    temps[rows_idx, hour_col.astype(np.int64) - start_hour] = temp_col.astype(np.float64)
+    return HourlyMatrix(sensor_ids, start_hour, temps)
+
+
+def correlate_sensors(temps: np.ndarray, zone_idx: np.ndarray, min_hours: int = 6,
+                      top_k: int = 3, block: int = 512):
+    """
+    Pearson correlations between the rows of `temps` (sensors x hours),
+    each pair over the hours both sensors reported. Rows are centred on their
+    own mean; the products and the per-pair norms are masked matrix products,
+    so a block of rows costs three matmuls. Rows with fewer than `min_hours`
+    readings are skipped, as are pairs sharing fewer than `min_hours`.
+
+    Returns (analysed row indices, top-k neighbour rows, their correlations,
+    mean correlation with the other analysed sensors of the same zone).
+    """
+    present = ~np.isnan(temps)
+    rows = np.flatnonzero(present.sum(axis=1) >= min_hours)
+    n = len(rows)
+    k = max(0, min(top_k, n - 1))
+    neighbours = np.zeros((n, k), dtype=np.int64)
+    neighbour_r = np.zeros((n, k))
+    coherence = np.full(n, np.nan)
+    if n < 2:
+        return rows, neighbours, neighbour_r, coherence
+
+    mask = present[rows].astype(np.float64)
+    centred = temps[rows] - np.nanmean(temps[rows], axis=1, keepdims=True)
+    centred = np.where(mask > 0, centred, 0.0)
+    squares = centred ** 2
+    zones = zone_idx[rows]
+    onehot = np.zeros((n, zones.max() + 1))
+    onehot[np.arange(n), zones] = 1.0
+    for lo in range(0, n, block):
+        hi = min(lo + block, n)
+        local = np.arange(hi - lo)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = (centred[lo:hi] @ centred.T) / np.sqrt(
+                (squares[lo:hi] @ mask.T) * (mask[lo:hi] @ squares.T))   # (block, n)
+        corr[(mask[lo:hi] @ mask.T) < min_hours] = np.nan
+        corr[local, np.arange(lo, hi)] = np.nan                        # not its own peer
+        valid = ~np.isnan(corr)
+        filled = np.where(valid, corr, 0.0)
+        own_zone = zones[lo:hi]
+        peer_sums = (filled @ onehot)[local, own_zone]
+        peer_counts = (valid @ onehot)[local, own_zone]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            coherence[lo:hi] = np.where(peer_counts > 0, peer_sums / peer_counts, np.nan)
+        if k > 0:
+            ranked = np.where(valid, corr, -np.inf)
+            top = np.argpartition(-ranked, k - 1, axis=1)[:, :k]
+            top_r = np.take_along_axis(ranked, top, axis=1)
+            order = np.argsort(-top_r, axis=1)
+            neighbours[lo:hi] = np.take_along_axis(top, order, axis=1)
+            neighbour_r[lo:hi] = np.take_along_axis(top_r, order, axis=1)
+    neighbour_r[np.isinf(neighbour_r)] = np.nan
+    return rows, neighbours, neighbour_r, coherence
+
+
+def forward_fill(temps: np.ndarray) -> np.ndarray:
+    """
+    Carry each sensor's last hourly value forward into hours without one.
+    """
+    if temps.size == 0:
+        return temps
+    idx = np.where(np.isnan(temps), 0, np.arange(temps.shape[1]))
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    return temps[np.arange(temps.shape[0])[:, None], idx]
+
+
+def zone_feedback_correlation(zone_idx: np.ndarray, temps: np.ndarray, scores: np.ndarray,
+                              n_zones: int):
+    """
+    Per zone: feedback count and Pearson r between temperature and rating
+    score, from per-zone sums (NaN where either side does not vary).
+    """
+    def sums(values):
+        return np.bincount(zone_idx, weights=values, minlength=n_zones)
+
+    n = np.bincount(zone_idx, minlength=n_zones).astype(np.float64)
+    sx, sy = sums(temps), sums(scores)
+    cov = n * sums(temps * scores) - sx * sy
+    var_x = n * sums(temps ** 2) - sx ** 2
+    var_y = n * sums(scores ** 2) - sy ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = np.where((var_x > 1e-9) & (var_y > 1e-9), cov / np.sqrt(var_x * var_y), np.nan)
+    return n.astype(np.int64), r
+
+
+def complaint_bands(temps: np.ndarray, ratings: np.ndarray):
+    """
+    Per 1 °C band of temperature: (band floor, feedback count, hot rate, cold rate).
+    """
+    if not len(temps):
+        return []
+    band = np.floor(temps).astype(np.int64)
+    lo = band.min()
+    idx = band - lo
+    total = np.bincount(idx)
+    hot = np.bincount(idx, weights=(ratings == 'hot').astype(np.float64), minlength=len(total))
+    cold = np.bincount(idx, weights=(ratings == 'cold').astype(np.float64), minlength=len(total))
+    return [(int(lo + i), int(total[i]), hot[i] / total[i], cold[i] / total[i])
+            for i in np.flatnonzero(total)]
+
+
+def _round(value: float, digits: int = 3) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+@read_replica
+def compute_comfort_analytics(now: datetime = None) -> ComfortAnalytics:
+    """
+    Build the full report from the database.
+    """
+    config = current_app.config
+    now = now or datetime.utcnow()
+    window = int(config.get('ANALYTICS_WINDOW_HOURS', 168))
+    since = now - timedelta(hours=window)
+    matrix = load_hourly_matrix(since, now)
+
+    zone_names = {s.id: s.zone_name for s in get_sensor_registry().all()}
+    zone_list = sorted(set(zone_names.values()))
+    zone_of = {name: i for i, name in enumerate(zone_list)}
+    # Readings of sensors removed since (or not yet in the registry) have no zone
+    known = np.isin(matrix.sensor_ids, np.fromiter(zone_names, dtype=np.int64))
+    matrix = HourlyMatrix(matrix.sensor_ids[known], matrix.start_hour, matrix.temps[known])
+    matrix_zones = np.array([zone_of[zone_names[int(sid)]] for sid in matrix.sensor_ids], dtype=np.int64)
+    report = ComfortAnalytics(computed_at=now, window_hours=window)
+
+    # Cross-sensor correlations
+    rows, neighbours, neighbour_r, coherence = correlate_sensors(
+        matrix.temps, matrix_zones,
+        min_hours=int(config.get('ANALYTICS_MIN_HOURS', 6)),
+        top_k=int(config.get('ANALYTICS_TOP_K', 3)),
+    )
+    analysed_ids = matrix.sensor_ids[rows]
+    report.sensors_analysed = len(rows)
+    report.sensors = [
+        {
+            'sensor_id': int(sid),
+            'zone': zone_names.get(int(sid)),
+            'zone_coherence': _round(coherence[i]),
+            'neighbours': [{'sensor_id': int(analysed_ids[j]), 'r': _round(r)}
+                           for j, r in zip(neighbours[i], neighbour_r[i]) if not np.isnan(r)],
+        }
+        for i, sid in enumerate(analysed_ids)
+    ]
+
+    # Feedback paired with the sensor's temperature in the hour it was given
+    feedback = db.session.execute(
+        db.select(Feedback.sensor_id, Feedback.rating, Feedback.submitted_at)
+          .where(Feedback.submitted_at >= since)
+          .where(Feedback.submitted_at < now)
+    ).all()
+    if feedback and len(matrix.sensor_ids):
+        fb_sensors, fb_ratings, fb_times = zip(*feedback)
+        fb_rows = matrix.row_of(fb_sensors)
+        fb_cols = np.array([_epoch_hour(ts) for ts in fb_times]) - matrix.start_hour
+        filled = forward_fill(matrix.temps)
+        paired = (fb_rows >= 0) & (fb_cols >= 0) & (fb_cols < filled.shape[1])
+        fb_temps = np.full(len(feedback), np.nan)
+        fb_temps[paired] = filled[fb_rows[paired], fb_cols[paired]]
+        keep = ~np.isnan(fb_temps)
+        fb_temps = fb_temps[keep]
+        ratings = np.array(fb_ratings)[keep]
+        scores = np.array([RATING_SCORES.get(r, 0.0) for r in ratings])
+        fb_zones = np.array([zone_of[zone_names[sid]] for sid, k in zip(fb_sensors, keep) if k],
+                            dtype=np.int64)
+
+        counts, r = zone_feedback_correlation(fb_zones, fb_temps, scores, len(zone_list))
+        report.zones = [{'zone': zone_list[i], 'feedback': int(counts[i]), 'r': _round(r[i])}
+                        for i in np.flatnonzero(counts)]
+        report.bands = [
+            {'band': band, 'feedback': total, 'hot_rate': _round(hot), 'cold_rate': _round(cold)}
+            for band, total, hot, cold in complaint_bands(fb_temps, ratings)
+        ]
+    return report
+
+
+def get_comfort_analytics(now: datetime = None) -> ComfortAnalytics:
+    """
+    Return the cached report, computing it when missing or older than
+    ANALYTICS_INTERVAL seconds.
+    """
+    cached = current_app.extensions.get('comfort_analytics')
+    max_age = current_app.config.get('ANALYTICS_INTERVAL', 900)
+    if cached is None or time.monotonic() - cached[0] > max_age:
+        return _cache(compute_comfort_analytics(now))
+    return cached[1]
+
+
+def refresh_comfort_analytics(now: datetime = None) -> ComfortAnalytics:
+    """
+    Scheduler job: recompute the report and have the dashboard pick it up.
+    """
+    from app.snapshot import mark_dashboard_stale
+
+    report = _cache(compute_comfort_analytics(now))
+    mark_dashboard_stale()
+    db.session.commit()
+    return report
+
+
+def _cache(report: ComfortAnalytics) -> ComfortAnalytics:
+    current_app.extensions['comfort_analytics'] = (time.monotonic(), report)
+    return report
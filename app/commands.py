@@ -0,0 +1,106 @@
+"""
+Custom `flask` CLI commands.
+"""
+
+import asyncio
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app import db
+
+
+@click.command('loadgen')
+@click.option('--sensors', default=1000, show_default=True, help='Number of simulated sensors.')
+@click.option('--first-sensor-id', default=1, show_default=True, help='Sensor ids are first..first+sensors-1.')
+@click.option('--provision', is_flag=True, help='Create "Load Sensor N" rows and simulate those instead.')
+@click.option('--rate', default=100.0, show_default=True, help='Target requests per second.')
+@click.option('--duration', default=30.0, show_default=True, help='Seconds to run.')
+@click.option('--batch', 'batch_size', default=1, show_default=True, help='Readings per request.')
+@click.option('--concurrency', default=50, show_default=True, help='Max requests in flight.')
+@click.option('--dropout', default=0.001, show_default=True, help='Chance per reading that a sensor drops out.')
+@click.option('--url', default='http://127.0.0.1:5001', show_default=True, help='Base URL of a running server.')
+@click.option('--in-process', is_flag=True, help='Drive this app through its test client instead of HTTP.')
+@click.option('--seed', default=0, show_default=True)
+@with_appcontext
+def loadgen_command(sensors, first_sensor_id, provision, rate, duration, batch_size,
+                    concurrency, dropout, url, in_process, seed):
+    """Simulate a sensor fleet posting readings and report throughput and latency."""
+    from app.loadgen import SensorFleet, HttpSender, InProcessSender, run_load
+
+    if provision:
+        from app.models import Sensor
+        fleet_sensors = [
+            Sensor(name=f'Load Sensor {i}', location=f'Load Building - Room {100 + i}', status='online')
+            for i in range(sensors)
+        ]
+        db.session.add_all(fleet_sensors)
+        db.session.commit()
+        sensor_ids = [s.id for s in fleet_sensors]
+    else:
+        sensor_ids = list(range(first_sensor_id, first_sensor_id + sensors))
+
+    api_key = current_app.config['INGEST_API_KEY']
+    if in_process:
+        sender = InProcessSender(current_app._get_current_object(), api_key)
+    else:
+        sender = HttpSender(url, api_key)
+    fleet = SensorFleet(sensor_ids, seed=seed, dropout_rate=dropout)
+    click.echo(f"Simulating {len(sensor_ids)} sensors at {rate:g} req/s for {duration:g}s "
+               f"({'in-process' if in_process else url})")
+    report = asyncio.run(run_load(sender, fleet, rate, duration, batch_size, concurrency))
+    click.echo(report.summary())
+
+
+@click.command('load-readings')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']),
+              help='File format (default: guessed from the file name).')
+@click.option('--chunk-size', default=50000, show_default=True, help='Rows per transaction.')
+@click.option('--keep-indexes', is_flag=True, help='Do not drop/rebuild indexes around the load.')
+@with_appcontext
+def load_readings_command(path, fmt, chunk_size, keep_indexes):
+    """Bulk-load historical readings from a CSV or NDJSON file (optionally .gz)."""
+    from app.bulk_load import load_readings
+
+    def progress(stats):
+        click.echo(f"  {stats.inserted:,} rows inserted ({stats.rows_per_second:,.0f} rows/s)")
+
+    stats = load_readings(path, fmt=fmt, chunk_size=chunk_size,
+                          defer_indexes=not keep_indexes, progress=progress)
+    click.echo(f"Loaded {stats.inserted:,} of {stats.rows:,} rows ({stats.rejected:,} rejected) "
+               f"in {stats.elapsed:.1f}s, {stats.rows_per_second:,.0f} rows/s")
+
+
+@click.command('archive-readings')
+@click.option('--older-than-days', type=int,
+              help='Archive readings older than this (default: READING_RETENTION_DAYS).')
+@with_appcontext
+def archive_readings_command(older_than_days):
+    """Move old readings out of the database into the column-file archive."""
+    from datetime import datetime, timedelta
+    from app.archive import archive_readings
+
+    days = current_app.config['READING_RETENTION_DAYS'] if older_than_days is None else older_than_days
+    moved = archive_readings(datetime.utcnow() - timedelta(days=days))
+    click.echo(f"Archived {moved:,} readings older than {days} days to {current_app.config['ARCHIVE_DIR']}")
+
+
+@click.command('rebuild-feedback-index')
+@with_appcontext
+def rebuild_feedback_index_command():
+    """Create or rebuild the full-text index over feedback comments."""
+    from app.feedback_search import rebuild_feedback_index
+
+    if rebuild_feedback_index():
+        click.echo('Feedback search index rebuilt.')
+    else:
+        click.echo('This database has no full-text index; feedback search uses LIKE matching.')
+
+
+def register_commands(app):
+    app.cli.add_command(loadgen_command)
+    app.cli.add_command(load_readings_command)
+    app.cli.add_command(archive_readings_command)
+    app.cli.add_command(rebuild_feedback_index_command)
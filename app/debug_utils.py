@@ -2,8 +2,11 @@
 Development utilities: reset and seed the database with sample data.
 """
 
+from flask import current_app
+
 from app import db
 from app.models import Admin, Student, Sensor, Calibration, Feedback, TemperatureReading
+from app.scoring import rebuild_feedback_scores
 import random
 import datetime
 
@@ -16,6 +19,9 @@ def reset_db():
     db.drop_all()
     db.create_all()
 
+    # Drop in-memory state derived from the old data
+    current_app.extensions.pop('zone_hierarchy', None)
+
     # --- Seed Users ---
     admins = [
         Admin(username='admin1', email='admin1@campus.edu'),
@@ -33,9 +39,12 @@ def reset_db():
 
     # --- Seed Sensors ---
     sensors = [
-        Sensor(name='Sensor A1', location='Building 1 - Room 101', status='online'),
-        Sensor(name='Sensor B2', location='Building 2 - Room 202', status='offline'),
-        Sensor(name='Sensor C3', location='Building 3 - Room 303', status='online'),
+        Sensor(name='Sensor A1', location='Building 1 - Room 101', status='online',
+               building='Building 1', floor='1', room='Room 101'),
+        Sensor(name='Sensor B2', location='Building 2 - Room 202', status='offline',
+               building='Building 2', floor='2', room='Room 202'),
+        Sensor(name='Sensor C3', location='Building 3 - Room 303', status='online',
+               building='Building 3', floor='3', room='Room 303'),
     ]
     db.session.add_all(sensors)
     db.session.commit()
@@ -83,8 +92,16 @@ def reset_db():
             tr = TemperatureReading(
                 sensor_id=sensor.id,
                 timestamp=ts,
-                temperature=temp
+                temperature=temp,
+                raw_temperature=temp
             )
             db.session.add(tr)
     db.session.commit()
+
+    # --- Derive decayed feedback scores from the seeded feedback ---
+    rebuild_feedback_scores()
+
+    # The shared live table still holds the old sensors
+    from app.live_table import reload_live_table
+    reload_live_table()
     print("Database reset and seeded with sample data.")
@@ -0,0 +1,274 @@
+"""
+Cross-process delivery of sensor status events for multi-worker deployments.
+
+OutboxTransport appends each event to the sensor_status_events table in
+the caller's transaction, so nothing is delivered unless the status change
+itself commits. Observers are of two kinds (SensorStatusObserver.deployment_wide):
+
+- Per-process observers (dashboard, status log) need every change in every
+  worker. The publishing worker notifies them once its transaction
+  has committed; every other worker polls the outbox from its own
+  cursor and replays the events published elsewhere.
+- Deployment-wide observers (alerting) must see each change exactly once
+  across all workers. They are fed from one shared cursor, held by a single
+  worker at a time; if the holder stops renewing it for
+  EVENT_BUS_LEASE_SECONDS another worker takes over where it left off.
+
+Cursors only move past an event after it has been dispatched, giving
+at-least-once delivery.
+"""
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import SensorStatusEvent, EventCursor
+from app.observer import InProcessTransport, SensorStatusSubject, sensor_status_subject
+
+
+# EventCursor row shared by the deployment-wide observers
+SHARED_CURSOR = 'deployment-wide'
+
+# session.info keys: changes published in the current transaction, and
+# changes committed but not yet dispatched to this worker's observers
+_PENDING = 'outbox_status_changes'
+_COMMITTED = 'outbox_committed_changes'
+
+
+class OutboxTransport:
+    """
+    Transport backed by an outbox table in the application database.
+    """
+    def __init__(self, worker_id: str = None, batch_size: int = 500, lease_seconds: float = 30):
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.cursor = None
+
+    def publish(self, subject: SensorStatusSubject, sensor_id: int, old_status: str, new_status: str):
+        self._stage(subject, [(sensor_id, old_status, new_status)], batch=False)
+
+    def publish_batch(self, subject: SensorStatusSubject, changes):
+        self._stage(subject, list(changes), batch=True)
+
+    def _stage(self, subject: SensorStatusSubject, changes, batch: bool):
+        db.session.add_all(
+            SensorStatusEvent(sensor_id=sensor_id, old_status=old_status,
+                              new_status=new_status, origin=self.worker_id)
+            for sensor_id, old_status, new_status in changes
+        )
+        # This worker's per-process observers hear about it once committed
+        db.session.info.setdefault(_PENDING, []).append((subject, changes, batch))
+
+    def _events_after(self, cursor: int):
+        return db.session.execute(
+            db.select(SensorStatusEvent.id, SensorStatusEvent.sensor_id,
+                      SensorStatusEvent.old_status, SensorStatusEvent.new_status,
+                      SensorStatusEvent.origin)
+              .where(SensorStatusEvent.id > cursor)
+              .order_by(SensorStatusEvent.id)
+              .limit(self.batch_size)
+        ).all()
+
+    def _load_cursor(self) -> int:
+        row = db.session.get(EventCursor, self.worker_id)
+        if row is not None:
+            return row.last_event_id
+        # A new worker starts at the head rather than replaying history
+        head = db.session.scalar(db.select(db.func.max(SensorStatusEvent.id))) or 0
+        db.session.add(EventCursor(worker_id=self.worker_id, last_event_id=head))
+        db.session.commit()
+        return head
+
+    def poll(self, subject: SensorStatusSubject) -> int:
+        """
+        Deliver pending events from other workers to the per-process
+        observers, one query per batch. Returns the number dispatched.
+        """
+        if self.cursor is None:
+            self.cursor = self._load_cursor()
+        delivered = 0
+        while True:
+            batch = self._events_after(self.cursor)
+            if not batch:
+                break
+            try:
+                for event_id, sensor_id, old_status, new_status, origin in batch:
+                    if origin != self.worker_id:
+                        subject.dispatch(sensor_id, old_status, new_status, deployment_wide=False)
+                        delivered += 1
+                    self.cursor = event_id
+            finally:
+                # Persist progress even if an observer failed part-way through
+                self._save_cursor()
+            if len(batch) < self.batch_size:
+                break
+        return delivered
+
+    def _save_cursor(self):
+        db.session.execute(
+            db.update(EventCursor)
+              .where(EventCursor.worker_id == self.worker_id)
+              .values(last_event_id=self.cursor, updated_at=datetime.utcnow())
+        )
+        db.session.commit()
+
+    def poll_shared(self, subject: SensorStatusSubject) -> int:
+        """
+        If this worker holds the shared cursor, deliver pending events from
+        all workers (this one included) to the deployment-wide observers.
+        Returns the number dispatched; 0 on workers that do not hold it.
+        """
+        cursor = self._acquire_shared_cursor()
+        if cursor is None:
+            return 0
+        delivered = 0
+        while True:
+            batch = self._events_after(cursor)
+            if not batch:
+                break
+            try:
+                for event_id, sensor_id, old_status, new_status, _ in batch:
+                    subject.dispatch(sensor_id, old_status, new_status, deployment_wide=True)
+                    delivered += 1
+                    cursor = event_id
+            finally:
+                self._save_shared_cursor(cursor)
+            if len(batch) < self.batch_size:
+                break
+        return delivered
+
+    def _acquire_shared_cursor(self):
+        """
+        Take or renew the shared cursor; returns its position, or None while
+        another worker holds it.
+        """
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            db.update(EventCursor)
+              .where(EventCursor.worker_id == SHARED_CURSOR)
+              .where(db.or_(EventCursor.holder == self.worker_id,
+                            EventCursor.holder.is_(None),
+                            EventCursor.updated_at < now - timedelta(seconds=self.lease_seconds)))
+              .values(holder=self.worker_id, updated_at=now)
+              .execution_options(synchronize_session=False)
+        ).rowcount
+        if claimed:
+            cursor = db.session.scalar(
+                db.select(EventCursor.last_event_id).where(EventCursor.worker_id == SHARED_CURSOR))
+            db.session.commit()
+            return cursor
+        exists = db.session.scalar(
+            db.select(EventCursor.worker_id).where(EventCursor.worker_id == SHARED_CURSOR))
+        if exists:
+            db.session.commit()
+            return None
+        # First holder starts at the head, like a new worker's own cursor
+        head = db.session.scalar(db.select(db.func.max(SensorStatusEvent.id))) or 0
+        db.session.add(EventCursor(worker_id=SHARED_CURSOR, last_event_id=head,
+                                   holder=self.worker_id, updated_at=now))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return None
+        return head
+
+    def _save_shared_cursor(self, cursor: int):
+        # Matches nothing if another worker has taken over meanwhile
+        db.session.execute(
+            db.update(EventCursor)
+              .where(EventCursor.worker_id == SHARED_CURSOR, EventCursor.holder == self.worker_id)
+              .values(last_event_id=cursor, updated_at=datetime.utcnow())
+              .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+
+def _commit_pending(session):
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        session.info.setdefault(_COMMITTED, []).extend(pending)
+
+
+def _discard_pending(session):
+    session.info.pop(_PENDING, None)
+
+
+def _dispatch_committed(session, transaction):
+    # Runs once the commit has finished, so observers may query again
+    if transaction.parent is not None:
+        return
+    for subject, changes, batch in session.info.pop(_COMMITTED, ()):
+        if batch:
+            subject.dispatch_batch(changes, deployment_wide=False)
+        else:
+            for sensor_id, old_status, new_status in changes:
+                subject.dispatch(sensor_id, old_status, new_status, deployment_wide=False)
+
+
+_EVENTS = (
+    ('after_commit', _commit_pending),
+    ('after_rollback', _discard_pending),
+    ('after_transaction_end', _dispatch_committed),
+)
+
+
+def register_outbox_events():
+    """
+    Dispatch outbox events to this worker's observers when their transaction
+    commits. Safe to call any number of times.
+    """
+    for name, listener in _EVENTS:
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
+
+
+def prune_status_events(retention_seconds: int = None) -> int:
+    """
+    Delete outbox events and idle worker cursors older than the retention period.
+    """
+    retention = retention_seconds or current_app.config.get('EVENT_BUS_RETENTION_SECONDS', 86400)
+    cutoff = datetime.utcnow() - timedelta(seconds=retention)
+    deleted = db.session.execute(
+        db.delete(SensorStatusEvent).where(SensorStatusEvent.created_at < cutoff)
+    ).rowcount
+    db.session.execute(db.delete(EventCursor).where(EventCursor.updated_at < cutoff))
+    db.session.commit()
+    return deleted
+
+
+def init_event_bus(app, subject: SensorStatusSubject = sensor_status_subject):
+    """
+    Install the transport selected by EVENT_BUS_BACKEND ('local' or 'outbox')
+    and, for the outbox, schedule polling and pruning on the app's scheduler.
+    """
+    backend = app.config.get('EVENT_BUS_BACKEND', 'local')
+    if backend == 'local':
+        subject.set_transport(InProcessTransport())
+        return
+    if backend != 'outbox':
+        raise ValueError(f"Unknown event bus backend: {backend}")
+
+    transport = OutboxTransport(
+        worker_id=app.config.get('EVENT_BUS_WORKER_ID'),
+        batch_size=app.config.get('EVENT_BUS_BATCH_SIZE', 500),
+        lease_seconds=app.config.get('EVENT_BUS_LEASE_SECONDS', 30)
+    )
+    subject.set_transport(transport)
+    register_outbox_events()
+
+    def poll():
+        transport.poll(subject)
+        transport.poll_shared(subject)
+
+    scheduler = app.extensions['scheduler']
+    scheduler.add_job('poll_status_events', poll, app.config.get('EVENT_BUS_POLL_INTERVAL', 1))
+    scheduler.add_job('prune_status_events', prune_status_events, 3600)
@@ -0,0 +1,156 @@
+"""
+Ranked full-text search over feedback comments.
+
+Keyword matching goes through the feedbacks_fts FTS5 index (see
+FEEDBACK_FTS_DDL in app.models), ranked by bm25; sensor, rating and date
+filters are applied to the joined feedbacks rows. FTS5 exists only on
+SQLite, so on other databases each keyword is matched with a
+case-insensitive LIKE instead, newest first and without snippets.
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from markupsafe import Markup, escape
+from sqlalchemy import column, literal_column, table
+
+from app import db
+from app.models import Feedback, FEEDBACK_FTS_DDL
+
+feedbacks_fts = table('feedbacks_fts', column('rowid'), column('comment'))
+
+# Snippet highlight markers; control characters never occur in comments
+MARK_START, MARK_END = '\x02', '\x03'
+MAX_PER_PAGE = 100
+
+
+@dataclass
+class FeedbackHit:
+    feedback: Feedback
+    rank: Optional[float] = None        # bm25, lower is better; None without keywords
+    snippet: Optional[str] = None
+
+    @property
+    def highlighted(self) -> Markup:
+        """
+        HTML-escaped snippet (or full comment) with matches in <mark> tags.
+        """
+        text = self.snippet if self.snippet is not None else (self.feedback.comment or '')
+        return Markup(str(escape(text)).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'))
+
+
+@dataclass
+class FeedbackSearchPage:
+    hits: List[FeedbackHit] = field(default_factory=list)
+    total: int = 0
+    page: int = 1
+    per_page: int = 25
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-self.total // self.per_page))
+
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 1
+
+    @property
+    def has_next(self) -> bool:
+        return self.page < self.pages
+
+
+def search_terms(keywords: str) -> List[Tuple[str, bool]]:
+    """
+    Split free text into (word, is_prefix) pairs, dropping quotes and *
+    from words. A trailing * marks a prefix search.
+    """
+    terms = []
+    for word in keywords.split():
+        prefix = word.endswith('*')
+        word = re.sub(r'["*]', '', word)
+        if re.search(r'\w', word):         # punctuation alone would match nothing
+            terms.append((word, prefix))
+    return terms
+
+
+def fts_query(keywords: str) -> str:
+    """
+    Turn free text into an FTS5 query: each word must match, quoted so that
+    FTS syntax characters in user input are taken literally. A trailing *
+    on a word keeps it as a prefix search.
+    """
+    return ' '.join(f'"{word}"' + ('*' if prefix else '') for word, prefix in search_terms(keywords))
+
+
+def has_fts_index() -> bool:
+    """
+    True if the database can use the FTS5 index, i.e. it is SQLite.
+    """
+    return db.session.get_bind().dialect.name == 'sqlite'
+
+
+def search_feedback(keywords: str = '', sensor_id: int = None, rating: str = None,
+                    since: datetime = None, until: datetime = None,
+                    page: int = 1, per_page: int = 25) -> FeedbackSearchPage:
+    """
+    One page of feedback matching all the given filters. With keywords the
+    results are ordered by relevance, otherwise newest first.
+    """
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    page = max(1, page)
+    filters = []
+    if sensor_id is not None:
+        filters.append(Feedback.sensor_id == sensor_id)
+    if rating:
+        filters.append(Feedback.rating == rating)
+    if since is not None:
+        filters.append(Feedback.submitted_at >= since)
+    if until is not None:
+        filters.append(Feedback.submitted_at < until)
+
+    match = fts_query(keywords or '')
+    if match and not has_fts_index():
+        # LIKE matches substrings, so every word already behaves as a prefix
+        filters.extend(Feedback.comment.icontains(word, autoescape=True)
+                       for word, _ in search_terms(keywords))
+        match = ''
+    if match:
+        fts = literal_column('feedbacks_fts')
+        rank = db.func.bm25(fts).label('rank')
+        snippet = db.func.snippet(fts, 0, MARK_START, MARK_END, '…', 16).label('snippet')
+        base = (
+            db.select(Feedback, rank, snippet)
+              .join(feedbacks_fts, feedbacks_fts.c.rowid == Feedback.id)
+              .where(fts.op('MATCH')(match))
+              .where(*filters)
+        )
+        order = (rank, Feedback.id.desc())
+    else:
+        base = db.select(Feedback, db.null(), db.null()).where(*filters)
+        order = (Feedback.submitted_at.desc(), Feedback.id.desc())
+
+    total = db.session.scalar(db.select(db.func.count()).select_from(base.subquery()))
+    rows = db.session.execute(
+        base.order_by(*order).limit(per_page).offset((page - 1) * per_page)
+    ).all()
+    return FeedbackSearchPage(
+        hits=[FeedbackHit(fb, rank, snippet) for fb, rank, snippet in rows],
+        total=total, page=page, per_page=per_page,
+    )
+
+
+def rebuild_feedback_index() -> bool:
+    """
+    (Re)create the FTS table and its triggers and index every comment, e.g.
+    for a database created before the index existed. Returns False, doing
+    nothing, on databases without FTS5.
+    """
+    if not has_fts_index():
+        return False
+    connection = db.session.connection()
+    for statement in FEEDBACK_FTS_DDL:
+        connection.exec_driver_sql(statement)
+    db.session.commit()
+    return True
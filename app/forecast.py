@@ -0,0 +1,261 @@
+"""
+Short-horizon temperature forecasts for every sensor at once.
+
+Each sensor has a small linear model
+
+    temperature(t) = a + b * t + c * (outdoor(t) - OUTDOOR_REFERENCE)
+
+fitted by weighted least squares. Only the sufficient statistics are kept:
+a 3x3 Gram matrix and a 3-vector per sensor, stacked into arrays indexed by
+sensor slot. New readings are folded in with np.add.at, older ones fade with
+an exponential half-life, and refitting all sensors is a single batched
+np.linalg.solve. Time is measured in hours relative to each sensor's latest
+reading, so the statistics stay well conditioned however long the app runs.
+A sensor whose latest reading is older than max_age_minutes is not
+forecast, and is refitted from stored history when it is seeded again.
+
+Ingest request threads and the scheduler thread share one forecaster, so
+slot assignment, array growth and accumulation all happen under its lock.
+
+Epoch seconds are taken from naive UTC datetimes with .timestamp(), the
+same as app.analysis, so "now" is datetime.utcnow().timestamp().
+"""
+
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from flask import current_app
+
+# Outdoor temperatures are centred on this (°C); a missing value counts as it
+OUTDOOR_REFERENCE = 10.0
+# Regularisation pulling the trend and outdoor terms towards zero when a
+# sensor's data cannot identify them (e.g. one reading, constant weather)
+RIDGE = 1e-3
+
+
+@dataclass(frozen=True)
+class Forecast:
+    temp: float               # predicted temperature at the horizon, °C
+    slope: float              # fitted trend, °C per hour
+    horizon_minutes: float
+
+
+class SensorForecaster:
+    """
+    Per-sensor trend-plus-outdoor models fitted in batches.
+    """
+    def __init__(self, half_life_minutes: float = 120.0, horizon_minutes: float = 30.0,
+                 min_readings: float = 3.0, max_age_minutes: float = None, capacity: int = 64):
+        self.decay_rate = math.log(2) / (half_life_minutes / 60.0)   # per hour
+        self.horizon_minutes = horizon_minutes
+        # By default a trend is trusted for three half-lives after the last reading
+        self.max_age_minutes = 3 * half_life_minutes if max_age_minutes is None else max_age_minutes
+        self.min_readings = min_readings
+        self._slots: Dict[int, int] = {}
+        self._gram = np.zeros((capacity, 3, 3))
+        self._moment = np.zeros((capacity, 3))
+        self._last = np.full(capacity, np.nan)    # epoch seconds of latest reading
+        self._coef = np.full((capacity, 3), np.nan)
+        self._dirty = np.zeros(capacity, dtype=bool)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'SensorForecaster':
+        return cls(
+            half_life_minutes=config.get('FORECAST_HALF_LIFE_MINUTES', 120),
+            horizon_minutes=config.get('FORECAST_HORIZON_MINUTES', 30),
+            min_readings=config.get('FORECAST_MIN_READINGS', 3),
+            max_age_minutes=config.get('FORECAST_MAX_AGE_MINUTES'),
+        )
+
+    def __contains__(self, sensor_id: int) -> bool:
+        slot = self._slots.get(sensor_id)
+        return slot is not None and self._gram[slot, 0, 0] > 0
+
+    def is_stale(self, sensor_id: int, now: float) -> bool:
+        """
+        True if the sensor's latest reading is older than max_age_minutes at `now`.
+        """
+        slot = self._slots.get(sensor_id)
+        return slot is not None and not now - self._last[slot] <= self.max_age_minutes * 60
+
+    def _reset(self, sensor_ids: Sequence[int]):
+        slots = self._slots_for(sensor_ids)
+        self._gram[slots] = 0.0
+        self._moment[slots] = 0.0
+        self._last[slots] = np.nan
+        self._coef[slots] = np.nan
+        self._dirty[slots] = False
+
+    def _slots_for(self, sensor_ids: Iterable[int]) -> np.ndarray:
+        sensor_ids = list(sensor_ids)
+        for sid in sensor_ids:
+            if sid not in self._slots:
+                self._slots[sid] = len(self._slots)
+        needed = len(self._slots)
+        if needed > len(self._last):
+            grow = max(needed, 2 * len(self._last)) - len(self._last)
+            self._gram = np.concatenate([self._gram, np.zeros((grow, 3, 3))])
+            self._moment = np.concatenate([self._moment, np.zeros((grow, 3))])
+            self._last = np.concatenate([self._last, np.full(grow, np.nan)])
+            self._coef = np.concatenate([self._coef, np.full((grow, 3), np.nan)])
+            self._dirty = np.concatenate([self._dirty, np.zeros(grow, dtype=bool)])
+        return np.fromiter((self._slots[sid] for sid in sensor_ids), dtype=np.intp, count=len(sensor_ids))
+
+    def observe(self, sensor_ids: Sequence[int], times: Sequence[float],
+                temps: Sequence[float], outdoor: Sequence[float] = None):
+        """
+        Fold a batch of readings into the models. times are epoch seconds and
+        outdoor the outdoor temperature at each reading (NaN or None if unknown).
+        Readings may be in any order and may be older than what was seen before.
+        """
+        with self._lock:
+            self._observe(sensor_ids, times, temps, outdoor)
+
+    def _observe(self, sensor_ids, times, temps, outdoor):
+        if not len(sensor_ids):
+            return
+        slots = self._slots_for(sensor_ids)
+        times = np.asarray(times, dtype=np.float64)
+        temps = np.asarray(temps, dtype=np.float64)
+        outdoor = (np.full(len(times), np.nan) if outdoor is None
+                   else np.asarray(outdoor, dtype=np.float64))
+        outdoor = np.where(np.isnan(outdoor), 0.0, outdoor - OUTDOOR_REFERENCE)
+
+        # Move each touched sensor's origin to its newest reading: re-express
+        # the stored statistics in the shifted frame, then age them
+        touched = np.unique(slots)
+        newest = np.full(len(self._last), -np.inf)
+        np.maximum.at(newest, slots, times)
+        old = self._last[touched]
+        new = np.where(np.isnan(old), newest[touched], np.fmax(old, newest[touched]))
+        shift = np.where(np.isnan(old), 0.0, (new - old) / 3600.0)
+        transform = np.tile(np.eye(3), (len(touched), 1, 1))
+        transform[:, 1, 0] = -shift
+        age = np.exp(-self.decay_rate * shift)
+        self._gram[touched] = (transform @ self._gram[touched] @ transform.transpose(0, 2, 1)) * age[:, None, None]
+        self._moment[touched] = np.einsum('nij,nj->ni', transform, self._moment[touched]) * age[:, None]
+        self._last[touched] = new
+
+        rel = (times - self._last[slots]) / 3600.0
+        weight = np.exp(self.decay_rate * rel)          # rel <= 0
+        rows = np.column_stack([np.ones(len(rel)), rel, outdoor])
+        np.add.at(self._gram, slots, weight[:, None, None] * rows[:, :, None] * rows[:, None, :])
+        np.add.at(self._moment, slots, (weight * temps)[:, None] * rows)
+        self._dirty[touched] = True
+
+    def seed(self, historical: Dict[int, List[Tuple[datetime, float]]], outdoor_data=None,
+             now: float = None):
+        """
+        Fit sensors the forecaster has no readings for, or only stale ones
+        (e.g. another worker has been ingesting them), from stored history
+        (sensor id -> [(timestamp, temperature), ...]).
+        """
+        now = datetime.utcnow().timestamp() if now is None else now
+        lookup = _outdoor_lookup(outdoor_data)
+        with self._lock:
+            stale = [sid for sid in historical if sid in self and self.is_stale(sid, now)]
+            if stale:
+                self._reset(stale)
+            ids, times, temps, outdoor = [], [], [], []
+            for sid, readings in historical.items():
+                if sid in self:
+                    continue
+                for ts, temp in readings:
+                    ids.append(sid)
+                    times.append(ts.timestamp())
+                    temps.append(temp)
+                    outdoor.append(lookup(ts))
+            self._observe(ids, times, temps, outdoor)
+
+    def _refit(self):
+        dirty = np.flatnonzero(self._dirty[:len(self._slots)])
+        if not len(dirty):
+            return
+        enough = dirty[self._gram[dirty, 0, 0] >= self.min_readings]
+        self._coef[dirty] = np.nan
+        if len(enough):
+            gram = self._gram[enough] + np.diag([0.0, RIDGE, RIDGE]) * self._gram[enough, :1, :1]
+            self._coef[enough] = np.linalg.solve(gram, self._moment[enough][:, :, None])[:, :, 0]
+        self._dirty[dirty] = False
+
+    def forecast(self, sensor_ids: Sequence[int], now: float = None,
+                 outdoor_temp: Optional[float] = None) -> Dict[int, Forecast]:
+        """
+        Forecast each sensor horizon_minutes after `now` (epoch seconds), given
+        the outdoor temperature expected then. Sensors without enough recent
+        readings, or whose latest reading is older than max_age_minutes, are
+        left out.
+        """
+        now = datetime.utcnow().timestamp() if now is None else now
+        with self._lock:
+            self._refit()
+            known = [sid for sid in sensor_ids if sid in self._slots and not self.is_stale(sid, now)]
+            if not known:
+                return {}
+            slots = self._slots_for(known)
+            coef = self._coef[slots]
+            at = (now - self._last[slots]) / 3600.0 + self.horizon_minutes / 60.0
+        out = 0.0 if outdoor_temp is None else outdoor_temp - OUTDOOR_REFERENCE
+        temps = coef[:, 0] + coef[:, 1] * at + coef[:, 2] * out
+        return {
+            sid: Forecast(round(temp, 2), round(slope, 3), self.horizon_minutes)
+            for sid, temp, slope in zip(known, temps.tolist(), coef[:, 1].tolist())
+            if math.isfinite(temp)
+        }
+
+
+def _outdoor_lookup(outdoor_data):
+    """
+    Return ts -> outdoor temperature (or None), memoised per timestamp.
+    """
+    if not outdoor_data:
+        return lambda ts: None
+    seen = {}
+
+    def lookup(ts):
+        if ts not in seen:
+            seen[ts] = outdoor_data.nearest(ts).temp
+        return seen[ts]
+    return lookup
+
+
+def observe_readings(readings: Iterable[Tuple[int, datetime, float]], outdoor_data=None):
+    """
+    Feed ingested (sensor_id, timestamp, temperature) readings to the app's forecaster.
+    """
+    lookup = _outdoor_lookup(outdoor_data)
+    ids, times, temps, outdoor = [], [], [], []
+    for sid, ts, temp in readings:
+        ids.append(sid)
+        times.append(ts.timestamp())
+        temps.append(temp)
+        outdoor.append(lookup(ts))
+    get_forecaster().observe(ids, times, temps, np.array(outdoor, dtype=np.float64))
+
+
+def forecast_sensors(sensor_ids: Sequence[int], historical, outdoor_data=None,
+                     now: datetime = None) -> Dict[int, Forecast]:
+    """
+    Forecast the given sensors, first fitting any the app's forecaster has not
+    seen from `historical` (sensor id -> [(timestamp, temperature), ...]).
+    """
+    forecaster = get_forecaster()
+    now = now or datetime.utcnow()
+    forecaster.seed(historical, outdoor_data, now.timestamp())
+    ahead = outdoor_data.nearest(now + timedelta(minutes=forecaster.horizon_minutes)) if outdoor_data else None
+    return forecaster.forecast(sensor_ids, now.timestamp(), ahead.temp if ahead else None)
+
+
+def get_forecaster() -> SensorForecaster:
+    """
+    Return the app's forecaster, creating it from config on first use.
+    """
+    forecaster = current_app.extensions.get('forecaster')
+    if forecaster is None:
+        forecaster = current_app.extensions['forecaster'] = SensorForecaster.from_config(current_app.config)
+    return forecaster
@@ -3,11 +3,13 @@ Flask-WTF form definitions for Campus IoT Management.
 """
 
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileRequired, FileAllowed
 from wtforms import (
     StringField, PasswordField, BooleanField,
-    SubmitField, HiddenField, TextAreaField, SelectField
+    SubmitField, HiddenField, TextAreaField, SelectField,
+    FloatField, DateTimeLocalField, DateField
 )
-from wtforms.validators import DataRequired, Length, Optional
+from wtforms.validators import DataRequired, Length, Optional, NumberRange
 
 
 class LoginForm(FlaskForm):
@@ -34,6 +36,22 @@ class SensorForm(FlaskForm):
         'Location',
         validators=[DataRequired(), Length(max=128)]
     )
+    building = StringField(
+        'Building',
+        validators=[Optional(), Length(max=64)]
+    )
+    floor = StringField(
+        'Floor',
+        validators=[Optional(), Length(max=16)]
+    )
+    room = StringField(
+        'Room',
+        validators=[Optional(), Length(max=64)]
+    )
+    heating_zone = StringField(
+        'Heating Zone',
+        validators=[Optional(), Length(max=128)]
+    )
     status = SelectField(
         'Status',
         choices=[('online','Online'), ('offline','Offline')],
@@ -42,6 +60,47 @@ class SensorForm(FlaskForm):
     submit = SubmitField('Save Sensor')
 
 
+class SensorImportForm(FlaskForm):
+    """Creates many sensors from an uploaded CSV file (admin only)."""
+    file = FileField(
+        'Sensor CSV',
+        validators=[FileRequired(), FileAllowed(['csv'], 'CSV files only')],
+        description='Columns: name, location, and optionally status, building, floor, room, heating_zone.'
+    )
+    default_status = SelectField(
+        'Status for rows without one',
+        choices=[('offline','Offline'), ('online','Online')],
+        validators=[DataRequired()]
+    )
+    submit = SubmitField('Import Sensors')
+
+
+class BulkStatusForm(FlaskForm):
+    """Sets the status of every sensor in a building or location (admin only)."""
+    building = StringField(
+        'Building',
+        validators=[Optional(), Length(max=64)]
+    )
+    location_prefix = StringField(
+        'Location starts with',
+        validators=[Optional(), Length(max=128)]
+    )
+    status = SelectField(
+        'New Status',
+        choices=[('online','Online'), ('offline','Offline')],
+        validators=[DataRequired()]
+    )
+    submit = SubmitField('Apply to Sensors')
+
+    def validate(self, extra_validators=None):
+        if not super().validate(extra_validators):
+            return False
+        if not (self.building.data or self.location_prefix.data):
+            self.building.errors.append('Enter a building or a location prefix.')
+            return False
+        return True
+
+
 class CalibrationForm(FlaskForm):
     """Records a calibration event for a sensor (admin only)."""
     sensor_id = HiddenField(validators=[DataRequired()])
@@ -49,6 +108,19 @@ class CalibrationForm(FlaskForm):
         'Calibration Notes',
         validators=[Optional(), Length(max=512)]
     )
+    offset = FloatField(
+        'Offset (°C)',
+        validators=[Optional(), NumberRange(min=-20, max=20)]
+    )
+    gain = FloatField(
+        'Gain',
+        validators=[Optional(), NumberRange(min=0.5, max=2.0)]
+    )
+    effective_from = DateTimeLocalField(
+        'Effective From (UTC, default now)',
+        format='%Y-%m-%dT%H:%M',
+        validators=[Optional()]
+    )
     submit = SubmitField('Calibrate')
 
 
@@ -57,6 +129,7 @@ class FeedbackForm(FlaskForm):
     sensor_id = SelectField(
         'Select Room/Sensor',
         coerce=int,
+        validate_choice=False,      # checked against the database on submit
         validators=[DataRequired()]
     )
     rating = SelectField(
@@ -71,6 +144,30 @@ class FeedbackForm(FlaskForm):
     submit = SubmitField('Submit Feedback')
 
 
+class FeedbackSearchForm(FlaskForm):
+    """Admin search over feedback; submitted by GET so results can be linked."""
+    class Meta:
+        csrf = False
+
+    q = StringField(
+        'Keywords',
+        validators=[Optional(), Length(max=200)]
+    )
+    sensor_id = SelectField(
+        'Sensor',
+        coerce=int,
+        validators=[Optional()]
+    )
+    rating = SelectField(
+        'Rating',
+        choices=[('', 'Any'), ('hot','Hot'), ('ok','OK'), ('cold','Cold')],
+        validators=[Optional()]
+    )
+    since = DateField('From', validators=[Optional()])
+    until = DateField('To (inclusive)', validators=[Optional()])
+    submit = SubmitField('Search')
+
+
 class ActionForm(FlaskForm):
     """
     Generic hidden-field form for actions like removing a sensor or calibrating.
@@ -0,0 +1,76 @@
+"""
+Sensor heartbeats: bulk last_seen updates and the staleness sweep.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict
+
+from flask import current_app
+
+from app import db
+from app.models import Sensor
+from app.snapshot import mark_dashboard_stale
+
+
+def record_heartbeats(latest: Dict[int, datetime]):
+    """
+    Advance last_seen for many sensors with one executemany UPDATE.
+    last_seen never moves backwards, so backfilled readings are harmless.
+    """
+    if not latest:
+        return
+    table = Sensor.__table__
+    stmt = (
+        db.update(table)
+          .where(table.c.id == db.bindparam('sid'))
+          .where(db.or_(table.c.last_seen.is_(None), table.c.last_seen < db.bindparam('seen')))
+          .values(last_seen=db.bindparam('seen'))
+    )
+    db.session.execute(stmt, [{'sid': sid, 'seen': ts} for sid, ts in latest.items()])
+
+
+def recent_heartbeats(latest: Dict[int, datetime], now: datetime = None) -> Dict[int, datetime]:
+    """
+    The entries of `latest` within SENSOR_TIMEOUT_SECONDS of now. Older
+    timestamps (historical backfills) say nothing about a sensor being alive.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(seconds=current_app.config.get('SENSOR_TIMEOUT_SECONDS', 900))
+    return {sid: ts for sid, ts in latest.items() if ts >= cutoff}
+
+
+def revive_reporting_sensors(latest: Dict[int, datetime], exclude=(), now: datetime = None) -> int:
+    """
+    Move offline sensors that have just reported (within SENSOR_TIMEOUT_SECONDS
+    of now) back to online, with one batched notification. Sensors in
+    `exclude` (e.g. currently faulty) are left alone. Returns the number moved.
+    """
+    ids = [sid for sid in recent_heartbeats(latest, now) if sid not in exclude]
+    if not ids:
+        return 0
+    offline = db.session.scalars(
+        db.select(Sensor).where(Sensor.id.in_(ids)).where(Sensor.status == 'offline')
+    ).all()
+    return Sensor.set_statuses(offline, 'online')
+
+
+def sweep_stale_sensors(now: datetime = None) -> int:
+    """
+    Mark sensors that have not reported within SENSOR_TIMEOUT_SECONDS as
+    offline in a single transaction. Sensors that have never reported are
+    left alone. Returns the number of sensors transitioned.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(seconds=current_app.config.get('SENSOR_TIMEOUT_SECONDS', 900))
+    # Served by the (status, last_seen) index
+    stale = db.session.scalars(
+        db.select(Sensor)
+          .where(Sensor.status.in_(('online', 'faulty')))
+          .where(Sensor.last_seen < cutoff)
+    ).all()
+    # One batched notification for the whole sweep
+    Sensor.set_statuses(stale, 'offline')
+    if stale:
+        mark_dashboard_stale()
+        db.session.commit()
+    return len(stale)
@@ -0,0 +1,100 @@
+"""
+Queries over stored temperature readings.
+
+Readings are re-calibrated from their raw values with the current
+coefficients, so a backdated calibration also corrects history that was
+ingested before it was recorded. Readings older than the archive cutoff
+are read from the column files in app.archive and merged in.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app import db
+from app.models import TemperatureReading
+from app.archive import get_reading_archive
+from app.calibration import correct_readings
+
+
+def _calibrated(sensor_ids: Sequence[int], timestamps: Sequence[datetime],
+                temps: Sequence[float], raws: Sequence[float]) -> List[float]:
+    """
+    Apply calibration to rows that kept their raw value; rows without one
+    (loaded before raw values were stored) are returned as stored.
+    """
+    if not sensor_ids:
+        return []
+    raw = np.array(raws, dtype=np.float64)          # None -> NaN
+    corrected = correct_readings(sensor_ids, timestamps, np.where(np.isnan(raw), 0.0, raw))
+    return np.where(np.isnan(raw), np.asarray(temps, dtype=np.float64), corrected).tolist()
+
+
+def latest_temperatures(max_age_seconds: int = 3600) -> Dict[int, float]:
+    """
+    Map sensor id -> most recent temperature, for sensors that reported
+    within max_age_seconds. Uses the (sensor_id, timestamp) index.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+    latest = (
+        db.select(TemperatureReading.sensor_id, db.func.max(TemperatureReading.timestamp).label('ts'))
+          .where(TemperatureReading.timestamp >= cutoff)
+          .group_by(TemperatureReading.sensor_id)
+          .subquery()
+    )
+    rows = db.session.execute(
+        db.select(TemperatureReading.sensor_id, TemperatureReading.timestamp,
+                  TemperatureReading.temperature, TemperatureReading.raw_temperature)
+          .join(latest, db.and_(TemperatureReading.sensor_id == latest.c.sensor_id,
+                                TemperatureReading.timestamp == latest.c.ts))
+    ).all()
+    if not rows:
+        return {}
+    sensor_ids, timestamps, temps, raws = zip(*rows)
+    return dict(zip(sensor_ids, _calibrated(sensor_ids, timestamps, temps, raws)))
+
+
+def load_historical_temps(since: datetime, until: datetime = None,
+                          sensor_ids: Sequence[int] = None) -> Dict[int, List[Tuple[datetime, float]]]:
+    """
+    Map sensor id -> [(timestamp, temperature), ...] for readings since
+    `since` (and before `until`), from the live table and the archive.
+    Pass sensor_ids to limit the result to those sensors.
+    """
+    query = (
+        db.select(TemperatureReading.sensor_id, TemperatureReading.timestamp,
+                  TemperatureReading.temperature, TemperatureReading.raw_temperature)
+          .where(TemperatureReading.timestamp >= since)
+          .order_by(TemperatureReading.sensor_id, TemperatureReading.timestamp)
+    )
+    if until is not None:
+        query = query.where(TemperatureReading.timestamp < until)
+    if sensor_ids is not None:
+        query = query.where(TemperatureReading.sensor_id.in_(sensor_ids))
+    rows = db.session.execute(query).all()
+    archived = _archived_rows(since, until, sensor_ids)
+    if archived:
+        rows = sorted(archived + list(rows), key=lambda row: (row[0], row[1]))
+    if not rows:
+        return {}
+    sensor_ids, timestamps, temps, raws = zip(*rows)
+    historical = {}
+    for sensor_id, ts, temp in zip(sensor_ids, timestamps, _calibrated(sensor_ids, timestamps, temps, raws)):
+        historical.setdefault(sensor_id, []).append((ts, temp))
+    return historical
+
+
+def _archived_rows(since: datetime, until: datetime = None, sensor_ids: Sequence[int] = None) -> list:
+    """
+    (sensor_id, timestamp, temperature, raw) rows from the archive; empty
+    when the whole range is still in the live table.
+    """
+    archive = get_reading_archive()
+    archived_before = archive.archived_before
+    if archived_before is None or since >= archived_before:
+        return []
+    until = archived_before if until is None else min(until, archived_before)
+    return [(sensor_id, ts, temp, raw)
+            for sensor_id in (archive.sensor_ids() if sensor_ids is None else sensor_ids)
+            for ts, temp, raw in archive.read(sensor_id, since, until)]
@@ -0,0 +1,206 @@
+"""
+Batch model inference over SensorFeatureVector lists.
+
+A ModelRunner scores a whole batch at once. Rows whose features have not
+changed since they were last scored are served from a cache keyed by a
+hash of the feature row; only the misses are sent to the model. The
+built-in linear model is cheaper to run than to ship to another process,
+so scoring is inline by default; set INFERENCE_WORKERS > 0 for a process
+pool when a CPU-bound model would block request threads.
+"""
+
+import atexit
+import hashlib
+import json
+import math
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from flask import current_app
+
+# Features fed to models, in column order
+FEATURE_FIELDS = (
+    'current_temp', 'avg_temp_1h', 'hot_score', 'cold_score', 'ok_score',
+    'outdoor_temp', 'outdoor_humidity',
+)
+
+
+def feature_row(vector) -> tuple:
+    """
+    Numeric feature row for one vector; missing values become NaN. Values are
+    rounded so insignificant drift (e.g. decaying scores) still hits the cache.
+    """
+    row = []
+    for name in FEATURE_FIELDS:
+        value = getattr(vector, name, None)
+        row.append(float('nan') if value is None else round(float(value), 2))
+    return tuple(row)
+
+
+class ComfortModel:
+    """
+    Interface for models that score a batch of feature rows.
+    """
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Return one prediction per row of an (n, len(FEATURE_FIELDS)) array.
+        """
+        raise NotImplementedError
+
+    @property
+    def version(self) -> str:
+        """
+        Identifies the model's parameters; part of every cache key.
+        """
+        raise NotImplementedError
+
+
+class LinearComfortModel(ComfortModel):
+    """
+    Linear regression predicting the thermostat change (°C) a room needs.
+    Missing features are replaced by the column means seen in fit().
+    """
+    # Untrained default: pull towards 22 °C, nudged by net feedback
+    DEFAULT_COEF = (-0.5, 0.0, -0.3, 0.3, 0.0, 0.0, 0.0)
+    DEFAULT_INTERCEPT = 11.0
+    DEFAULT_MEANS = (22.0, 22.0, 0.0, 0.0, 0.0, 10.0, 60.0)
+
+    def __init__(self, coef: Sequence[float] = None, intercept: float = None,
+                 means: Sequence[float] = None):
+        self.coef = np.asarray(coef if coef is not None else self.DEFAULT_COEF, dtype=np.float64)
+        self.intercept = float(self.DEFAULT_INTERCEPT if intercept is None else intercept)
+        self.means = np.asarray(means if means is not None else self.DEFAULT_MEANS, dtype=np.float64)
+
+    @property
+    def version(self) -> str:
+        params = np.concatenate([self.coef, [self.intercept], self.means])
+        return 'linear-' + hashlib.blake2b(params.tobytes(), digest_size=8).hexdigest()
+
+    def _fill(self, rows: np.ndarray) -> np.ndarray:
+        rows = np.array(rows, dtype=np.float64)
+        missing = np.isnan(rows)
+        rows[missing] = np.broadcast_to(self.means, rows.shape)[missing]
+        return rows
+
+    def fit(self, rows: np.ndarray, targets: Sequence[float]) -> 'LinearComfortModel':
+        """
+        Least-squares fit with an intercept.
+        """
+        rows = np.asarray(rows, dtype=np.float64)
+        counts = (~np.isnan(rows)).sum(axis=0)
+        self.means = np.divide(np.nansum(rows, axis=0), counts,
+                               out=np.zeros(rows.shape[1]), where=counts > 0)
+        design = np.column_stack([self._fill(rows), np.ones(len(rows))])
+        solution, *_ = np.linalg.lstsq(design, np.asarray(targets, dtype=np.float64), rcond=None)
+        self.coef, self.intercept = solution[:-1], float(solution[-1])
+        return self
+
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        return self._fill(rows) @ self.coef + self.intercept
+
+    def save(self, path: str):
+        with open(path, 'w') as fh:
+            json.dump({'coef': self.coef.tolist(), 'intercept': self.intercept,
+                       'means': self.means.tolist()}, fh)
+
+    @classmethod
+    def load(cls, path: str) -> 'LinearComfortModel':
+        with open(path) as fh:
+            params = json.load(fh)
+        return cls(params['coef'], params['intercept'], params['means'])
+
+
+_MISSING = object()
+
+# --- process-pool workers hold their own copy of the model ---
+_worker_model: Optional[ComfortModel] = None
+
+
+def _init_worker(model: ComfortModel):
+    global _worker_model
+    _worker_model = model
+
+
+def _predict_in_worker(rows: np.ndarray) -> np.ndarray:
+    return _worker_model.predict(rows)
+
+
+class ModelRunner:
+    """
+    Scores batches of feature vectors with caching and an optional process pool.
+    """
+    def __init__(self, model: ComfortModel, workers: int = 0, cache_size: int = 100000):
+        self.model = model
+        self.workers = workers
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[bytes, float]' = OrderedDict()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, row: tuple) -> bytes:
+        return hashlib.blake2b(np.asarray(row, dtype=np.float64).tobytes()
+                               + self.model.version.encode(), digest_size=16).digest()
+
+    def _run(self, rows: np.ndarray) -> np.ndarray:
+        if not self.workers:
+            return self.model.predict(rows)
+        if self._pool is None:
+            # spawn: forking a threaded web server process is not safe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker, initargs=(self.model,)
+            )
+            atexit.register(self.close)
+        chunks = np.array_split(rows, min(self.workers, len(rows)))
+        return np.concatenate(list(self._pool.map(_predict_in_worker, chunks)))
+
+    def predict(self, vectors: List) -> Dict[int, float]:
+        """
+        Return {sensor_id: prediction} for a batch of feature vectors.
+        """
+        rows = [feature_row(v) for v in vectors]
+        keys = [self._key(row) for row in rows]
+        results: Dict[int, float] = {}
+        todo = []
+        for vector, row, key in zip(vectors, rows, keys):
+            cached = self._cache.get(key, _MISSING)
+            if cached is _MISSING:
+                todo.append((vector.sensor_id, row, key))
+            else:
+                self._cache.move_to_end(key)
+                results[vector.sensor_id] = cached
+        self.hits += len(vectors) - len(todo)
+        self.misses += len(todo)
+        if todo:
+            predictions = self._run(np.array([row for _, row, _ in todo], dtype=np.float64))
+            for (sensor_id, _, key), value in zip(todo, predictions.tolist()):
+                value = round(value, 2) if math.isfinite(value) else None
+                results[sensor_id] = value
+                self._cache[key] = value
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return results
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            atexit.unregister(self.close)
+
+
+def get_model_runner() -> ModelRunner:
+    """
+    Return the app's model runner, built from INFERENCE_* config on first use.
+    """
+    runner = current_app.extensions.get('model_runner')
+    if runner is None:
+        path = current_app.config.get('INFERENCE_MODEL_PATH')
+        model = LinearComfortModel.load(path) if path else LinearComfortModel()
+        runner = ModelRunner(model, workers=current_app.config.get('INFERENCE_WORKERS', 0))
+        current_app.extensions['model_runner'] = runner
+    return runner
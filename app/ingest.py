@@ -0,0 +1,131 @@
+"""
+Ingestion of temperature readings posted by sensors.
+"""
+
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterable, List, Tuple
+
+from app import db
+from app.models import Sensor, TemperatureReading
+from app.anomaly import get_anomaly_monitor, RECOVERED
+from app.calibration import correct_readings
+from app.heartbeat import record_heartbeats, revive_reporting_sensors
+from app.forecast import observe_readings
+from app.weather import get_outdoor_timeline
+from app.snapshot import mark_dashboard_stale
+from app.live_table import get_live_table
+
+Reading = Tuple[int, datetime, float]
+
+
+@dataclass
+class IngestResult:
+    accepted: int = 0
+    rejected: int = 0
+    faults: dict = field(default_factory=dict)   # sensor_id -> reason
+
+
+def parse_timestamp(value) -> datetime:
+    """
+    Parse an ISO 8601 timestamp into a naive UTC datetime (missing -> now).
+    """
+    if not value:
+        return datetime.utcnow()
+    ts = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def parse_readings(payload) -> Tuple[List[Reading], int]:
+    """
+    Turn a JSON payload (one reading object, a list, or {'readings': [...]})
+    into (sensor_id, timestamp, temperature) tuples. Returns (readings, invalid_count).
+    """
+    if isinstance(payload, dict):
+        items = payload.get('readings', [payload])
+    else:
+        items = payload or []
+    readings, invalid = [], 0
+    for item in items:
+        try:
+            temp = float(item['temperature'])
+            if not math.isfinite(temp):
+                raise ValueError(temp)
+            readings.append((int(item['sensor_id']), parse_timestamp(item.get('timestamp')), temp))
+        except (KeyError, TypeError, ValueError):
+            invalid += 1
+    return readings, invalid
+
+
+def ingest_readings(readings: Iterable[Reading]) -> IngestResult:
+    """
+    Store a batch of readings in one transaction, calibrated with the cached
+    per-sensor coefficients, advance each sensor's last_seen heartbeat and
+    run the calibrated values through the anomaly monitor. The newest value
+    per sensor is published to the shared live table after the commit.
+    Readings from healthy sensors also update the sensors' forecasts.
+    Sensors that start or stop misbehaving are moved to/from 'faulty', and
+    offline sensors that report again are moved back to 'online', through
+    Sensor.set_status(es), which notifies the status observers.
+    """
+    readings = sorted(readings, key=lambda r: r[1])
+    result = IngestResult()
+    if not readings:
+        return result
+
+    ids = {sid for sid, _, _ in readings}
+    known = set(db.session.scalars(db.select(Sensor.id).where(Sensor.id.in_(ids))))
+
+    accepted = [r for r in readings if r[0] in known]
+    result.rejected = len(readings) - len(accepted)
+    # Calibrate the whole batch at once; the raw value is kept alongside
+    corrected = correct_readings([r[0] for r in accepted], [r[1] for r in accepted],
+                                 [r[2] for r in accepted]).tolist()
+
+    rows = []
+    healthy = []
+    events = {}
+    latest = {}
+    live = {}
+    monitor = get_anomaly_monitor()
+    for (sid, ts, raw), temp in zip(accepted, corrected):
+        rows.append({'sensor_id': sid, 'timestamp': ts, 'temperature': temp, 'raw_temperature': raw})
+        latest[sid] = ts
+        live[sid] = (ts, temp)
+        event = monitor.observe(sid, ts.timestamp(), temp)
+        if event is not None:
+            events[sid] = event
+        if not monitor.is_faulty(sid):
+            healthy.append((sid, ts, temp))
+    result.accepted = len(rows)
+
+    if rows:
+        db.session.execute(db.insert(TemperatureReading), rows)
+        record_heartbeats(latest)
+        observe_readings(healthy, get_outdoor_timeline())
+        mark_dashboard_stale()
+
+    # Only sensors whose health changed in this batch are loaded
+    if events:
+        for sensor in db.session.scalars(db.select(Sensor).where(Sensor.id.in_(events))):
+            event = events[sensor.id]
+            if event == RECOVERED:
+                if sensor.status == 'faulty':
+                    sensor.set_status('online')
+            else:
+                result.faults[sensor.id] = event
+                sensor.set_status('faulty')
+
+    # Sensors swept offline for silence come back once they report again
+    if latest and revive_reporting_sensors(latest, exclude={sid for sid in latest if monitor.is_faulty(sid)}):
+        mark_dashboard_stale()
+    db.session.commit()
+
+    # Publish the newest value per sensor to the other workers once committed
+    table = get_live_table()
+    if table is not None and live:
+        table.record_readings(live)
+    return result
@@ -0,0 +1,276 @@
+"""
+Shared-memory table of each sensor's latest temperature, last-seen time and
+status.
+
+The table is a memory-mapped file with a fixed layout: a 64-byte header and
+one 40-byte slot per sensor, slot index = sensor id. Every worker process
+maps the same file, so a value written by the process that ingested a
+reading is visible to all of them without a database query.
+
+Each slot is guarded by a seqlock. A writer makes the slot's sequence number
+odd, writes the fields and makes it even again. Readers copy a batch of
+slots and accept those whose sequence was even and unchanged across the
+copy; the rest are re-read. Writers from different processes are serialised
+with flock on the file, so readers never take a lock.
+
+The layout relies on aligned 4- and 8-byte stores not tearing and on stores
+becoming visible in program order, which holds for the x86-64 and ARM64
+servers this runs on.
+"""
+
+import fcntl
+import mmap
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from flask import current_app
+from sqlalchemy.engine import make_url
+
+MAGIC = b'CIOTLIV1'
+HEADER_SIZE = 64
+STATUSES = ('', 'online', 'offline', 'faulty')
+STATUS_CODES = {name: code for code, name in enumerate(STATUSES)}
+EPOCH = datetime(1970, 1, 1)
+
+SLOT = np.dtype([
+    ('seq', '<u4'),           # odd while a write is in progress
+    ('sensor_id', '<u4'),     # 0 = slot never written
+    ('temp', '<f8'),          # NaN if no reading yet
+    ('temp_at', '<f8'),       # epoch seconds of that reading
+    ('last_seen', '<f8'),     # epoch seconds, NaN if never seen
+    ('status', 'u1'),         # index into STATUSES
+    ('_pad', 'V7'),
+])
+assert SLOT.itemsize == 40
+
+
+class LiveValue:
+    __slots__ = ('temp', 'temp_at', 'last_seen', 'status')
+
+    def __init__(self, temp, temp_at, last_seen, status):
+        self.temp = temp
+        self.temp_at = temp_at
+        self.last_seen = last_seen
+        self.status = status
+
+
+def _epoch(ts: Optional[datetime]) -> float:
+    return float('nan') if ts is None else (ts - EPOCH).total_seconds()
+
+
+def _datetime(epoch: float) -> Optional[datetime]:
+    return None if epoch != epoch else EPOCH + timedelta(seconds=epoch)
+
+
+class LiveTable:
+    """
+    One mapping of the shared table file.
+    """
+    def __init__(self, path: str, slots: int = 65536):
+        self.path = path
+        self.slots = slots
+        size = HEADER_SIZE + slots * SLOT.itemsize
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._lock = threading.Lock()        # flock is per open file, not per thread
+        with self._writer():
+            self.created = os.fstat(self._fd).st_size < size or os.pread(self._fd, 8, 0) != MAGIC
+            if self.created:
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, MAGIC + np.uint64(slots).tobytes(), 0)
+        self._mmap = mmap.mmap(self._fd, size)
+        self._slots = np.frombuffer(self._mmap, dtype=SLOT, count=slots, offset=HEADER_SIZE)
+
+    def close(self):
+        self._slots = None
+        self._mmap.close()
+        os.close(self._fd)
+
+    @contextmanager
+    def _writer(self):
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _index(self, sensor_ids: Iterable[int]) -> np.ndarray:
+        ids = np.unique(np.fromiter(sensor_ids, dtype=np.int64))
+        return ids[(ids > 0) & (ids < self.slots)]
+
+    def _store(self, idx: np.ndarray, **fields):
+        """
+        Seqlock write of the given fields for slots `idx` (unique, in range).
+        The caller holds the writer lock.
+        """
+        slots = self._slots
+        slots['seq'][idx] += 1
+        fresh = idx[slots['sensor_id'][idx] == 0]
+        slots['temp'][fresh] = slots['temp_at'][fresh] = slots['last_seen'][fresh] = np.nan
+        slots['status'][fresh] = 0
+        slots['sensor_id'][idx] = idx
+        for name, values in fields.items():
+            slots[name][idx] = values
+        slots['seq'][idx] += 1
+
+    def record_readings(self, latest: Dict[int, Tuple[datetime, float]]):
+        """
+        Store each sensor's newest (timestamp, temperature), unless the table
+        already holds a newer one. The reading also counts as last seen.
+        """
+        latest = {sid: v for sid, v in latest.items() if 0 < sid < self.slots}
+        if not latest:
+            return
+        idx = np.fromiter(latest, dtype=np.int64)
+        at = np.array([_epoch(ts) for ts, _ in latest.values()])
+        temps = np.array([temp for _, temp in latest.values()], dtype=np.float64)
+        with self._writer():
+            slots = self._slots
+            written = slots['sensor_id'][idx] != 0
+            current = np.where(written, slots['temp_at'][idx], np.nan)
+            newer = ~(current > at)                      # NaN compares False
+            idx, at, temps = idx[newer], at[newer], temps[newer]
+            seen = np.where(written[newer], np.fmax(slots['last_seen'][idx], at), at)
+            self._store(idx, temp=temps, temp_at=at, last_seen=seen)
+
+    def record_statuses(self, statuses: Dict[int, str]):
+        idx = self._index(statuses)
+        codes = np.array([STATUS_CODES.get(statuses[int(sid)], 0) for sid in idx], dtype=np.uint8)
+        with self._writer():
+            self._store(idx, status=codes)
+
+    def load(self, rows: Iterable[tuple]):
+        """
+        Overwrite slots from (sensor_id, status, last_seen, temp, temp_at) rows.
+        """
+        rows = [row for row in rows if 0 < row[0] < self.slots]
+        if not rows:
+            return
+        ids, statuses, seen, temps, temp_at = zip(*rows)
+        with self._writer():
+            self._store(
+                np.array(ids, dtype=np.int64),
+                status=np.array([STATUS_CODES.get(s, 0) for s in statuses], dtype=np.uint8),
+                last_seen=np.array([_epoch(ts) for ts in seen]),
+                temp=np.array([np.nan if t is None else t for t in temps], dtype=np.float64),
+                temp_at=np.array([_epoch(ts) for ts in temp_at]),
+            )
+
+    def replace(self, rows: Iterable[tuple]):
+        """
+        Load `rows` (as in load()) and empty the slots of every other sensor.
+        """
+        rows = list(rows)
+        keep = {row[0] for row in rows}
+        self.clear(sid for sid in np.flatnonzero(self._slots['sensor_id']).tolist() if sid not in keep)
+        self.load(rows)
+
+    def clear(self, sensor_ids: Iterable[int]):
+        """
+        Empty the slots of removed sensors.
+        """
+        idx = self._index(sensor_ids)
+        with self._writer():
+            self._slots['seq'][idx] += 1
+            self._slots['sensor_id'][idx] = 0
+            self._slots['seq'][idx] += 1
+
+    def snapshot(self, sensor_ids: Iterable[int], retries: int = 100) -> Dict[int, LiveValue]:
+        """
+        Consistent values for the given sensors, without any locking. Slots
+        caught mid-write are re-read; sensors with no slot are left out.
+        """
+        idx = self._index(sensor_ids)
+        result = {}
+        for _ in range(retries):
+            if not len(idx):
+                break
+            before = self._slots['seq'][idx].copy()
+            rows = self._slots[idx].copy()               # fancy indexing copies
+            after = self._slots['seq'][idx]
+            stable = (before == after) & (before % 2 == 0)
+            for row in rows[stable & (rows['sensor_id'] != 0)]:
+                result[int(row['sensor_id'])] = LiveValue(
+                    None if np.isnan(row['temp']) else float(row['temp']),
+                    _datetime(float(row['temp_at'])),
+                    _datetime(float(row['last_seen'])),
+                    STATUSES[row['status']] or None,
+                )
+            idx = idx[~stable]
+        return result
+
+
+def fresh_temperatures(values: Dict[int, LiveValue], max_age_seconds: int = 3600,
+                       now: datetime = None) -> Dict[int, float]:
+    """
+    Map sensor id -> temperature for values read within max_age_seconds,
+    the same cut-off as app.history.latest_temperatures.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=max_age_seconds)
+    return {sid: v.temp for sid, v in values.items()
+            if v.temp is not None and v.temp_at is not None and v.temp_at >= cutoff}
+
+
+def live_table_path(config) -> Optional[str]:
+    """
+    LIVE_TABLE_PATH, or a file beside a SQLite database; None disables the table.
+    """
+    if config.get('LIVE_TABLE_PATH'):
+        return config['LIVE_TABLE_PATH']
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:'):
+        return url.database + '.live'
+    return None
+
+
+def get_live_table() -> Optional[LiveTable]:
+    """
+    Return this process's mapping of the live table, opening it on first use.
+    A newly created table is filled from the database.
+    """
+    if 'live_table' not in current_app.extensions:
+        path = live_table_path(current_app.config)
+        table = None
+        if path is not None:
+            table = LiveTable(path, current_app.config.get('LIVE_TABLE_SLOTS', 65536))
+            if table.created:
+                table.load(_rows_from_database())
+        current_app.extensions['live_table'] = table
+    return current_app.extensions['live_table']
+
+
+def reload_live_table():
+    """
+    Refill the live table from the database, e.g. after reset_db or a restore.
+    """
+    table = get_live_table()
+    if table is not None:
+        table.replace(_rows_from_database())
+
+
+def live_values(sensor_ids: Iterable[int]) -> Dict[int, LiveValue]:
+    """
+    Snapshot of the given sensors from the live table; empty when disabled.
+    """
+    table = get_live_table()
+    return table.snapshot(sensor_ids) if table is not None else {}
+
+
+def _rows_from_database():
+    from app import db
+    from app.models import Sensor, TemperatureReading
+    from app.history import latest_temperatures
+
+    temps = latest_temperatures(max_age_seconds=current_app.config.get('SENSOR_TIMEOUT_SECONDS', 900))
+    latest_at = dict(db.session.execute(
+        db.select(TemperatureReading.sensor_id, db.func.max(TemperatureReading.timestamp))
+          .where(TemperatureReading.sensor_id.in_(temps))
+          .group_by(TemperatureReading.sensor_id)
+    ).all()) if temps else {}
+    for sid, status, last_seen in db.session.execute(db.select(Sensor.id, Sensor.status, Sensor.last_seen)):
+        yield sid, status, last_seen, temps.get(sid), latest_at.get(sid)
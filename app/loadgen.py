@@ -0,0 +1,222 @@
+"""
+Load generator that simulates a fleet of sensors posting readings.
+
+Sensors follow a diurnal temperature curve with jitter and occasional
+dropouts. Requests are scheduled with asyncio at a fixed target rate and
+sent either over HTTP (a small keep-alive client on asyncio streams) or to
+an in-process Flask test client. Run it with `flask loadgen --help`.
+"""
+
+import asyncio
+import functools
+import json
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+
+class SimulatedSensor:
+    __slots__ = ('sensor_id', 'base', 'amplitude', 'phase', 'jitter', 'dropped_until')
+
+    def __init__(self, sensor_id: int, rng: random.Random):
+        self.sensor_id = sensor_id
+        self.base = rng.uniform(19.0, 23.0)
+        self.amplitude = rng.uniform(0.5, 2.5)
+        self.phase = rng.uniform(-2.0, 2.0)        # hours; rooms warm up at different times
+        self.jitter = rng.uniform(0.05, 0.3)
+        self.dropped_until = 0.0
+
+    def temperature(self, now: datetime, rng: random.Random) -> float:
+        hour = now.hour + now.minute / 60.0 + self.phase
+        # coldest around 03:00, warmest around 15:00
+        curve = -math.cos(2 * math.pi * (hour - 3.0) / 24.0)
+        return round(self.base + self.amplitude * curve + rng.gauss(0, self.jitter), 2)
+
+
+class SensorFleet:
+    """
+    Produces reading batches round-robin over the fleet, skipping dropped sensors.
+    """
+    def __init__(self, sensor_ids: List[int], seed: int = 0,
+                 dropout_rate: float = 0.001, dropout_seconds: float = 60.0):
+        self.rng = random.Random(seed)
+        self.sensors = [SimulatedSensor(sid, self.rng) for sid in sensor_ids]
+        self.dropout_rate = dropout_rate
+        self.dropout_seconds = dropout_seconds
+        self._next = 0
+
+    def batch(self, size: int, clock: float = None) -> List[dict]:
+        clock = time.monotonic() if clock is None else clock
+        now = datetime.utcnow()
+        readings = []
+        for _ in range(min(size, len(self.sensors))):
+            sensor = self.sensors[self._next]
+            self._next = (self._next + 1) % len(self.sensors)
+            if sensor.dropped_until > clock:
+                continue
+            if self.rng.random() < self.dropout_rate:
+                sensor.dropped_until = clock + self.rng.expovariate(1.0 / self.dropout_seconds)
+                continue
+            readings.append({
+                'sensor_id': sensor.sensor_id,
+                'temperature': sensor.temperature(now, self.rng),
+                'timestamp': now.isoformat(),
+            })
+        return readings
+
+
+@dataclass
+class LoadReport:
+    sent: int = 0
+    errors: int = 0
+    readings: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, status: str, latency: float, readings: int):
+        self.sent += 1
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status.isdigit() and int(status) < 400:
+            self.readings += readings
+        else:
+            self.errors += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        idx = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+        return ordered[idx]
+
+    def summary(self) -> str:
+        rate = self.sent / self.elapsed if self.elapsed else 0.0
+        ms = lambda v: f"{v * 1000:.1f}ms" if v is not None else 'n/a'
+        error_rate = self.errors / self.sent * 100 if self.sent else 0.0
+        return '\n'.join([
+            f"requests: {self.sent} in {self.elapsed:.1f}s ({rate:.1f} req/s), "
+            f"readings accepted: {self.readings} ({self.readings / self.elapsed if self.elapsed else 0:.1f}/s)",
+            f"latency p50={ms(self.percentile(50))} p90={ms(self.percentile(90))} "
+            f"p99={ms(self.percentile(99))} max={ms(max(self.latencies) if self.latencies else None)}",
+            f"errors: {self.errors} ({error_rate:.2f}%), statuses: {dict(sorted(self.statuses.items()))}",
+        ])
+
+
+class HttpSender:
+    """
+    Minimal HTTP/1.1 POST client on asyncio streams with a keep-alive pool.
+    """
+    def __init__(self, url: str, api_key: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port or 80
+        self.path = (parts.path.rstrip('/') or '') + '/api/readings'
+        self.api_key = api_key
+        self._idle = []
+
+    async def send(self, readings: List[dict]) -> str:
+        body = json.dumps({'readings': readings}).encode()
+        head = (
+            f"POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"X-API-Key: {self.api_key}\r\nConnection: keep-alive\r\n\r\n"
+        ).encode()
+        if self._idle:
+            reader, writer = self._idle.pop()
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(head + body)
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionError('connection closed')
+            status = status_line.split()[1].decode()
+            length, keep_alive = 0, not status_line.startswith(b'HTTP/1.0')
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                name, value = name.strip().lower(), value.strip().lower()
+                if name == 'content-length':
+                    length = int(value)
+                elif name == 'connection':
+                    keep_alive = value == 'keep-alive'
+            if length:
+                await reader.readexactly(length)
+        except Exception:
+            writer.close()
+            raise
+        if keep_alive:
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+        return status
+
+    def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+class InProcessSender:
+    """
+    Sends requests to an in-process app through its test client, on worker threads.
+    """
+    def __init__(self, app, api_key: str):
+        self.client = app.test_client()
+        self.api_key = api_key
+
+    async def send(self, readings: List[dict]) -> str:
+        # run_in_executor (unlike to_thread) does not copy contextvars, so each
+        # request pushes its own app context and database session
+        rv = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            self.client.post, '/api/readings',
+            json={'readings': readings}, headers={'X-API-Key': self.api_key}
+        ))
+        return str(rv.status_code)
+
+    def close(self):
+        pass
+
+
+async def run_load(sender, fleet: SensorFleet, rate: float, duration: float,
+                   batch_size: int = 1, concurrency: int = 50) -> LoadReport:
+    """
+    Fire requests at `rate` per second for `duration` seconds. Requests are
+    scheduled on a fixed timetable, so a slow server shows up as latency and
+    a shortfall in achieved rate rather than silently lowering the offered load.
+    """
+    report = LoadReport()
+    limit = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    total = int(rate * duration)
+
+    async def one(readings):
+        async with limit:
+            t0 = time.perf_counter()
+            try:
+                status = await sender.send(readings)
+            except Exception as exc:
+                status = type(exc).__name__
+            report.record(status, time.perf_counter() - t0, len(readings))
+
+    tasks = []
+    for i in range(total):
+        delay = start + i / rate - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        readings = fleet.batch(batch_size)
+        if readings:
+            tasks.append(asyncio.create_task(one(readings)))
+    await asyncio.gather(*tasks)
+    report.elapsed = loop.time() - start
+    sender.close()
+    return report
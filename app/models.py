@@ -4,11 +4,14 @@ SQLAlchemy ORM models with single-table inheritance for User subclasses.
 
 from datetime import datetime
 from flask_login import UserMixin
+from sqlalchemy import DDL, event
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from app import db, login
 
 from app.observer import sensor_status_subject
+from app.zones import parse_location, default_heating_zone
+from app.scoring import RATINGS, decay_factor, half_life_seconds
 
 
 class User(UserMixin, db.Model):
@@ -78,11 +81,28 @@ def load_user(user_id: str):
 
 class Sensor(db.Model):
     __tablename__ = 'sensors'
+    __table_args__ = (
+        # Lets the staleness sweep find silent sensors without a full scan
+        db.Index('ix_sensors_status_last_seen', 'status', 'last_seen'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(64), nullable=False)
     location = db.Column(db.String(128), nullable=False)
     status = db.Column(db.String(20), nullable=False)
+    last_seen = db.Column(db.DateTime, nullable=True)
+
+    # Optional zone placement; derived from location when left blank
+    building = db.Column(db.String(64), nullable=True, index=True)
+    floor = db.Column(db.String(16), nullable=True)
+    room = db.Column(db.String(64), nullable=True)
+    heating_zone = db.Column(db.String(128), nullable=True, index=True)
+
+    # Time-decayed feedback scores, valid as of scores_updated_at
+    hot_score = db.Column(db.Float, nullable=False, default=0.0)
+    ok_score = db.Column(db.Float, nullable=False, default=0.0)
+    cold_score = db.Column(db.Float, nullable=False, default=0.0)
+    scores_updated_at = db.Column(db.DateTime, nullable=True)
 
     calibrations = db.relationship('Calibration', backref='sensor', cascade='all, delete-orphan')
     feedbacks = db.relationship('Feedback', backref='sensor', cascade='all, delete-orphan')
@@ -97,6 +117,79 @@ class Sensor(db.Model):
     def __repr__(self):
         return f'<Sensor {self.name} at {self.location}>'
 
+    @property
+    def zone_path(self):
+        """
+        (building, floor, room) for this sensor, parsed from location where unset.
+        """
+        building, floor, room = parse_location(self.location)
+        return self.building or building, self.floor or floor, self.room or room
+
+    @property
+    def zone_name(self) -> str:
+        """
+        Heating zone the sensor belongs to; defaults to its building floor.
+        """
+        if self.heating_zone:
+            return self.heating_zone
+        building, floor, _ = self.zone_path
+        return default_heating_zone(building, floor)
+
+    @classmethod
+    def get_for_update(cls, sensor_id: int):
+        """
+        Load a sensor with its row locked until the transaction ends, so a
+        read-modify-write of its scores cannot lose a concurrent update.
+        The lock is taken with a no-op UPDATE, which works on every backend
+        (SQLite ignores FOR UPDATE); the row is then re-read fresh.
+        """
+        db.session.execute(
+            db.update(cls).where(cls.id == sensor_id).values(id=cls.id)
+              .execution_options(synchronize_session=False)
+        )
+        return db.session.scalars(
+            db.select(cls).where(cls.id == sensor_id).execution_options(populate_existing=True)
+        ).first()
+
+    def record_feedback(self, rating: str, at: datetime = None):
+        """
+        Decay the stored feedback scores to `at` and count one new rating.
+        """
+        at = at or datetime.utcnow()
+        half_life = half_life_seconds()
+        if self.scores_updated_at is not None and at < self.scores_updated_at:
+            # Late arrival: age the new rating instead of rolling scores back
+            weight = decay_factor(at, self.scores_updated_at, half_life)
+        else:
+            factor = decay_factor(self.scores_updated_at, at, half_life)
+            for name in RATINGS:
+                setattr(self, f'{name}_score', (getattr(self, f'{name}_score') or 0.0) * factor)
+            self.scores_updated_at = at
+            weight = 1.0
+        setattr(self, f'{rating}_score', (getattr(self, f'{rating}_score') or 0.0) + weight)
+
+    def retract_feedback(self, rating: str, at: datetime):
+        """
+        Take back one rating counted at `at`, e.g. when a later submission
+        replaces it. Its weight is decayed the same way the scores were.
+        """
+        if self.scores_updated_at is None:
+            return
+        weight = decay_factor(at, self.scores_updated_at, half_life_seconds())
+        score = (getattr(self, f'{rating}_score') or 0.0) - weight
+        setattr(self, f'{rating}_score', max(0.0, score))
+
+    def reset_feedback_scores(self):
+        self.hot_score = self.ok_score = self.cold_score = 0.0
+        self.scores_updated_at = None
+
+    def feedback_scores(self, at: datetime = None) -> dict:
+        """
+        Return the decayed {'hot', 'ok', 'cold'} scores as of `at` (default now).
+        """
+        factor = decay_factor(self.scores_updated_at, at or datetime.utcnow(), half_life_seconds())
+        return {name: (getattr(self, f'{name}_score') or 0.0) * factor for name in RATINGS}
+
     def set_status(self, new_status: str):
         """
         Set the sensor status and notify observers of the change.
@@ -106,24 +199,55 @@ class Sensor(db.Model):
             self.status = new_status
             sensor_status_subject.notify(self.id, old_status, new_status)
 
+    @staticmethod
+    def set_statuses(sensors, new_status: str) -> int:
+        """
+        Set the status of many sensors and notify observers once with the
+        whole batch. Returns the number of sensors that changed.
+        """
+        changes = []
+        for sensor in sensors:
+            if sensor.status != new_status:
+                changes.append((sensor.id, sensor.status, new_status))
+                sensor.status = new_status
+        sensor_status_subject.notify_batch(changes)
+        return len(changes)
+
 
 class TemperatureReading(db.Model):
     __tablename__ = 'temperature_readings'
+    __table_args__ = (
+        db.Index('ix_temperature_readings_sensor_ts', 'sensor_id', 'timestamp'),
+    )
 
     id          = db.Column(db.Integer, primary_key=True)
     sensor_id   = db.Column(db.Integer, db.ForeignKey('sensors.id'), nullable=False)
     timestamp   = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    temperature = db.Column(db.Float, nullable=False)
+    temperature = db.Column(db.Float, nullable=False)         # calibrated at ingestion
+    raw_temperature = db.Column(db.Float, nullable=True)      # as reported by the sensor
 
     sensor = db.relationship('Sensor', back_populates='readings')
 class Calibration(db.Model):
     __tablename__ = 'calibrations'
+    __table_args__ = (
+        db.Index('ix_calibrations_sensor_effective', 'sensor_id', 'effective_from'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     sensor_id = db.Column(db.Integer, db.ForeignKey('sensors.id'), nullable=False)
     calibrated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     notes = db.Column(db.Text, nullable=True)
 
+    # corrected = raw * gain + offset for readings from effective_from until
+    # the next calibration; both NULL for a notes-only record
+    offset = db.Column(db.Float, nullable=True)
+    gain = db.Column(db.Float, nullable=True)
+    effective_from = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    @property
+    def has_coefficients(self) -> bool:
+        return self.offset is not None or self.gain is not None
+
     def __repr__(self):
         ts = self.calibrated_at.strftime('%Y-%m-%d %H:%M:%S')
         return f'<Calibration sensor={self.sensor_id} at {ts}>'
@@ -142,3 +266,91 @@ class Feedback(db.Model):
     def __repr__(self):
         ts = self.submitted_at.strftime('%Y-%m-%d %H:%M:%S')
         return f'<Feedback {self.rating} by User {self.user_id} at {ts}>'
+
+
+# Full-text index over Feedback.comment (SQLite FTS5, external content: the
+# index stores only tokens and reads comment text back from feedbacks).
+# Triggers keep it in step with every insert, update and delete. It is only
+# created on SQLite; app.feedback_search falls back to LIKE elsewhere.
+FEEDBACK_FTS_DDL = (
+    "DROP TABLE IF EXISTS feedbacks_fts",
+    "CREATE VIRTUAL TABLE feedbacks_fts USING fts5("
+    "comment, content='feedbacks', content_rowid='id', "
+    "tokenize='porter unicode61 remove_diacritics 2')",
+    "DROP TRIGGER IF EXISTS feedbacks_fts_ai",
+    "DROP TRIGGER IF EXISTS feedbacks_fts_ad",
+    "DROP TRIGGER IF EXISTS feedbacks_fts_au",
+    "CREATE TRIGGER feedbacks_fts_ai AFTER INSERT ON feedbacks BEGIN "
+    "INSERT INTO feedbacks_fts(rowid, comment) VALUES (new.id, new.comment); END",
+    "CREATE TRIGGER feedbacks_fts_ad AFTER DELETE ON feedbacks BEGIN "
+    "INSERT INTO feedbacks_fts(feedbacks_fts, rowid, comment) VALUES ('delete', old.id, old.comment); END",
+    "CREATE TRIGGER feedbacks_fts_au AFTER UPDATE OF comment ON feedbacks BEGIN "
+    "INSERT INTO feedbacks_fts(feedbacks_fts, rowid, comment) VALUES ('delete', old.id, old.comment); "
+    "INSERT INTO feedbacks_fts(rowid, comment) VALUES (new.id, new.comment); END",
+    "INSERT INTO feedbacks_fts(feedbacks_fts) VALUES ('rebuild')",
+)
+for _statement in FEEDBACK_FTS_DDL:
+    event.listen(Feedback.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+event.listen(Feedback.__table__, 'before_drop',
+             DDL("DROP TABLE IF EXISTS feedbacks_fts").execute_if(dialect='sqlite'))
+
+
+class ZoneSetpoint(db.Model):
+    """
+    Comfortable temperature band for one heating zone.
+    """
+    __tablename__ = 'zone_setpoints'
+
+    zone = db.Column(db.String(128), primary_key=True)
+    setpoint_low = db.Column(db.Float, nullable=False)
+    setpoint_high = db.Column(db.Float, nullable=False)
+
+    def __repr__(self):
+        return f'<ZoneSetpoint {self.zone} {self.setpoint_low}-{self.setpoint_high}°C>'
+
+
+class SensorStatusEvent(db.Model):
+    """
+    Outbox row for a sensor status change, read by the other worker processes.
+    """
+    __tablename__ = 'sensor_status_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    sensor_id = db.Column(db.Integer, nullable=False)
+    old_status = db.Column(db.String(20), nullable=True)
+    new_status = db.Column(db.String(20), nullable=False)
+    origin = db.Column(db.String(96), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<SensorStatusEvent {self.id} sensor={self.sensor_id} {self.old_status}->{self.new_status}>'
+
+
+class EventCursor(db.Model):
+    """
+    Last outbox event delivered to a worker's observers. The shared cursor
+    for deployment-wide observers also records which worker holds it.
+    """
+    __tablename__ = 'event_cursors'
+
+    worker_id = db.Column(db.String(96), primary_key=True)
+    last_event_id = db.Column(db.Integer, nullable=False, default=0)
+    holder = db.Column(db.String(96), nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class DashboardSnapshot(db.Model):
+    """
+    Serialised admin dashboard data, rebuilt by a background job.
+    A single row (id 1) holds the current snapshot.
+    """
+    __tablename__ = 'dashboard_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    payload = db.Column(db.Text, nullable=False)              # JSON
+    etag = db.Column(db.String(32), nullable=False)
+    built_at = db.Column(db.DateTime, nullable=False)
+    stale = db.Column(db.Boolean, default=False, nullable=False)
+
+    def __repr__(self):
+        return f'<DashboardSnapshot {self.etag} built {self.built_at}>'
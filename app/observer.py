@@ -2,22 +2,63 @@
 Observer pattern implementation for sensor status changes.
 """
 
-from typing import List
+from typing import List, Optional, Tuple
 from datetime import datetime
 
+# (sensor_id, old_status, new_status)
+StatusChange = Tuple[int, str, str]
+
 class SensorStatusObserver:
+    # False: every process needs each change (in-memory views). True: the
+    # observer acts for the whole deployment (alerts), so with the outbox
+    # transport it runs on one worker only.
+    deployment_wide = False
+
     def update(self, sensor_id: int, old_status: str, new_status: str):
         """
         Called when a sensor's status changes.
         """
         raise NotImplementedError
 
+    def update_batch(self, changes: List[StatusChange]):
+        """
+        Called once for a set of changes made together (e.g. a bulk status
+        operation). Override to handle them in one go; by default each change
+        is passed to update().
+        """
+        for sensor_id, old_status, new_status in changes:
+            self.update(sensor_id, old_status, new_status)
+
+class InProcessTransport:
+    """
+    Default transport: delivers events straight to this process's observers.
+    """
+    def publish(self, subject: 'SensorStatusSubject', sensor_id: int, old_status: str, new_status: str):
+        subject.dispatch(sensor_id, old_status, new_status)
+
+    def publish_batch(self, subject: 'SensorStatusSubject', changes: List[StatusChange]):
+        subject.dispatch_batch(changes)
+
+
 class SensorStatusSubject:
     """
     Subject that maintains a list of observers and notifies them of changes.
+    Notifications go through a pluggable transport so other processes can
+    receive them too (see app.event_bus).
     """
-    def __init__(self):
+    def __init__(self, transport=None):
         self._observers: List[SensorStatusObserver] = []
+        self._transport = transport or InProcessTransport()
+
+    @property
+    def transport(self):
+        return self._transport
+
+    def set_transport(self, transport):
+        """
+        Replace the transport used by notify().
+        """
+        self._transport = transport
 
     def attach(self, observer: SensorStatusObserver):
         """
@@ -35,11 +76,37 @@ class SensorStatusSubject:
 
     def notify(self, sensor_id: int, old_status: str, new_status: str):
         """
-        Notify all observers about a status change.
+        Publish a status change through the transport.
         """
-        for observer in self._observers:
+        self._transport.publish(self, sensor_id, old_status, new_status)
+
+    def notify_batch(self, changes: List[StatusChange]):
+        """
+        Publish several status changes as one notification.
+        """
+        if changes:
+            self._transport.publish_batch(self, changes)
+
+    def _selected(self, deployment_wide: Optional[bool]) -> List[SensorStatusObserver]:
+        return [observer for observer in self._observers
+                if deployment_wide is None or observer.deployment_wide == deployment_wide]
+
+    def dispatch(self, sensor_id: int, old_status: str, new_status: str,
+                 deployment_wide: Optional[bool] = None):
+        """
+        Notify local observers about a status change: all of them, or only
+        those whose deployment_wide flag matches.
+        """
+        for observer in self._selected(deployment_wide):
             observer.update(sensor_id, old_status, new_status)
 
+    def dispatch_batch(self, changes: List[StatusChange], deployment_wide: Optional[bool] = None):
+        """
+        Notify local observers about a batch of status changes (see dispatch).
+        """
+        for observer in self._selected(deployment_wide):
+            observer.update_batch(changes)
+
 # Global subject instance to be used throughout the application
 sensor_status_subject = SensorStatusSubject()
 
@@ -63,9 +130,16 @@ class DashboardObserver(SensorStatusObserver):
             'timestamp':   datetime.utcnow()
         })
 
-# attach our dashboard observer so it receives every update
+# attached to the subject by app.observers.register_observers
 _dashboard_observer = DashboardObserver()
-sensor_status_subject.attach(_dashboard_observer)
+
+
+def get_dashboard_observer() -> DashboardObserver:
+    return _dashboard_observer
+
+
+def clear_dashboard_notifications():
+    _dashboard_notifications.clear()
 
 
 def get_dashboard_notifications() -> List[dict]:
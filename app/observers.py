@@ -3,7 +3,11 @@ Example observers for the sensor status changes.
 """
 from app.observer import SensorStatusObserver
 from app.models import db, Sensor
+from app.alerting import get_alert_suppressor
 from datetime import datetime
+from flask import has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
 
 class StatusChangeLogger(SensorStatusObserver):
     """
@@ -12,6 +16,13 @@ class StatusChangeLogger(SensorStatusObserver):
     def update(self, sensor_id: int, old_status: str, new_status: str):
         print(f"Sensor {sensor_id} changed from {old_status} to {new_status}")
 
+    def update_batch(self, changes):
+        by_status = {}
+        for sensor_id, _, new_status in changes:
+            by_status.setdefault(new_status, []).append(sensor_id)
+        for new_status, ids in by_status.items():
+            print(f"{len(ids)} sensors changed to {new_status}: {', '.join(map(str, ids))}")
+
 class MaintenanceNotifier(SensorStatusObserver):
     """
     Sends notifications when sensors go offline.
@@ -21,6 +32,14 @@ class MaintenanceNotifier(SensorStatusObserver):
             sensor = db.session.get(Sensor, sensor_id)
             print(f"ALERT: Sensor {sensor.name} at {sensor.location} is now offline!")
 
+    def update_batch(self, changes):
+        # One query and one alert for the whole batch
+        ids = [sensor_id for sensor_id, _, new_status in changes if new_status == 'offline']
+        if ids:
+            sensors = db.session.scalars(db.select(Sensor).where(Sensor.id.in_(ids))).all()
+            print(f"ALERT: {len(sensors)} sensors are now offline: "
+                  + '; '.join(f"{s.name} at {s.location}" for s in sensors))
+
 class CalibrationScheduler(SensorStatusObserver):
     """
     Schedules calibration when sensors come back online.
@@ -30,8 +49,110 @@ class CalibrationScheduler(SensorStatusObserver):
             sensor = db.session.get(Sensor, sensor_id)
             print(f"Scheduling calibration for sensor {sensor.name}")
 
-# Register the observers when the module loads
-from app.observer import sensor_status_subject
-sensor_status_subject.attach(StatusChangeLogger())
-sensor_status_subject.attach(MaintenanceNotifier())
-sensor_status_subject.attach(CalibrationScheduler())
\ No newline at end of file
+    def update_batch(self, changes):
+        ids = [sensor_id for sensor_id, old_status, new_status in changes
+               if old_status == 'offline' and new_status == 'online']
+        if ids:
+            names = db.session.scalars(db.select(Sensor.name).where(Sensor.id.in_(ids))).all()
+            print(f"Scheduling calibration for {len(names)} sensors: {', '.join(names)}")
+
+class SuppressedAlerts(SensorStatusObserver):
+    """
+    Holds changes back from alerting observers until the sensor settles, then
+    passes them on as one batch per flush (see app.alerting).
+    """
+    deployment_wide = True
+
+    def __init__(self, *observers: SensorStatusObserver):
+        self.observers = observers
+
+    def update(self, sensor_id: int, old_status: str, new_status: str):
+        self.update_batch([(sensor_id, old_status, new_status)])
+
+    def update_batch(self, changes):
+        get_alert_suppressor().observe(changes)
+
+    def flush(self):
+        digest = get_alert_suppressor().flush()
+        if digest.flapping:
+            names = db.session.scalars(db.select(Sensor.name).where(Sensor.id.in_(digest.flapping))).all()
+            print(f"ALERT: {len(names)} sensors are flapping, alerts held until they settle: "
+                  + ', '.join(names))
+        if digest.changes:
+            for observer in self.observers:
+                observer.update_batch(digest.changes)
+        return digest
+
+# One instance of each, so registering again (a new app per test) is a no-op
+_alerts = SuppressedAlerts(MaintenanceNotifier(), CalibrationScheduler())
+_observers = (StatusChangeLogger(), _alerts)
+
+
+def flush_status_alerts():
+    """
+    Scheduler job: deliver the status changes that have settled.
+    """
+    return _alerts.flush()
+
+
+# -----------------------
+# Live table statuses
+# -----------------------
+
+# Statuses are mirrored from flushed Sensor rows rather than from status
+# notifications, so only committed changes reach the shared table
+_LIVE_PENDING = 'live_table_statuses'
+_LIVE_COMMITTED = 'live_table_committed_statuses'
+
+
+def _collect_live_statuses(session, flush_context):
+    pending = session.info.setdefault(_LIVE_PENDING, {})
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Sensor) and inspect(obj).attrs.status.history.has_changes():
+            pending[obj.id] = obj.status
+
+
+def _commit_live_statuses(session):
+    pending = session.info.pop(_LIVE_PENDING, None)
+    if pending:
+        session.info.setdefault(_LIVE_COMMITTED, {}).update(pending)
+
+
+def _discard_live_statuses(session):
+    session.info.pop(_LIVE_PENDING, None)
+
+
+def _publish_live_statuses(session, transaction):
+    # After the commit has finished, so opening the table may query
+    if transaction.parent is not None or not session.info.get(_LIVE_COMMITTED):
+        return
+    statuses = session.info.pop(_LIVE_COMMITTED)
+    if has_app_context():
+        from app.live_table import get_live_table
+        table = get_live_table()
+        if table is not None:
+            table.record_statuses(statuses)
+
+
+_LIVE_EVENTS = (
+    ('after_flush', _collect_live_statuses),
+    ('after_commit', _commit_live_statuses),
+    ('after_rollback', _discard_live_statuses),
+    ('after_transaction_end', _publish_live_statuses),
+)
+
+
+def register_observers(subject=None):
+    """
+    Attach the dashboard and example observers to the status subject, and
+    mirror committed statuses into the live table.
+    Called by create_app; safe to call any number of times.
+    """
+    from app.observer import sensor_status_subject, get_dashboard_observer
+    subject = subject or sensor_status_subject
+    subject.attach(get_dashboard_observer())
+    for observer in _observers:
+        subject.attach(observer)
+    for name, listener in _LIVE_EVENTS:
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
@@ -0,0 +1,104 @@
+"""
+Read/write split for database access.
+
+Code keeps using db.session. Inside `reads_from_replica()` (or a view
+decorated with `@read_replica`), plain SELECTs go to a separate read engine,
+while flushes, UPDATE/DELETE statements and raw connections still use the
+primary. The read engine is:
+
+- SQLALCHEMY_READ_URI when set (e.g. a replica of another backend)
+- otherwise, for a SQLite file, a read-only (`mode=ro`) connection pool on
+  the same file, with the primary switched to WAL so readers do not block
+  the writer
+- otherwise (in-memory SQLite) none: reads fall back to the primary
+"""
+
+from contextlib import contextmanager
+from functools import wraps
+from typing import Optional
+
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.sql import Select
+
+
+class RoutingSession(Session):
+    """
+    Session that sends SELECTs to the read engine while routing is on.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and isinstance(clause, Select) and _routing_enabled():
+            engine = current_app.extensions.get('read_engine')
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _routing_enabled() -> bool:
+    return has_app_context() and g.get('_read_replica_depth', 0) > 0
+
+
+@contextmanager
+def reads_from_replica():
+    """
+    Route SELECTs inside the block to the read engine. Nests.
+    """
+    g._read_replica_depth = g.get('_read_replica_depth', 0) + 1
+    try:
+        yield
+    finally:
+        g._read_replica_depth -= 1
+
+
+def read_replica(func):
+    """
+    Decorator form of reads_from_replica(), for views and jobs.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with reads_from_replica():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def read_uri(config) -> Optional[str]:
+    """
+    URI of the read engine for this configuration, or None to use the primary.
+    """
+    if config.get('SQLALCHEMY_READ_URI'):
+        return config['SQLALCHEMY_READ_URI']
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:') \
+            or url.query.get('mode') == 'memory':
+        return None
+    return f"sqlite:///file:{url.database}?mode=ro&uri=true"
+
+
+def _set_wal(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.close()
+
+
+def _set_query_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA query_only=1')
+    cursor.close()
+
+
+def init_read_engine(app, primary: Engine) -> Optional[Engine]:
+    """
+    Create the app's read engine (if any) and prepare the primary for it.
+    """
+    uri = read_uri(app.config)
+    if uri is None:
+        return None
+    engine = create_engine(uri, **app.config.get('SQLALCHEMY_READ_ENGINE_OPTIONS', {}))
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', _set_query_only)
+        if primary.dialect.name == 'sqlite' and app.config.get('SQLITE_WAL', True):
+            event.listen(primary, 'connect', _set_wal)
+    app.extensions['read_engine'] = engine
+    return engine
@@ -0,0 +1,112 @@
+"""
+Minimal in-process scheduler for periodic background jobs.
+
+Jobs run one after another on a single daemon thread, each inside its own
+application context so they can use db.session like a request would.
+"""
+
+import threading
+import time
+from typing import Callable, List
+
+
+class ScheduledJob:
+    __slots__ = ('name', 'func', 'interval', 'next_run')
+
+    def __init__(self, name: str, func: Callable, interval: float, next_run: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.next_run = next_run
+
+
+class BackgroundScheduler:
+    """
+    Runs registered jobs every `interval` seconds until shut down.
+    """
+    def __init__(self, app, tick: float = 1.0, clock=time.monotonic):
+        self.app = app
+        self.tick = tick
+        self._clock = clock
+        self._jobs: List[ScheduledJob] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_job(self, name: str, func: Callable, interval: float):
+        """
+        Register func to run every interval seconds (first run after one interval).
+        """
+        self._jobs.append(ScheduledJob(name, func, interval, self._clock() + interval))
+
+    def run_pending(self):
+        """
+        Run every job that is due. Errors are logged and never stop the loop.
+        """
+        for job in self._jobs:
+            now = self._clock()
+            if now < job.next_run:
+                continue
+            job.next_run = now + job.interval
+            with self.app.app_context():
+                try:
+                    job.func()
+                except Exception:
+                    self.app.logger.exception('Background job %s failed', job.name)
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='campus-iot-scheduler', daemon=True)
+        self._thread.start()
+
+    def shutdown(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.tick):
+            self.run_pending()
+
+
+def _archive_readings():
+    # The archive is NumPy-based; load it when the job first runs, not at startup
+    from app.archive import archive_readings
+    archive_readings()
+
+
+def _refresh_comfort_analytics():
+    from app.comfort_analytics import refresh_comfort_analytics
+    refresh_comfort_analytics()
+
+
+def init_scheduler(app) -> BackgroundScheduler:
+    """
+    Create the app's scheduler, register the built-in jobs and start it
+    when SCHEDULER_ENABLED is set.
+    """
+    from app.heartbeat import sweep_stale_sensors
+    from app.snapshot import refresh_dashboard_snapshot
+    from app.observers import flush_status_alerts
+
+    scheduler = BackgroundScheduler(app)
+    scheduler.add_job('sweep_stale_sensors', sweep_stale_sensors,
+                      app.config.get('STALENESS_SWEEP_INTERVAL', 60))
+    scheduler.add_job('flush_status_alerts', flush_status_alerts,
+                      app.config.get('ALERT_DIGEST_INTERVAL', 30))
+    scheduler.add_job('refresh_dashboard_snapshot', refresh_dashboard_snapshot,
+                      app.config.get('DASHBOARD_SNAPSHOT_POLL', 5))
+    scheduler.add_job('archive_readings', _archive_readings,
+                      app.config.get('ARCHIVE_INTERVAL', 3600))
+    scheduler.add_job('refresh_comfort_analytics', _refresh_comfort_analytics,
+                      app.config.get('ANALYTICS_INTERVAL', 900))
+    app.extensions['scheduler'] = scheduler
+    if app.config.get('SCHEDULER_ENABLED'):
+        scheduler.start()
+    return scheduler
@@ -0,0 +1,55 @@
+"""
+Exponentially time-decayed feedback scores.
+
+Each sensor keeps one score per rating plus the time they were last brought
+up to date. A new feedback decays the stored scores to its own timestamp and
+adds one, so updates and reads are O(1) and never rescan the feedback table.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from flask import current_app
+
+from app import db
+
+RATINGS = ('hot', 'ok', 'cold')
+
+
+def half_life_seconds() -> float:
+    return current_app.config.get('FEEDBACK_HALF_LIFE_HOURS', 24.0) * 3600.0
+
+
+def decay_factor(since: Optional[datetime], until: datetime, half_life: float) -> float:
+    """
+    Multiplier that ages a score from `since` to `until`.
+    """
+    if since is None:
+        return 0.0
+    elapsed = (until - since).total_seconds()
+    if elapsed <= 0:
+        return 1.0
+    return 0.5 ** (elapsed / half_life)
+
+
+def rebuild_feedback_scores():
+    """
+    Recompute every sensor's scores from stored feedback (e.g. after seeding
+    or changing the half-life). Only feedback inside FEEDBACK_SCORE_WINDOW_HOURS
+    is scanned; anything older has decayed to a negligible weight.
+    """
+    from app.models import Sensor, Feedback
+    now = datetime.utcnow()
+    window = current_app.config.get('FEEDBACK_SCORE_WINDOW_HOURS', 24.0 * 14)
+    sensors = {s.id: s for s in db.session.scalars(db.select(Sensor))}
+    for sensor in sensors.values():
+        sensor.reset_feedback_scores()
+    rows = db.session.execute(
+        db.select(Feedback.sensor_id, Feedback.rating, Feedback.submitted_at)
+          .where(Feedback.submitted_at >= now - timedelta(hours=window))
+          .order_by(Feedback.submitted_at)
+    )
+    for sensor_id, rating, submitted_at in rows:
+        if sensor_id in sensors:
+            sensors[sensor_id].record_feedback(rating, submitted_at)
+    db.session.commit()
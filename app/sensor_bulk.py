@@ -0,0 +1,137 @@
+"""
+Bulk sensor administration: CSV import and status changes for many sensors.
+"""
+
+import csv
+import io
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from app import db
+from app.models import Sensor
+from app.sensor_registry import SensorRecord
+from app.snapshot import mark_dashboard_stale
+from app.zones import get_zone_hierarchy
+
+STATUSES = ('online', 'offline')
+
+# column -> (required, max length), matching the Sensor columns
+IMPORT_COLUMNS = {
+    'name': (True, 64),
+    'location': (True, 128),
+    'status': (False, 20),
+    'building': (False, 64),
+    'floor': (False, 16),
+    'room': (False, 64),
+    'heating_zone': (False, 128),
+}
+
+
+@dataclass
+class SensorImportResult:
+    created: List[Sensor] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+def import_sensors(stream, default_status: str = 'offline') -> SensorImportResult:
+    """
+    Create sensors from a CSV file with a header row (name and location are
+    required; status, building, floor, room and heating_zone are optional).
+    All rows are added in one transaction, and only if every row is valid.
+    `stream` is a binary or text file object.
+    """
+    result = SensorImportResult()
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.DictReader(stream)
+        header = [name.strip().lower() for name in reader.fieldnames or []]
+        missing = [col for col, (required, _) in IMPORT_COLUMNS.items() if required and col not in header]
+        if missing:
+            result.errors.append(f"Missing column(s): {', '.join(missing)}")
+            return result
+        reader.fieldnames = header
+        sensors = []
+        for line, row in enumerate(reader, start=2):
+            sensor, error = _sensor_from_row(row, default_status)
+            if error:
+                result.errors.append(f"Line {line}: {error}")
+            else:
+                sensors.append(sensor)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        result.errors.append(f"Unreadable CSV file: {exc}")
+        return result
+    if result.errors:
+        return result
+    if not sensors:
+        result.errors.append('No sensors found in file')
+        return result
+
+    db.session.add_all(sensors)
+    mark_dashboard_stale()
+    db.session.flush()
+    # Copy ids and zones now: after the commit each sensor would reload itself
+    records = [SensorRecord.from_sensor(sensor) for sensor in sensors]
+    db.session.commit()
+    hierarchy = get_zone_hierarchy()
+    for record in records:
+        hierarchy.add_sensor(record)
+    result.created = sensors
+    return result
+
+
+def _sensor_from_row(row: dict, default_status: str):
+    values = {}
+    for col, (required, max_len) in IMPORT_COLUMNS.items():
+        value = (row.get(col) or '').strip()
+        if required and not value:
+            return None, f"{col} is required"
+        if len(value) > max_len:
+            return None, f"{col} is longer than {max_len} characters"
+        values[col] = value or None
+    status = (values['status'] or default_status).lower()
+    if status not in STATUSES:
+        return None, f"unknown status '{values['status']}'"
+    values['status'] = status
+    return Sensor(**values), None
+
+
+def sensor_filter(building: Optional[str] = None, location_prefix: Optional[str] = None):
+    """
+    WHERE clause selecting sensors in a building and/or whose location starts
+    with a prefix. At least one of the two is required. A sensor without a
+    building column is in the building its location names, as in zone_path.
+    """
+    if not building and not location_prefix:
+        raise ValueError('A building or location prefix is required')
+    clauses = []
+    if building:
+        clauses.append(db.or_(
+            Sensor.building == building,
+            db.and_(Sensor.building.is_(None),
+                    db.or_(Sensor.location == building,
+                           Sensor.location.startswith(building + ' - ', autoescape=True))),
+        ))
+    if location_prefix:
+        clauses.append(Sensor.location.startswith(location_prefix, autoescape=True))
+    return db.and_(*clauses)
+
+
+def bulk_set_status(new_status: str, building: Optional[str] = None,
+                    location_prefix: Optional[str] = None) -> int:
+    """
+    Set the status of every matching sensor in one transaction, with a single
+    batched notification to the status observers. Returns the number changed.
+    """
+    if new_status not in STATUSES:
+        raise ValueError(f"Unknown status: {new_status}")
+    sensors = db.session.scalars(
+        db.select(Sensor)
+          .where(sensor_filter(building, location_prefix))
+          .where(Sensor.status != new_status)
+    ).all()
+    changed = Sensor.set_statuses(sensors, new_status)
+    if changed:
+        mark_dashboard_stale()
+    db.session.commit()
+    return changed
@@ -0,0 +1,225 @@
+"""
+Process-wide, in-memory registry of sensors.
+
+Sensors change rarely but are read on almost every page and in every
+dashboard build, so the app keeps one compact record per sensor with
+indexes by id, location, building and status. The registry is loaded with
+a single column query on first use and kept in step with this process's
+writes by session events: sensors flushed in a transaction are applied
+when it commits and dropped when it rolls back. Changes made by other
+worker processes (or by bulk UPDATE statements) are picked up by a full
+reload every SENSOR_REGISTRY_TTL seconds.
+
+Records are replaced, never modified, so a reader holding one always sees
+a consistent sensor.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Sensor
+from app.scoring import RATINGS, decay_factor, half_life_seconds
+from app.zones import parse_location, default_heating_zone
+
+_COLUMNS = ('id', 'name', 'location', 'status', 'building', 'floor', 'room', 'heating_zone',
+            'hot_score', 'ok_score', 'cold_score', 'scores_updated_at')
+
+
+class SensorRecord:
+    """
+    Read-only copy of a sensor's columns, with its zone resolved once.
+    Has the attributes and feedback_scores() the analysis code uses on Sensor.
+    """
+    __slots__ = _COLUMNS + ('zone_path', 'zone_name')
+
+    def __init__(self, id, name, location, status, building=None, floor=None, room=None,
+                 heating_zone=None, hot_score=0.0, ok_score=0.0, cold_score=0.0,
+                 scores_updated_at=None):
+        self.id = id
+        self.name = name
+        self.location = location
+        self.status = status
+        self.building = building
+        self.floor = floor
+        self.room = room
+        self.heating_zone = heating_zone
+        self.hot_score = hot_score or 0.0
+        self.ok_score = ok_score or 0.0
+        self.cold_score = cold_score or 0.0
+        self.scores_updated_at = scores_updated_at
+        parsed_building, parsed_floor, parsed_room = parse_location(location)
+        self.zone_path = (building or parsed_building, floor or parsed_floor, room or parsed_room)
+        self.zone_name = heating_zone or default_heating_zone(*self.zone_path[:2])
+
+    @classmethod
+    def from_sensor(cls, sensor: Sensor) -> 'SensorRecord':
+        return cls(*(getattr(sensor, name) for name in _COLUMNS))
+
+    def feedback_scores(self, at: datetime = None) -> dict:
+        """
+        Return the decayed {'hot', 'ok', 'cold'} scores as of `at` (default now).
+        """
+        factor = decay_factor(self.scores_updated_at, at or datetime.utcnow(), half_life_seconds())
+        return {name: getattr(self, f'{name}_score') * factor for name in RATINGS}
+
+    def __repr__(self):
+        return f'<SensorRecord {self.id} {self.name} at {self.location}>'
+
+
+class SensorRegistry:
+    """
+    Sensor records by id, with secondary indexes by location, building and
+    status. Lookups return records ordered by id. The building index uses the
+    resolved zone building, so sensors with no building column are found
+    under the building named in their location.
+    """
+    # index name -> key of a record in that index
+    _INDEXED = {
+        'location': lambda record: record.location,
+        'building': lambda record: record.zone_path[0],
+        'status': lambda record: record.status,
+    }
+
+    def __init__(self, records=(), clock=time.monotonic):
+        self.clock = clock
+        self.loaded_at = clock()
+        self._lock = threading.Lock()
+        self._by_id: Dict[int, SensorRecord] = {}
+        self._indexes = {name: {} for name in self._INDEXED}
+        for record in records:
+            self._put(record)
+
+    def _put(self, record: SensorRecord):
+        self._remove(record.id)
+        self._by_id[record.id] = record
+        for name, index in self._indexes.items():
+            index.setdefault(self._INDEXED[name](record), {})[record.id] = record
+
+    def _remove(self, sensor_id: int):
+        record = self._by_id.pop(sensor_id, None)
+        if record is None:
+            return
+        for name, index in self._indexes.items():
+            key = self._INDEXED[name](record)
+            bucket = index[key]
+            del bucket[sensor_id]
+            if not bucket:
+                del index[key]
+
+    def apply(self, changes: Dict[int, Optional[SensorRecord]]):
+        """
+        Store new or updated records; None removes the sensor.
+        """
+        with self._lock:
+            for sensor_id, record in changes.items():
+                if record is None:
+                    self._remove(sensor_id)
+                else:
+                    self._put(record)
+
+    def get(self, sensor_id: int) -> Optional[SensorRecord]:
+        return self._by_id.get(sensor_id)
+
+    def all(self) -> List[SensorRecord]:
+        with self._lock:
+            return sorted(self._by_id.values(), key=lambda r: r.id)
+
+    def _lookup(self, name: str, key) -> List[SensorRecord]:
+        with self._lock:
+            return sorted(self._indexes[name].get(key, {}).values(), key=lambda r: r.id)
+
+    def at_location(self, location: str) -> List[SensorRecord]:
+        return self._lookup('location', location)
+
+    def in_building(self, building: str) -> List[SensorRecord]:
+        return self._lookup('building', building)
+
+    def with_status(self, status: str) -> List[SensorRecord]:
+        return self._lookup('status', status)
+
+    def status_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {status: len(bucket) for status, bucket in self._indexes['status'].items()}
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, sensor_id):
+        return sensor_id in self._by_id
+
+
+def load_sensor_records() -> List[SensorRecord]:
+    """
+    All sensors as records, from one column query (no ORM objects).
+    """
+    columns = [getattr(Sensor, name) for name in _COLUMNS]
+    return [SensorRecord(*row) for row in db.session.execute(db.select(*columns))]
+
+
+def get_sensor_registry() -> SensorRegistry:
+    """
+    Return the app's sensor registry, loading it on first use and again
+    once it is older than SENSOR_REGISTRY_TTL seconds.
+    """
+    registry = current_app.extensions.get('sensor_registry')
+    ttl = current_app.config.get('SENSOR_REGISTRY_TTL', 60)
+    if registry is None or registry.clock() - registry.loaded_at >= ttl:
+        registry = current_app.extensions['sensor_registry'] = SensorRegistry(load_sensor_records())
+    return registry
+
+
+# -----------------------
+# Session events
+# -----------------------
+
+_PENDING = 'sensor_registry_changes'
+
+
+def _collect_flushed_sensors(session, flush_context):
+    # new/dirty/deleted still describe the flush that just ran
+    pending = session.info.setdefault(_PENDING, {})
+    for obj in session.new:
+        if isinstance(obj, Sensor):
+            pending[obj.id] = SensorRecord.from_sensor(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Sensor):
+            pending[obj.id] = SensorRecord.from_sensor(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Sensor):
+            pending[obj.id] = None
+
+
+def _apply_committed_sensors(session):
+    pending = session.info.pop(_PENDING, None)
+    if pending and has_app_context():
+        registry = current_app.extensions.get('sensor_registry')
+        if registry is not None:
+            registry.apply(pending)
+
+
+def _discard_sensors(session):
+    session.info.pop(_PENDING, None)
+
+
+_EVENTS = (
+    ('after_flush', _collect_flushed_sensors),
+    ('after_commit', _apply_committed_sensors),
+    ('after_rollback', _discard_sensors),
+)
+
+
+def register_registry_events():
+    """
+    Keep loaded registries in step with committed Sensor changes.
+    Called by create_app; safe to call any number of times.
+    """
+    for name, listener in _EVENTS:
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
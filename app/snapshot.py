@@ -0,0 +1,213 @@
+"""
+Materialised admin dashboard.
+
+The dashboard's data (counts, summaries, suggestions, forecasts, feature
+vectors, outdoor conditions) is computed by a scheduler job and stored as one
+JSON row, so rendering the page or serving its JSON variant is a single read.
+Writes that change what the dashboard shows call mark_dashboard_stale(); the
+job rebuilds a stale snapshot within DASHBOARD_SNAPSHOT_POLL seconds and any
+snapshot older than DASHBOARD_SNAPSHOT_MAX_AGE.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from flask import current_app
+
+from app import db
+from app.models import Feedback, DashboardSnapshot
+from app.read_routing import read_replica
+
+SNAPSHOT_ID = 1
+
+
+@read_replica
+def build_dashboard_data(now: datetime = None) -> dict:
+    """
+    Compute everything the admin dashboard shows as JSON-serialisable data.
+    """
+    # The analysis stack (NumPy and friends) loads on the first build, not at startup
+    from app.analysis import (summarize_sensors, summarize_feedback, simulate_live_temperatures,
+                              suggest_thermostat_adjustments, suggest_zone_adjustments,
+                              aggregate_sensor_features)
+    from app.weather import get_outdoor_timeline
+    from app.zones import get_zone_hierarchy
+    from app.history import latest_temperatures, load_historical_temps
+    from app.suggestions import load_zone_setpoints, get_suggestion_engine
+    from app.inference import get_model_runner
+    from app.forecast import forecast_sensors
+    from app.comfort_analytics import get_comfort_analytics
+    from app.live_table import get_live_table, fresh_temperatures
+    from app.sensor_registry import get_sensor_registry
+
+    now = now or datetime.utcnow()
+    sensors   = get_sensor_registry().all()
+
+    # Feedback is only ever shown as counts, so count it in the database:
+    # per sensor for the table badges and features, and overall per rating
+    feedback_counts = {s.id: {'hot': 0, 'ok': 0, 'cold': 0} for s in sensors}
+    rating_counts = {'hot': 0, 'ok': 0, 'cold': 0}
+    rows = db.session.execute(
+        db.select(Feedback.sensor_id, Feedback.rating, db.func.count())
+          .group_by(Feedback.sensor_id, Feedback.rating)
+    )
+    for sensor_id, rating, count in rows:
+        rating_counts[rating] = rating_counts.get(rating, 0) + count
+        if sensor_id in feedback_counts:
+            feedback_counts[sensor_id][rating] += count
+
+    # Latest reading per sensor, from the shared live table when there is one;
+    # simulate sensors with no recent data
+    live_temps = simulate_live_temperatures(sensors)
+    table = get_live_table()
+    if table is not None:
+        live_temps.update(fresh_temperatures(table.snapshot(s.id for s in sensors)))
+    else:
+        live_temps.update(latest_temperatures())
+
+    # Outdoor data from the configured provider (TTL-cached, time-sorted)
+    outdoor_data = get_outdoor_timeline()
+    latest_outdoor = outdoor_data.latest()
+
+    # Thermostat decisions (hysteresis state lives in the engine)
+    setpoints = load_zone_setpoints()
+    decisions = suggest_thermostat_adjustments(
+        sensors, live_temps, setpoints=setpoints, engine=get_suggestion_engine()
+    )
+
+    # Roll live temperatures up the zone hierarchy and suggest per heating zone
+    zones = get_zone_hierarchy()
+    zones.record_temperatures(live_temps)
+    zone_suggestions = suggest_zone_adjustments(zones, setpoints)
+
+    # Last 2 hours of readings feed the forecasts and feature vectors
+    historical_temps = load_historical_temps(now - timedelta(hours=2))
+    forecasts = forecast_sensors([s.id for s in sensors], historical_temps, outdoor_data, now)
+    feature_vectors = aggregate_sensor_features(
+        sensors=sensors,
+        feedback_counts=feedback_counts,
+        live_temps=live_temps,
+        historical_temps=historical_temps,
+        outdoor_data=outdoor_data,
+        forecasts=forecasts
+    )
+    predictions = get_model_runner().predict(feature_vectors)
+
+    sensor_rows = []
+    for s in sensors:
+        decision = decisions[s.id]
+        forecast = forecasts.get(s.id)
+        sensor_rows.append({
+            'id': s.id,
+            'name': s.name,
+            'location': s.location,
+            'status': s.status,
+            'temp': live_temps.get(s.id),
+            'feedback': feedback_counts[s.id],
+            'decision': dict(asdict(decision), message=decision.message),
+            'forecast': asdict(forecast) if forecast else None,
+            'model_prediction': predictions.get(s.id),
+        })
+
+    return {
+        'sensor_count': len(sensors),
+        'online_count': sum(1 for s in sensors if s.status == 'online'),
+        'offline_count': sum(1 for s in sensors if s.status == 'offline'),
+        'feedback_count': sum(rating_counts.values()),
+        'hot_count': rating_counts['hot'],
+        'ok_count': rating_counts['ok'],
+        'cold_count': rating_counts['cold'],
+        'sensor_summary': summarize_sensors(sensors),
+        'feedback_summary': summarize_feedback(rating_counts),
+        'sensors': sensor_rows,
+        'heating_zones': [
+            {
+                'name': name,
+                'sensors': sensor_count,
+                'avg_temp': rollup.avg_temp,
+                'hot': rollup.hot,
+                'ok': rollup.ok,
+                'cold': rollup.cold,
+                'suggestion': zone_suggestions[name],
+            }
+            for name, sensor_count, rollup in zones.zone_rollups()
+        ],
+        'latest_outdoor_temp': latest_outdoor.temp if latest_outdoor else None,
+        'outdoor_data': [asdict(c) for c in outdoor_data],
+        'feature_vectors': [asdict(v) for v in feature_vectors],
+        'analytics': asdict(get_comfort_analytics(now)),
+    }
+
+
+def rebuild_dashboard_snapshot(now: datetime = None) -> DashboardSnapshot:
+    """
+    Recompute and store the snapshot. The ETag is a hash of the content,
+    so polling clients get 304s until a rebuild changes it.
+    """
+    now = now or datetime.utcnow()
+    payload = json.dumps(build_dashboard_data(now), sort_keys=True, default=_json_default)
+    etag = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    snapshot = db.session.get(DashboardSnapshot, SNAPSHOT_ID)
+    if snapshot is None:
+        snapshot = DashboardSnapshot(id=SNAPSHOT_ID)
+        db.session.add(snapshot)
+    snapshot.payload = payload
+    snapshot.etag = etag
+    snapshot.built_at = now
+    snapshot.stale = False
+    db.session.commit()
+    return snapshot
+
+
+def refresh_dashboard_snapshot(now: datetime = None) -> bool:
+    """
+    Scheduler job: rebuild the snapshot if it is missing, stale or older
+    than DASHBOARD_SNAPSHOT_MAX_AGE. Returns True if it was rebuilt.
+    """
+    now = now or datetime.utcnow()
+    max_age = timedelta(seconds=current_app.config.get('DASHBOARD_SNAPSHOT_MAX_AGE', 60))
+    row = db.session.execute(
+        db.select(DashboardSnapshot.built_at, DashboardSnapshot.stale)
+          .where(DashboardSnapshot.id == SNAPSHOT_ID)
+    ).first()
+    if row is not None and not row.stale and now - row.built_at < max_age:
+        return False
+    rebuild_dashboard_snapshot(now)
+    return True
+
+
+def load_dashboard_snapshot() -> Optional[DashboardSnapshot]:
+    """
+    Return the current snapshot. It is built in the request only if there is
+    none yet, or it is stale and no scheduler is running to rebuild it.
+    """
+    snapshot = db.session.get(DashboardSnapshot, SNAPSHOT_ID)
+    if snapshot is None:
+        return rebuild_dashboard_snapshot()
+    if snapshot.stale:
+        scheduler = current_app.extensions.get('scheduler')
+        if scheduler is None or not scheduler.running:
+            return rebuild_dashboard_snapshot()
+    return snapshot
+
+
+def mark_dashboard_stale():
+    """
+    Flag the snapshot for rebuilding. Runs in the caller's transaction and
+    is a no-op UPDATE while the snapshot is already stale.
+    """
+    db.session.execute(
+        db.update(DashboardSnapshot)
+          .where(DashboardSnapshot.id == SNAPSHOT_ID)
+          .where(DashboardSnapshot.stale.is_(False))
+          .values(stale=True)
+    )
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
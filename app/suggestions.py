@@ -0,0 +1,189 @@
+"""
+Batch thermostat suggestion engine with per-zone setpoint bands, hysteresis
+and cooldowns.
+
+All sensors are evaluated together as NumPy arrays. The only state kept
+between evaluations is two compact arrays indexed by sensor slot: the
+current action (-1 lower, 0 hold, +1 raise) and when it last changed.
+Request threads and the dashboard snapshot job share one engine, so slot
+assignment, the state arrays and the result cache are only touched under
+its lock.
+"""
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from flask import current_app
+
+from app import db
+
+LOWER, HOLD, RAISE = -1, 0, 1
+ACTIONS = {LOWER: 'lower', HOLD: 'hold', RAISE: 'raise'}
+
+
+@dataclass(frozen=True)
+class ThermostatDecision:
+    sensor_id: int
+    zone: str
+    action: str                   # 'lower', 'hold' or 'raise'
+    delta: float                  # suggested setpoint change in °C
+    temperature: Optional[float]
+    setpoint_low: float
+    setpoint_high: float
+    reason: str                   # 'temperature', 'feedback', 'in-band', 'cooldown' or 'no-data'
+
+    @property
+    def message(self) -> str:
+        temp = f"{self.temperature}°C" if self.temperature is not None else 'n/a'
+        if self.action == 'lower':
+            return f"Current temp {temp}; consider lowering thermostat by {abs(self.delta):g}°C."
+        if self.action == 'raise':
+            return f"Current temp {temp}; consider raising thermostat by {abs(self.delta):g}°C."
+        return f"Current temp {temp}; settings are within the comfortable range."
+
+
+class SuggestionEngine:
+    """
+    Evaluates every sensor in one vectorised pass.
+
+    - A sensor starts lowering once it is above its zone's band (or hot
+      feedback outweighs cold by feedback_margin) and keeps lowering until it
+      is deadband °C back inside the band; raising mirrors this.
+    - A sensor's action may change at most once per cooldown seconds.
+    - Results are cached and returned as-is until any input changes.
+    """
+    def __init__(self, deadband: float = 0.5, cooldown: float = 900.0,
+                 feedback_margin: float = 1.0, step: float = 1.0, capacity: int = 64):
+        self.deadband = deadband
+        self.cooldown = cooldown
+        self.feedback_margin = feedback_margin
+        self.step = step
+        self._slots: Dict[int, int] = {}
+        self._action = np.zeros(capacity, dtype=np.int8)
+        self._changed_at = np.full(capacity, -np.inf)
+        self._cache_key = None
+        self._cache: List[ThermostatDecision] = []
+        self._pending = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'SuggestionEngine':
+        return cls(
+            deadband=config.get('SUGGESTION_DEADBAND', 0.5),
+            cooldown=config.get('SUGGESTION_COOLDOWN_SECONDS', 900),
+            feedback_margin=config.get('SUGGESTION_FEEDBACK_MARGIN', 1.0),
+        )
+
+    def _slots_for(self, sensor_ids: Sequence[int]) -> np.ndarray:
+        for sid in sensor_ids:
+            if sid not in self._slots:
+                self._slots[sid] = len(self._slots)
+        needed = len(self._slots)
+        if needed > len(self._action):
+            capacity = max(needed, 2 * len(self._action))
+            self._action = np.concatenate([self._action, np.zeros(capacity - len(self._action), dtype=np.int8)])
+            self._changed_at = np.concatenate([self._changed_at, np.full(capacity - len(self._changed_at), -np.inf)])
+        return np.fromiter((self._slots[sid] for sid in sensor_ids), dtype=np.intp, count=len(sensor_ids))
+
+    def evaluate(self, sensor_ids: Sequence[int], zones: Sequence[str], temps, lows, highs,
+                 hot, cold, now: float = None) -> List[ThermostatDecision]:
+        """
+        temps/lows/highs/hot/cold are array-likes aligned with sensor_ids;
+        missing temperatures are NaN. Returns one decision per sensor.
+        """
+        with self._lock:
+            return self._evaluate(sensor_ids, zones, temps, lows, highs, hot, cold, now)
+
+    def _evaluate(self, sensor_ids, zones, temps, lows, highs, hot, cold, now):
+        now = time.time() if now is None else now
+        temps = np.asarray(temps, dtype=np.float64)
+        lows = np.asarray(lows, dtype=np.float64)
+        highs = np.asarray(highs, dtype=np.float64)
+        # Decayed scores drift continuously; round so the cache can hit
+        feedback = np.round(np.asarray(hot, dtype=np.float64) - np.asarray(cold, dtype=np.float64), 2)
+
+        key = hashlib.blake2b(b''.join([
+            np.asarray(sensor_ids, dtype=np.int64).tobytes(), temps.tobytes(),
+            lows.tobytes(), highs.tobytes(), feedback.tobytes(), '\0'.join(zones).encode(),
+        ]), digest_size=16).digest()
+        if key == self._cache_key and not self._pending:
+            return self._cache
+
+        slots = self._slots_for(sensor_ids)
+        current = self._action[slots]
+        margin = self.feedback_margin
+        with np.errstate(invalid='ignore'):
+            too_hot = (temps > highs) | (feedback >= margin)
+            too_cold = (temps < lows) | (feedback <= -margin)
+            keep_lowering = (temps > highs - self.deadband) | (feedback >= margin / 2)
+            keep_raising = (temps < lows + self.deadband) | (feedback <= -margin / 2)
+
+        wanted = np.where(current == LOWER, np.where(keep_lowering, LOWER, HOLD),
+                          np.where(current == RAISE, np.where(keep_raising, RAISE, HOLD), HOLD))
+        enter = np.where(too_hot & ~too_cold, LOWER, np.where(too_cold & ~too_hot, RAISE, HOLD))
+        wanted = np.where(wanted == HOLD, enter, wanted).astype(np.int8)
+
+        changing = wanted != current
+        cooled = (now - self._changed_at[slots]) >= self.cooldown
+        blocked = changing & ~cooled
+        final = np.where(blocked, current, wanted).astype(np.int8)
+        applied = changing & cooled
+        self._action[slots] = final
+        self._changed_at[slots[applied]] = now
+        # A blocked change must be retried even if the inputs stay the same
+        self._pending = bool(blocked.any())
+
+        with np.errstate(invalid='ignore'):
+            out_of_band = (temps > highs) | (temps < lows)
+        feedback_push = (((final == LOWER) & (feedback >= margin / 2))
+                         | ((final == RAISE) & (feedback <= -margin / 2)))
+        reasons = np.select(
+            [blocked, np.isnan(temps) & (final == HOLD), final == HOLD, out_of_band, feedback_push],
+            ['cooldown', 'no-data', 'in-band', 'temperature', 'feedback'],
+            default='temperature'
+        )
+        temps_list = temps.tolist()
+        decisions = [
+            ThermostatDecision(
+                sensor_id=sid,
+                zone=zone,
+                action=ACTIONS[int(action)],
+                delta=float(action) * self.step,
+                temperature=None if t != t else round(t, 1),
+                setpoint_low=float(low),
+                setpoint_high=float(high),
+                reason=str(reason),
+            )
+            for sid, zone, action, t, low, high, reason
+            in zip(sensor_ids, zones, final.tolist(), temps_list, lows.tolist(), highs.tolist(), reasons.tolist())
+        ]
+        self._cache_key = key
+        self._cache = decisions
+        return decisions
+
+
+def load_zone_setpoints() -> Dict[str, Tuple[float, float]]:
+    """
+    Map heating zone name -> (low, high) for zones with a configured band.
+    """
+    from app.models import ZoneSetpoint
+    return {
+        zone: (low, high)
+        for zone, low, high in db.session.execute(
+            db.select(ZoneSetpoint.zone, ZoneSetpoint.setpoint_low, ZoneSetpoint.setpoint_high)
+        )
+    }
+
+
+def get_suggestion_engine() -> SuggestionEngine:
+    """
+    Return the app's suggestion engine (and its per-sensor state).
+    """
+    engine = current_app.extensions.get('suggestion_engine')
+    if engine is None:
+        engine = current_app.extensions['suggestion_engine'] = SuggestionEngine.from_config(current_app.config)
+    return engine
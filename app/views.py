@@ -4,14 +4,15 @@ Route handlers for the Campus IoT Management System.
 HELLO
 """
 
+import json
+from datetime import datetime, time, timedelta
 from urllib.parse import urlparse
-from app.analysis import (summarize_sensors, summarize_feedback, simulate_live_temperatures,
-                          suggest_thermostat_adjustments, aggregate_sensor_features,
-                          get_demo_outdoor_data)
+from app.zones import get_zone_hierarchy
+from app.snapshot import load_dashboard_snapshot, mark_dashboard_stale
 
 from flask import (
     Blueprint, render_template, redirect,
-    url_for, flash, request, abort
+    url_for, flash, request, abort, jsonify, current_app
 )
 from flask_login import (
     login_user, logout_user,
@@ -22,9 +23,14 @@ from app import db
 from app.models import User, Sensor, Calibration, Feedback, TemperatureReading
 from app.forms import (
     LoginForm, SensorForm,
-    CalibrationForm, FeedbackForm,
-    ActionForm
+    CalibrationForm, FeedbackForm, FeedbackSearchForm,
+    ActionForm, SensorImportForm, BulkStatusForm
 )
+from app.sensor_bulk import import_sensors, bulk_set_status
+from app.feedback_search import search_feedback
+from app.admission import get_feedback_admission, MERGE, REJECT
+from app.read_routing import read_replica
+from app.sensor_registry import get_sensor_registry
 
 bp = Blueprint('main', __name__)
 
@@ -71,22 +77,74 @@ def sensors():
         new_sensor = Sensor(
             name=sensor_form.name.data,
             location=sensor_form.location.data,
-            status=sensor_form.status.data
+            status=sensor_form.status.data,
+            building=sensor_form.building.data or None,
+            floor=sensor_form.floor.data or None,
+            room=sensor_form.room.data or None,
+            heating_zone=sensor_form.heating_zone.data or None
         )
         db.session.add(new_sensor)
+        mark_dashboard_stale()
         db.session.commit()
+        get_zone_hierarchy().add_sensor(new_sensor)
         flash('Sensor added successfully.', 'success')
         return redirect(url_for('main.sensors'))
     all_sensors = db.session.scalars(db.select(Sensor)).all()
+    from app.live_table import live_values
     return render_template(
         'sensor_list.html',
         title='Sensors',
         sensors=all_sensors,
+        live=live_values(s.id for s in all_sensors),
         sensor_form=sensor_form,
-        action_form=action_form
+        action_form=action_form,
+        import_form=SensorImportForm(formdata=None),
+        bulk_status_form=BulkStatusForm(formdata=None)
     )
 
 
+@bp.route('/sensors/import', methods=['POST'], endpoint='import_sensors')
+@login_required
+def import_sensors_view():
+    if current_user.role != 'admin':
+        abort(403)
+    form = SensorImportForm()
+    if not form.validate_on_submit():
+        for error in form.file.errors:
+            flash(error, 'danger')
+        return redirect(url_for('main.sensors'))
+    result = import_sensors(form.file.data.stream, form.default_status.data)
+    if result.errors:
+        # Nothing is imported unless every row is valid
+        for error in result.errors[:10]:
+            flash(error, 'danger')
+        if len(result.errors) > 10:
+            flash(f'... and {len(result.errors) - 10} more errors.', 'danger')
+    else:
+        flash(f'Imported {len(result.created)} sensors.', 'success')
+    return redirect(url_for('main.sensors'))
+
+
+@bp.route('/sensors/bulk_status', methods=['POST'], endpoint='bulk_sensor_status')
+@login_required
+def bulk_sensor_status():
+    if current_user.role != 'admin':
+        abort(403)
+    form = BulkStatusForm()
+    if form.validate_on_submit():
+        changed = bulk_set_status(
+            form.status.data,
+            building=form.building.data or None,
+            location_prefix=form.location_prefix.data or None
+        )
+        flash(f'{changed} sensors set to {form.status.data}.', 'info')
+    else:
+        for errors in form.errors.values():
+            for error in errors:
+                flash(error, 'danger')
+    return redirect(url_for('main.sensors'))
+
+
 @bp.route('/sensors/<int:id>', methods=['GET'], endpoint='sensor_detail')
 @login_required
 def sensor_detail(id):
@@ -105,6 +163,29 @@ def sensor_detail(id):
     )
 
 
+@bp.route('/sensors/<int:id>/history.json', methods=['GET'], endpoint='sensor_history')
+@login_required
+@read_replica
+def sensor_history(id):
+    if current_user.role != 'admin':
+        abort(403)
+    if db.session.get(Sensor, id) is None:
+        abort(404)
+    try:
+        until = datetime.fromisoformat(request.args['until']) if 'until' in request.args else None
+        since = (datetime.fromisoformat(request.args['since']) if 'since' in request.args
+                 else (until or datetime.utcnow()) - timedelta(days=1))
+    except ValueError:
+        return jsonify(error='since and until must be ISO 8601 timestamps'), 400
+    # Archived months are merged in, so this may reach far back in time
+    from app.history import load_historical_temps
+    readings = load_historical_temps(since, until, sensor_ids=[id]).get(id, [])
+    return jsonify(
+        sensor_id=id,
+        readings=[{'timestamp': ts.isoformat(), 'temperature': round(temp, 3)} for ts, temp in readings]
+    )
+
+
 @bp.route('/sensors/remove', methods=['POST'], endpoint='remove_sensor')
 @login_required
 def remove_sensor():
@@ -114,8 +195,15 @@ def remove_sensor():
     if form.validate_on_submit():
         sensor = db.session.get(Sensor, int(form.record_id.data))
         if sensor:
+            sensor_id = sensor.id
             db.session.delete(sensor)
+            mark_dashboard_stale()
             db.session.commit()
+            get_zone_hierarchy().remove_sensor(sensor_id)
+            from app.live_table import get_live_table
+            table = get_live_table()
+            if table is not None:
+                table.clear([sensor_id])
             flash('Sensor removed.', 'warning')
     return redirect(url_for('main.sensors'))
 
@@ -128,8 +216,8 @@ def toggle_sensor_status():
     if form.validate_on_submit():
         sensor = db.session.get(Sensor, int(form.record_id.data))
         if sensor:
-            sensor.status = 'offline' if sensor.status == 'online' else 'online'
-            sensor.set_status(new_status=sensor.status)
+            sensor.set_status('offline' if sensor.status == 'online' else 'online')
+            mark_dashboard_stale()
             db.session.commit()
             flash(f'Sensor status changed to {sensor.status}.', 'info')
     return redirect(url_for('main.sensors'))
@@ -144,24 +232,52 @@ def calibrate_sensor():
     if form.validate_on_submit():
         cal = Calibration(
             sensor_id=int(form.sensor_id.data),
-            notes=form.notes.data
+            notes=form.notes.data,
+            offset=form.offset.data,
+            gain=form.gain.data,
+            effective_from=form.effective_from.data or datetime.utcnow()
         )
         db.session.add(cal)
+        if cal.has_coefficients:
+            mark_dashboard_stale()
         db.session.commit()
+        # Coefficients are cached per sensor; reload this one on next use
+        from app.calibration import invalidate_calibration
+        invalidate_calibration(cal.sensor_id)
         flash('Calibration recorded.', 'info')
     return redirect(url_for('main.sensor_detail', id=form.sensor_id.data))
 
 
+@bp.route('/api/readings', methods=['POST'], endpoint='ingest_readings')
+def ingest_readings_api():
+    # Sensors authenticate with a shared API key rather than a user session
+    if request.headers.get('X-API-Key') != current_app.config['INGEST_API_KEY']:
+        abort(403)
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify(error='Expected a JSON body'), 400
+    # Ingestion pulls in the forecasting stack, so it loads on the first upload
+    from app.ingest import parse_readings, ingest_readings
+    readings, invalid = parse_readings(payload)
+    result = ingest_readings(readings)
+    return jsonify(
+        accepted=result.accepted,
+        rejected=result.rejected + invalid,
+        faults=result.faults
+    ), 202
+
+
+def _sensor_choices():
+    return [(s.id, f"{s.name} ({s.location})") for s in get_sensor_registry().all()]
+
+
 @bp.route('/student', methods=['GET'], endpoint='student_dashboard')
 @login_required
 def student_dashboard():
     if current_user.role != 'student':
         abort(403)
     form = FeedbackForm()
-    form.sensor_id.choices = [
-        (s.id, f"{s.name} ({s.location})")
-        for s in db.session.scalars(db.select(Sensor)).all()
-    ]
+    form.sensor_id.choices = _sensor_choices()
     return render_template(
         'student_feedback.html',
         title='Feedback',
@@ -175,116 +291,112 @@ def submit_feedback():
     if current_user.role != 'student':
         abort(403)
     form = FeedbackForm()
-    form.sensor_id.choices = [
-        (s.id, f"{s.name} ({s.location})")
-        for s in db.session.scalars(db.select(Sensor)).all()
-    ]
+    status = 200
+    # The sensor is looked up by id, so the full sensor list is only loaded
+    # when the form has to be shown again
     if form.validate_on_submit():
-        fb = Feedback(
-            user_id=current_user.id,
-            sensor_id=form.sensor_id.data,
-            rating=form.rating.data,
-            comment=form.comment.data
-        )
-        db.session.add(fb)
-        db.session.commit()
-        flash('Thank you for your feedback!', 'success')
-        return redirect(url_for('main.student_dashboard'))
+        admission = get_feedback_admission()
+        decision = admission.admit(current_user.id, form.sensor_id.data)
+        # Row-locked: concurrent submissions for a sensor update its scores in turn
+        sensor = Sensor.get_for_update(form.sensor_id.data) if decision.action != REJECT else None
+        if decision.action == REJECT:
+            flash('Too much feedback is arriving right now. Please try again in a minute.', 'warning')
+            status = 429
+        elif sensor is None:
+            form.sensor_id.errors.append('Not a valid choice.')
+        else:
+            now = datetime.utcnow()
+            fb = db.session.get(Feedback, decision.feedback_id) if decision.action == MERGE else None
+            merged = fb is not None
+            if not merged:
+                fb = Feedback(
+                    user_id=current_user.id,
+                    sensor_id=sensor.id,
+                    rating=form.rating.data,
+                    comment=form.comment.data,
+                    submitted_at=now
+                )
+                db.session.add(fb)
+            else:
+                # A repeat within the dedup window replaces the earlier rating
+                fb.rating = form.rating.data
+                fb.comment = form.comment.data or fb.comment
+                fb.submitted_at = now
+            # Decayed scores are updated in the same transaction as the feedback row
+            sensor.record_feedback(fb.rating, now)
+            if merged:
+                sensor.retract_feedback(decision.previous_rating, decision.previous_at)
+            mark_dashboard_stale()
+            db.session.commit()
+            hierarchy = get_zone_hierarchy()
+            if merged:
+                hierarchy.record_feedback(sensor.id, decision.previous_rating, -1)
+            hierarchy.record_feedback(sensor.id, fb.rating)
+            admission.remember(current_user.id, sensor.id, fb.id, fb.rating, now)
+            if merged:
+                flash('Your earlier feedback for this room has been updated.', 'success')
+            else:
+                flash('Thank you for your feedback!', 'success')
+            return redirect(url_for('main.student_dashboard'))
+    form.sensor_id.choices = _sensor_choices()
     return render_template(
         'student_feedback.html',
         title='Submit Feedback',
         feedback_form=form
-    )
+    ), status
 
 
-@bp.route('/admin', methods=['GET'], endpoint='admin_dashboard')
+@bp.route('/admin/feedback_admission.json', methods=['GET'], endpoint='feedback_admission_stats')
 @login_required
-def admin_dashboard():
+def feedback_admission_stats():
     if current_user.role != 'admin':
         abort(403)
+    return jsonify(get_feedback_admission().stats())
 
-    # Fetch data
-    sensors   = db.session.scalars(db.select(Sensor)).all()
-    feedbacks = db.session.scalars(db.select(Feedback)).all()
 
-    # Generate AI-style summaries
-    sensor_summary   = summarize_sensors(sensors)
-    feedback_summary = summarize_feedback(feedbacks)
-
-    # Compute sensor counts
-    all_sensors   = sensors
-    online_count  = sum(1 for s in sensors if s.status == 'online')
-    offline_count = sum(1 for s in sensors if s.status == 'offline')
-
-    # Compute overall feedback counts
-    all_feedbacks = feedbacks
-    hot_count     = sum(1 for fb in feedbacks if fb.rating == 'hot')
-    ok_count      = sum(1 for fb in feedbacks if fb.rating == 'ok')
-    cold_count    = sum(1 for fb in feedbacks if fb.rating == 'cold')
-
-    # Compute per-sensor feedback counts for table badges
-    feedback_counts = { s.id: {'hot':0, 'ok':0, 'cold':0} for s in sensors }
-    for fb in feedbacks:
-        if fb.sensor_id in feedback_counts:
-            feedback_counts[fb.sensor_id][fb.rating] += 1
-
-    # Simulate live temperature per sensor
-    live_temps = simulate_live_temperatures(sensors)
-
-    # Use hard‑coded outdoor data
-    outdoor_data = get_demo_outdoor_data()
-    latest_outdoor_temp = outdoor_data[-1].temp if outdoor_data else None
-
-    # Generate thermostat adjustment suggestions
-    thermostat_suggestions = suggest_thermostat_adjustments(
-        sensors,
-        feedbacks,
-        live_temps
-    )
+@bp.route('/admin', methods=['GET'], endpoint='admin_dashboard')
+@login_required
+@read_replica
+def admin_dashboard():
+    if current_user.role != 'admin':
+        abort(403)
 
-    # Load historical temperature readings (last 2 hours)
-    from datetime import datetime, timedelta
-    cutoff = datetime.utcnow() - timedelta(hours=2)
-    rows = db.session.scalars(
-        db.select(TemperatureReading)
-          .where(TemperatureReading.timestamp >= cutoff)
-    ).all()
-    historical_temps = {}
-    for tr in rows:
-        historical_temps.setdefault(tr.sensor_id, []).append((tr.timestamp, tr.temperature))
-
-    # Build feature vectors for ML/demo
-    feature_vectors = aggregate_sensor_features(
-        sensors=sensors,
-        feedbacks=feedbacks,
-        live_temps=live_temps,
-        historical_temps=historical_temps,
-        outdoor_data=outdoor_data
-    )
-    from app.analysis import ACCEPTABLE_LOW, ACCEPTABLE_HIGH
+    # Rendered from the materialised snapshot: one read, no analysis per request
+    snapshot = load_dashboard_snapshot()
+    dashboard = json.loads(snapshot.payload)
+
+    # Temperatures and statuses newer than the snapshot come from the live table
+    from app.live_table import live_values, fresh_temperatures
+    live = live_values(row['id'] for row in dashboard['sensors'])
+    temps = fresh_temperatures(live)
+    for row in dashboard['sensors']:
+        value = live.get(row['id'])
+        if value is not None:
+            row['status'] = value.status or row['status']
+            row['temp'] = temps.get(row['id'], row['temp'])
     return render_template(
         'admin_dashboard.html',
         title='Admin Dashboard',
-        all_sensors=all_sensors,
-        online_count=online_count,
-        offline_count=offline_count,
-        all_feedbacks=all_feedbacks,
-        hot_count=hot_count,
-        ok_count=ok_count,
-        cold_count=cold_count,
-        feedback_counts=feedback_counts,
-        sensor_summary=sensor_summary,
-        feedback_summary=feedback_summary,
-        live_temps=live_temps,
-        thermostat_suggestions=thermostat_suggestions,
-        feature_vectors=feature_vectors,
-        outdoor_data=outdoor_data,
-        latest_outdoor_temp=latest_outdoor_temp,
-        # thresholds for template coloring
-        ACCEPTABLE_LOW=ACCEPTABLE_LOW,
-        ACCEPTABLE_HIGH=ACCEPTABLE_HIGH,
+        snapshot_age=int((datetime.utcnow() - snapshot.built_at).total_seconds()),
+        **dashboard
     )
 
+
+@bp.route('/admin/dashboard.json', methods=['GET'], endpoint='admin_dashboard_json')
+@login_required
+@read_replica
+def admin_dashboard_json():
+    if current_user.role != 'admin':
+        abort(403)
+
+    # The stored payload is sent as-is; clients revalidate with If-None-Match
+    snapshot = load_dashboard_snapshot()
+    response = current_app.response_class(snapshot.payload, mimetype='application/json')
+    response.set_etag(snapshot.etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.headers['X-Snapshot-Built-At'] = snapshot.built_at.isoformat()
+    return response.make_conditional(request)
+
 @bp.app_errorhandler(403)
 def forbidden(error):
     return render_template('errors/403.html', title='Forbidden'), 403
@@ -308,6 +420,7 @@ def server_error(error):
 # View to show all feedbacks (admin only)
 @bp.route('/feedbacks', methods=['GET'], endpoint='all_feedbacks')
 @login_required
+@read_replica
 def all_feedbacks():
     if current_user.role != 'admin':
         abort(403)
@@ -318,3 +431,32 @@ def all_feedbacks():
         title='All Feedbacks',
         feedbacks=feedbacks
     )
+
+
+@bp.route('/feedbacks/search', methods=['GET'], endpoint='search_feedbacks')
+@login_required
+@read_replica
+def search_feedbacks():
+    if current_user.role != 'admin':
+        abort(403)
+    form = FeedbackSearchForm(formdata=request.args)
+    form.sensor_id.choices = [(0, 'Any')] + [
+        (s.id, f"{s.name} ({s.location})")
+        for s in sorted(get_sensor_registry().all(), key=lambda s: s.name)
+    ]
+    results = None
+    if request.args and form.validate():
+        results = search_feedback(
+            keywords=form.q.data or '',
+            sensor_id=form.sensor_id.data or None,
+            rating=form.rating.data or None,
+            since=datetime.combine(form.since.data, time.min) if form.since.data else None,
+            until=datetime.combine(form.until.data + timedelta(days=1), time.min) if form.until.data else None,
+            page=request.args.get('page', 1, type=int),
+        )
+    return render_template(
+        'feedback_search.html',
+        title='Search Feedback',
+        form=form,
+        results=results,
+    )
@@ -0,0 +1,185 @@
+"""
+Outdoor weather providers and a TTL-cached, time-sorted timeline of conditions.
+"""
+
+import bisect
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Optional
+
+from flask import current_app
+
+
+@dataclass
+class OutdoorCondition:
+    timestamp: datetime
+    temp: float       # °C
+    humidity: float   # % RH
+    code: str         # e.g. 'Sunny', 'Cloudy'
+
+
+# -----------------------
+# Providers
+# -----------------------
+
+class OutdoorDataProvider:
+    def fetch(self) -> List[OutdoorCondition]:
+        """
+        Return outdoor conditions, in any order.
+        """
+        raise NotImplementedError
+
+
+class DemoOutdoorProvider(OutdoorDataProvider):
+    """
+    Fixed hourly outdoor readings for demo purposes.
+    """
+    def fetch(self) -> List[OutdoorCondition]:
+        now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        # build 6 hours of past data plus current hour
+        demo = []
+        for hours_ago, (t, h, c) in enumerate([
+            (15.2, 55, 'Cloudy'),
+            (14.8, 57, 'Cloudy'),
+            (14.5, 60, 'Partly Cloudy'),
+            (14.0, 62, 'Sunny'),
+            (13.7, 65, 'Sunny'),
+            (13.5, 67, 'Fog'),
+        ]):
+            demo.append(
+                OutdoorCondition(
+                    timestamp=now - timedelta(hours=5 - hours_ago),
+                    temp=t,
+                    humidity=h,
+                    code=c
+                )
+            )
+        return demo
+
+
+class FileOutdoorProvider(OutdoorDataProvider):
+    """
+    Reads outdoor conditions from a local file for offline use.
+
+    Accepts either a JSON list of objects or a CSV file, both with the keys
+    timestamp (ISO 8601), temp, humidity and code.
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self) -> List[OutdoorCondition]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, newline='') as fh:
+            if self.path.endswith('.csv'):
+                rows = list(csv.DictReader(fh))
+            else:
+                rows = json.load(fh)
+        return [
+            OutdoorCondition(
+                timestamp=datetime.fromisoformat(row['timestamp']),
+                temp=float(row['temp']),
+                humidity=float(row['humidity']),
+                code=row.get('code') or 'Unknown'
+            )
+            for row in rows
+        ]
+
+
+# -----------------------
+# Time-sorted storage
+# -----------------------
+
+class OutdoorTimeline:
+    """
+    Outdoor conditions kept sorted by timestamp for binary-search lookups.
+    """
+    def __init__(self, conditions: Iterable[OutdoorCondition] = ()):
+        self._conditions = sorted(conditions, key=lambda c: c.timestamp)
+        self._timestamps = [c.timestamp for c in self._conditions]
+
+    def __len__(self) -> int:
+        return len(self._conditions)
+
+    def __iter__(self) -> Iterator[OutdoorCondition]:
+        return iter(self._conditions)
+
+    def __getitem__(self, index):
+        return self._conditions[index]
+
+    def add(self, condition: OutdoorCondition):
+        """
+        Insert a condition while keeping the timeline sorted.
+        """
+        idx = bisect.bisect_right(self._timestamps, condition.timestamp)
+        self._timestamps.insert(idx, condition.timestamp)
+        self._conditions.insert(idx, condition)
+
+    def latest(self) -> Optional[OutdoorCondition]:
+        return self._conditions[-1] if self._conditions else None
+
+    def nearest(self, ts: datetime) -> Optional[OutdoorCondition]:
+        """
+        Return the condition whose timestamp is closest to ts (ties go to the earlier one).
+        """
+        if not self._conditions:
+            return None
+        idx = bisect.bisect_left(self._timestamps, ts)
+        if idx == 0:
+            return self._conditions[0]
+        if idx == len(self._timestamps):
+            return self._conditions[-1]
+        before, after = self._timestamps[idx - 1], self._timestamps[idx]
+        return self._conditions[idx - 1] if ts - before <= after - ts else self._conditions[idx]
+
+
+class CachedOutdoorSource:
+    """
+    Wraps a provider and refetches it at most once per TTL.
+    """
+    def __init__(self, provider: OutdoorDataProvider, ttl: float, clock=time.monotonic):
+        self.provider = provider
+        self.ttl = ttl
+        self._clock = clock
+        self._timeline: Optional[OutdoorTimeline] = None
+        self._fetched_at = 0.0
+
+    def timeline(self) -> OutdoorTimeline:
+        now = self._clock()
+        if self._timeline is None or now - self._fetched_at >= self.ttl:
+            self._timeline = OutdoorTimeline(self.provider.fetch())
+            self._fetched_at = now
+        return self._timeline
+
+    def invalidate(self):
+        self._timeline = None
+
+
+def make_outdoor_provider(config) -> OutdoorDataProvider:
+    """
+    Build the provider selected by OUTDOOR_PROVIDER ('demo' or 'file').
+    """
+    kind = config.get('OUTDOOR_PROVIDER', 'demo')
+    if kind == 'demo':
+        return DemoOutdoorProvider()
+    if kind == 'file':
+        return FileOutdoorProvider(config['OUTDOOR_DATA_FILE'])
+    raise ValueError(f"Unknown outdoor provider: {kind}")
+
+
+def get_outdoor_timeline() -> OutdoorTimeline:
+    """
+    Return the cached outdoor timeline for the current app.
+    """
+    source = current_app.extensions.get('outdoor_source')
+    if source is None:
+        source = CachedOutdoorSource(
+            make_outdoor_provider(current_app.config),
+            ttl=current_app.config.get('OUTDOOR_CACHE_TTL', 600)
+        )
+        current_app.extensions['outdoor_source'] = source
+    return source.timeline()
@@ -0,0 +1,264 @@
+"""
+Building/zone hierarchy (building -> floor -> room -> sensors) with rollups
+of temperatures and feedback counts that are maintained incrementally.
+
+Request threads and the scheduler thread share the app's hierarchy, so it
+is changed and read under a lock. Each worker process keeps its own copy,
+rebuilt from the database every ZONE_HIERARCHY_TTL seconds so feedback
+recorded by other workers shows up.
+"""
+
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+
+from app import db
+
+_ROOM_NUMBER = re.compile(r'(\d+)')
+
+
+def parse_location(location: str) -> Tuple[str, str, str]:
+    """
+    Derive (building, floor, room) from a free-text location such as
+    'Building 1 - Room 101'. The floor is taken from the hundreds digit of
+    the room number; anything unparseable ends up on floor '0'.
+    """
+    parts = [p.strip() for p in (location or '').split(' - ', 1)]
+    building = parts[0] or 'Unknown'
+    room = parts[1] if len(parts) > 1 and parts[1] else building
+    match = _ROOM_NUMBER.search(room)
+    floor = str(int(match.group(1)) // 100) if match else '0'
+    return building, floor, room
+
+
+def default_heating_zone(building: str, floor: str) -> str:
+    return f"{building} / Floor {floor}"
+
+
+class ZoneRollup:
+    """
+    Running totals for one node; each sensor contributes its latest temperature once.
+    """
+    __slots__ = ('temp_sum', 'temp_count', 'hot', 'ok', 'cold')
+
+    def __init__(self):
+        self.temp_sum = 0.0
+        self.temp_count = 0
+        self.hot = 0
+        self.ok = 0
+        self.cold = 0
+
+    @property
+    def avg_temp(self) -> Optional[float]:
+        return self.temp_sum / self.temp_count if self.temp_count else None
+
+    @property
+    def feedback_total(self) -> int:
+        return self.hot + self.ok + self.cold
+
+    def add_feedback(self, rating: str, delta: int = 1):
+        setattr(self, rating, getattr(self, rating) + delta)
+
+    def copy(self) -> 'ZoneRollup':
+        rollup = ZoneRollup()
+        for name in self.__slots__:
+            setattr(rollup, name, getattr(self, name))
+        return rollup
+
+
+class ZoneNode:
+    """
+    A building, floor or room in the hierarchy.
+    """
+    __slots__ = ('name', 'kind', 'parent', 'children', 'sensor_ids', 'rollup')
+
+    def __init__(self, name: str, kind: str, parent: Optional['ZoneNode'] = None):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.children: Dict[str, 'ZoneNode'] = {}
+        self.sensor_ids = set()
+        self.rollup = ZoneRollup()
+
+    def child(self, name: str, kind: str) -> 'ZoneNode':
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = ZoneNode(name, kind, self)
+        return node
+
+
+class HeatingZone:
+    """
+    Set of sensors whose rooms share one thermostat.
+    """
+    __slots__ = ('name', 'sensor_ids', 'rollup')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.sensor_ids = set()
+        self.rollup = ZoneRollup()
+
+
+class ZoneHierarchy:
+    """
+    Places sensors in the building tree and in heating zones. Every update
+    touches only the rollups on the sensor's own path (room, floor, building,
+    heating zone), so cost is independent of the number of rooms.
+    """
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.loaded_at = clock()
+        self.buildings: Dict[str, ZoneNode] = {}
+        self.heating_zones: Dict[str, HeatingZone] = {}
+        self._paths: Dict[int, tuple] = {}
+        self._temps: Dict[int, float] = {}
+        self._feedback: Dict[int, Dict[str, int]] = {}   # sensor id -> rating -> count
+        self._lock = threading.Lock()
+
+    def _rollups(self, sensor_id: int):
+        path = self._paths.get(sensor_id)
+        if path is None:
+            return ()
+        room, zone = path
+        rollups = [zone.rollup]
+        node = room
+        while node is not None:
+            rollups.append(node.rollup)
+            node = node.parent
+        return rollups
+
+    def add_sensor(self, sensor):
+        """
+        Place a Sensor (or any object with id and zone attributes) in the hierarchy.
+        """
+        with self._lock:
+            self._add_sensor(sensor)
+
+    def _add_sensor(self, sensor):
+        if sensor.id in self._paths:
+            # Moving a sensor: take its contributions along to the new path
+            temp = self._temps.get(sensor.id)
+            feedback = dict(self._feedback.get(sensor.id, {}))
+            self._remove_sensor(sensor.id)
+            self._add_sensor(sensor)
+            for rating, count in feedback.items():
+                self._record_feedback(sensor.id, rating, count)
+            self._record_temperature(sensor.id, temp)
+            return
+        building_name, floor_name, room_name = sensor.zone_path
+        building = self.buildings.get(building_name)
+        if building is None:
+            building = self.buildings[building_name] = ZoneNode(building_name, 'building')
+        room = building.child(floor_name, 'floor').child(room_name, 'room')
+        zone = self.heating_zones.get(sensor.zone_name)
+        if zone is None:
+            zone = self.heating_zones[sensor.zone_name] = HeatingZone(sensor.zone_name)
+        room.sensor_ids.add(sensor.id)
+        zone.sensor_ids.add(sensor.id)
+        self._paths[sensor.id] = (room, zone)
+
+    def remove_sensor(self, sensor_id: int):
+        """
+        Remove a sensor and its temperature and feedback contributions (its
+        feedback rows are deleted with it).
+        """
+        with self._lock:
+            self._remove_sensor(sensor_id)
+
+    def _remove_sensor(self, sensor_id: int):
+        self._record_temperature(sensor_id, None)
+        for rating, count in self._feedback.pop(sensor_id, {}).items():
+            for rollup in self._rollups(sensor_id):
+                rollup.add_feedback(rating, -count)
+        path = self._paths.pop(sensor_id, None)
+        if path is not None:
+            room, zone = path
+            room.sensor_ids.discard(sensor_id)
+            zone.sensor_ids.discard(sensor_id)
+
+    def record_temperature(self, sensor_id: int, temp: Optional[float]):
+        """
+        Replace the sensor's contribution to every rollup on its path.
+        """
+        with self._lock:
+            self._record_temperature(sensor_id, temp)
+
+    def _record_temperature(self, sensor_id: int, temp: Optional[float]):
+        old = self._temps.pop(sensor_id, None)
+        if temp is not None and sensor_id in self._paths:
+            self._temps[sensor_id] = temp
+        if old == temp:
+            return
+        for rollup in self._rollups(sensor_id):
+            if old is not None:
+                rollup.temp_sum -= old
+                rollup.temp_count -= 1
+            if temp is not None:
+                rollup.temp_sum += temp
+                rollup.temp_count += 1
+
+    def record_temperatures(self, temps: Dict[int, float]):
+        with self._lock:
+            for sensor_id, temp in temps.items():
+                self._record_temperature(sensor_id, temp)
+
+    def record_feedback(self, sensor_id: int, rating: str, delta: int = 1):
+        with self._lock:
+            self._record_feedback(sensor_id, rating, delta)
+
+    def _record_feedback(self, sensor_id: int, rating: str, delta: int):
+        if sensor_id not in self._paths:
+            return
+        counts = self._feedback.setdefault(sensor_id, {})
+        counts[rating] = counts.get(rating, 0) + delta
+        for rollup in self._rollups(sensor_id):
+            rollup.add_feedback(rating, delta)
+
+    def zone_of(self, sensor_id: int) -> Optional[HeatingZone]:
+        path = self._paths.get(sensor_id)
+        return path[1] if path else None
+
+    def zone_rollups(self) -> List[Tuple[str, int, ZoneRollup]]:
+        """
+        (name, sensor count, copy of the rollup) per heating zone, by name,
+        taken together so the figures are consistent with each other.
+        """
+        with self._lock:
+            return [(name, len(zone.sensor_ids), zone.rollup.copy())
+                    for name, zone in sorted(self.heating_zones.items())]
+
+    @classmethod
+    def build(cls, sensors: Iterable, feedback_counts: Iterable[Tuple[int, str, int]] = ()):
+        """
+        Build a hierarchy from sensors and (sensor_id, rating, count) rows.
+        """
+        hierarchy = cls()
+        for sensor in sensors:
+            hierarchy.add_sensor(sensor)
+        for sensor_id, rating, count in feedback_counts:
+            hierarchy.record_feedback(sensor_id, rating, count)
+        return hierarchy
+
+
+def get_zone_hierarchy() -> ZoneHierarchy:
+    """
+    Return the app's zone hierarchy, loading it from the database on first use
+    and again once it is older than ZONE_HIERARCHY_TTL seconds. Feedback is
+    loaded as grouped counts rather than individual rows.
+    """
+    hierarchy = current_app.extensions.get('zone_hierarchy')
+    ttl = current_app.config.get('ZONE_HIERARCHY_TTL', 60)
+    if hierarchy is None or hierarchy.clock() - hierarchy.loaded_at >= ttl:
+        from app.models import Feedback
+        from app.sensor_registry import get_sensor_registry
+        sensors = get_sensor_registry().all()
+        counts = db.session.execute(
+            db.select(Feedback.sensor_id, Feedback.rating, db.func.count())
+              .group_by(Feedback.sensor_id, Feedback.rating)
+        ).all()
+        hierarchy = ZoneHierarchy.build(sensors, counts)
+        current_app.extensions['zone_hierarchy'] = hierarchy
+    return hierarchy
@@ -0,0 +1,73 @@
+"""
+Benchmark the streaming anomaly detector and the ingestion path.
+
+Usage: python benchmarks/bench_anomaly.py [--sensors 5000] [--readings 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def bench_detector(n_sensors: int, per_sensor: int):
+    from app.anomaly import AnomalyMonitor
+
+    monitor = AnomalyMonitor()
+    rng = random.Random(42)
+    # interleave sensors the way a live feed would
+    stream = [(sid, t * 60.0, 21.0 + rng.gauss(0, 0.3))
+              for t in range(per_sensor) for sid in range(n_sensors)]
+    start = time.perf_counter()
+    events = 0
+    for sid, ts, value in stream:
+        if monitor.observe(sid, ts, value) is not None:
+            events += 1
+    elapsed = time.perf_counter() - start
+    print(f"detector: {len(stream):,} readings, {n_sensors:,} sensors, {events} events")
+    print(f"  {elapsed:.2f}s total, {elapsed / len(stream) * 1e6:.2f} µs/reading, "
+          f"{len(stream) / elapsed:,.0f} readings/s")
+
+
+def bench_ingest(n_sensors: int, batch_size: int, batches: int):
+    import config
+    config.Config.SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    from app import create_app, db
+    from app.models import Sensor
+    from app.ingest import ingest_readings
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(
+            Sensor(name=f'Bench {i}', location=f'Building 1 - Room {i}', status='online')
+            for i in range(n_sensors)
+        )
+        db.session.commit()
+        ids = list(db.session.scalars(db.select(Sensor.id)))
+        rng = random.Random(7)
+        base = datetime.utcnow()
+        total = 0
+        start = time.perf_counter()
+        for b in range(batches):
+            batch = [(rng.choice(ids), base + timedelta(seconds=b * batch_size + i), 21.0 + rng.gauss(0, 0.3))
+                     for i in range(batch_size)]
+            total += ingest_readings(batch).accepted
+        elapsed = time.perf_counter() - start
+    print(f"ingest: {total:,} readings in batches of {batch_size}")
+    print(f"  {elapsed:.2f}s total, {elapsed / total * 1e6:.2f} µs/reading, {total / elapsed:,.0f} readings/s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sensors', type=int, default=5000)
+    parser.add_argument('--readings', type=int, default=200, help='readings per sensor')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--batches', type=int, default=20)
+    args = parser.parse_args()
+    bench_detector(args.sensors, args.readings)
+    bench_ingest(args.sensors, args.batch_size, args.batches)
@@ -0,0 +1,60 @@
+"""
+Benchmark app startup: import time, create_app() and time to first request.
+
+Each run is a fresh interpreter so nothing is already imported.
+
+Usage: python benchmarks/bench_startup.py [--runs 10] [--path /login]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Runs in the child interpreter; prints one JSON line of timings
+PROBE = '''
+import json, sys, time
+t0 = time.perf_counter()
+import config
+config.Config.SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+config.Config.SCHEDULER_ENABLED = False
+from app import create_app
+t1 = time.perf_counter()
+app = create_app()
+t2 = time.perf_counter()
+rv = app.test_client().get(sys.argv[1])
+t3 = time.perf_counter()
+print(json.dumps({
+    'import': t1 - t0, 'create_app': t2 - t1, 'first_request': t3 - t2,
+    'status': rv.status_code,
+    'heavy': sorted(m for m in ('numpy', 'app.analysis', 'app.forecast', 'app.inference')
+                    if m in sys.modules),
+}))
+'''
+
+
+def run_once(path: str) -> dict:
+    out = subprocess.run([sys.executable, '-c', PROBE, path], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--path', default='/login', help='URL of the first request')
+    args = parser.parse_args()
+
+    runs = [run_once(args.path) for _ in range(args.runs)]
+    print(f"startup over {args.runs} fresh interpreters (first request: GET {args.path} "
+          f"-> {runs[0]['status']})")
+    for phase in ('import', 'create_app', 'first_request'):
+        times = [r[phase] * 1000 for r in runs]
+        print(f"  {phase:<14} median {statistics.median(times):7.1f} ms   min {min(times):7.1f} ms")
+    totals = [(r['import'] + r['create_app'] + r['first_request']) * 1000 for r in runs]
+    print(f"  {'total':<14} median {statistics.median(totals):7.1f} ms   min {min(totals):7.1f} ms")
+    print(f"  heavy modules loaded: {', '.join(runs[0]['heavy']) or 'none'}")
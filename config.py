@@ -15,5 +15,137 @@ class Config:
     # (Optional but recommended)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Dashboards, history and feedback listings read through a separate
+    # engine: DATABASE_READ_URL (a replica) if set, else a read-only
+    # connection to the SQLite file, with the file switched to WAL
+    SQLALCHEMY_READ_URI = os.environ.get('DATABASE_READ_URL')
+    SQLITE_WAL = os.environ.get('SQLITE_WAL', '1') == '1'
+
+    # Latest value per sensor shared by all worker processes through a
+    # memory-mapped file; defaults to "<database file>.live" for SQLite.
+    # Slot index is the sensor id, so LIVE_TABLE_SLOTS bounds the ids kept
+    LIVE_TABLE_PATH = os.environ.get('LIVE_TABLE_PATH')
+    LIVE_TABLE_SLOTS = int(os.environ.get('LIVE_TABLE_SLOTS', 65536))
+
+    # In-memory sensor registry: this process's commits update it at once;
+    # changes from other workers show up after at most SENSOR_REGISTRY_TTL seconds
+    SENSOR_REGISTRY_TTL = int(os.environ.get('SENSOR_REGISTRY_TTL', 60))
+    # Zone rollups likewise: rebuilt from the database every ZONE_HIERARCHY_TTL
+    # seconds, so other workers' feedback reaches this worker's zone counts
+    ZONE_HIERARCHY_TTL = int(os.environ.get('ZONE_HIERARCHY_TTL', 60))
+
     UPLOAD_FOLDER = os.path.join(BASEDIR, 'app', 'data', 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+
+    # Outdoor weather provider: 'demo' (built-in sample data) or 'file'
+    # (JSON/CSV on disk, for offline use); fetched at most once per TTL seconds
+    OUTDOOR_PROVIDER = os.environ.get('OUTDOOR_PROVIDER', 'demo')
+    OUTDOOR_DATA_FILE = os.environ.get(
+        'OUTDOOR_DATA_FILE',
+        os.path.join(BASEDIR, 'app', 'data', 'outdoor.json')
+    )
+    OUTDOOR_CACHE_TTL = int(os.environ.get('OUTDOOR_CACHE_TTL', 600))
+
+    # Feedback scores halve in weight every FEEDBACK_HALF_LIFE_HOURS; rebuilds
+    # only scan feedback from the last FEEDBACK_SCORE_WINDOW_HOURS
+    FEEDBACK_HALF_LIFE_HOURS = float(os.environ.get('FEEDBACK_HALF_LIFE_HOURS', 24))
+    FEEDBACK_SCORE_WINDOW_HOURS = float(os.environ.get('FEEDBACK_SCORE_WINDOW_HOURS', 24 * 14))
+
+    # Feedback admission (per process): token buckets per student and per
+    # sensor, and the window in which a student's repeat rating for the same
+    # sensor updates their earlier row instead of adding one
+    FEEDBACK_USER_PER_MINUTE = float(os.environ.get('FEEDBACK_USER_PER_MINUTE', 2))
+    FEEDBACK_USER_BURST = int(os.environ.get('FEEDBACK_USER_BURST', 5))
+    FEEDBACK_SENSOR_PER_MINUTE = float(os.environ.get('FEEDBACK_SENSOR_PER_MINUTE', 120))
+    FEEDBACK_SENSOR_BURST = int(os.environ.get('FEEDBACK_SENSOR_BURST', 300))
+    FEEDBACK_DEDUP_SECONDS = int(os.environ.get('FEEDBACK_DEDUP_SECONDS', 600))
+
+    # Shared key sensors send in the X-API-Key header when posting readings
+    INGEST_API_KEY = os.environ.get('INGEST_API_KEY', 'dev-ingest-key')
+
+    # Streaming anomaly detection on ingested readings: EWMA smoothing, z-score
+    # limit, max rate of change (°C/min, measured over at least
+    # ANOMALY_RATE_MIN_SECONDS) and how long a constant value may last
+    ANOMALY_EWMA_ALPHA = float(os.environ.get('ANOMALY_EWMA_ALPHA', 0.1))
+    ANOMALY_Z_LIMIT = float(os.environ.get('ANOMALY_Z_LIMIT', 4.0))
+    ANOMALY_MAX_RATE = float(os.environ.get('ANOMALY_MAX_RATE', 2.0))
+    ANOMALY_RATE_MIN_SECONDS = int(os.environ.get('ANOMALY_RATE_MIN_SECONDS', 60))
+    ANOMALY_FLATLINE_SECONDS = int(os.environ.get('ANOMALY_FLATLINE_SECONDS', 6 * 3600))
+
+    # Background jobs run on a daemon thread in each process that enables
+    # them. They are off by default so CLI commands (load-readings drops the
+    # readings index while it runs), flask shell and the reloader's parent
+    # process never start them: set SCHEDULER_ENABLED=1 for the serving
+    # process only.
+    # Sensors silent for SENSOR_TIMEOUT_SECONDS are swept to 'offline'.
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', '0') == '1'
+    SENSOR_TIMEOUT_SECONDS = int(os.environ.get('SENSOR_TIMEOUT_SECONDS', 900))
+    STALENESS_SWEEP_INTERVAL = int(os.environ.get('STALENESS_SWEEP_INTERVAL', 60))
+
+    # Maintenance and calibration alerts fire only for status changes that
+    # last ALERT_MIN_DWELL_SECONDS. ALERT_FLAP_THRESHOLD changes within
+    # ALERT_FLAP_WINDOW_SECONDS mark a sensor as flapping, and its alerts
+    # wait for a quiet window. Settled changes go out as one digest every
+    # ALERT_DIGEST_INTERVAL seconds. With the outbox event bus this runs on
+    # the one worker holding the alerting cursor (see EVENT_BUS_LEASE_SECONDS)
+    ALERT_MIN_DWELL_SECONDS = int(os.environ.get('ALERT_MIN_DWELL_SECONDS', 120))
+    ALERT_FLAP_WINDOW_SECONDS = int(os.environ.get('ALERT_FLAP_WINDOW_SECONDS', 900))
+    ALERT_FLAP_THRESHOLD = int(os.environ.get('ALERT_FLAP_THRESHOLD', 4))
+    ALERT_DIGEST_INTERVAL = int(os.environ.get('ALERT_DIGEST_INTERVAL', 30))
+
+    # Sensor status event transport: 'local' (single process) or 'outbox'
+    # (events shared between worker processes through the database).
+    # Set EVENT_BUS_WORKER_ID to a stable name to resume a worker's cursor.
+    # Alerting runs on one worker at a time; another takes over once it has
+    # not polled for EVENT_BUS_LEASE_SECONDS.
+    EVENT_BUS_BACKEND = os.environ.get('EVENT_BUS_BACKEND', 'local')
+    EVENT_BUS_WORKER_ID = os.environ.get('EVENT_BUS_WORKER_ID')
+    EVENT_BUS_POLL_INTERVAL = float(os.environ.get('EVENT_BUS_POLL_INTERVAL', 1))
+    EVENT_BUS_BATCH_SIZE = int(os.environ.get('EVENT_BUS_BATCH_SIZE', 500))
+    EVENT_BUS_RETENTION_SECONDS = int(os.environ.get('EVENT_BUS_RETENTION_SECONDS', 86400))
+    EVENT_BUS_LEASE_SECONDS = int(os.environ.get('EVENT_BUS_LEASE_SECONDS', 30))
+
+    # Thermostat suggestions: how far back inside the band a room must get
+    # before a suggestion is dropped, how often a sensor's suggestion may
+    # change, and the decayed hot-minus-cold score that triggers one
+    SUGGESTION_DEADBAND = float(os.environ.get('SUGGESTION_DEADBAND', 0.5))
+    SUGGESTION_COOLDOWN_SECONDS = int(os.environ.get('SUGGESTION_COOLDOWN_SECONDS', 900))
+    SUGGESTION_FEEDBACK_MARGIN = float(os.environ.get('SUGGESTION_FEEDBACK_MARGIN', 1.0))
+
+    # Comfort model: parameters saved by LinearComfortModel.save (built-in
+    # defaults when unset) and the worker processes that score cache misses
+    # (0 scores them in the calling thread)
+    INFERENCE_MODEL_PATH = os.environ.get('INFERENCE_MODEL_PATH')
+    INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', 0))
+
+    # Temperature forecasts: how far ahead, how quickly older readings lose
+    # weight, the (decayed) number of readings needed before forecasting and
+    # how long after its last reading a sensor is still forecast
+    FORECAST_HORIZON_MINUTES = int(os.environ.get('FORECAST_HORIZON_MINUTES', 30))
+    FORECAST_HALF_LIFE_MINUTES = int(os.environ.get('FORECAST_HALF_LIFE_MINUTES', 120))
+    FORECAST_MIN_READINGS = float(os.environ.get('FORECAST_MIN_READINGS', 3))
+    FORECAST_MAX_AGE_MINUTES = int(os.environ.get('FORECAST_MAX_AGE_MINUTES', 360))
+
+    # Seconds a worker may keep cached calibration coefficients; the worker
+    # that records a calibration drops its cached entry immediately
+    CALIBRATION_CACHE_TTL = int(os.environ.get('CALIBRATION_CACHE_TTL', 300))
+
+    # Readings older than READING_RETENTION_DAYS are moved from the database
+    # into per-sensor, per-month column files under ARCHIVE_DIR; the archive
+    # job checks every ARCHIVE_INTERVAL seconds
+    ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', os.path.join(BASEDIR, 'app', 'data', 'archive'))
+    READING_RETENTION_DAYS = int(os.environ.get('READING_RETENTION_DAYS', 30))
+    ARCHIVE_INTERVAL = int(os.environ.get('ARCHIVE_INTERVAL', 3600))
+
+    # Batch comfort analytics over hourly rollups: the window analysed, how
+    # often the job recomputes it, the hours of data a sensor needs to be
+    # correlated and how many most-similar sensors are listed for each
+    ANALYTICS_WINDOW_HOURS = int(os.environ.get('ANALYTICS_WINDOW_HOURS', 168))
+    ANALYTICS_INTERVAL = int(os.environ.get('ANALYTICS_INTERVAL', 900))
+    ANALYTICS_MIN_HOURS = int(os.environ.get('ANALYTICS_MIN_HOURS', 6))
+    ANALYTICS_TOP_K = int(os.environ.get('ANALYTICS_TOP_K', 3))
+
+    # Admin dashboard snapshot: how often the job checks for changed data,
+    # and the age at which it is rebuilt even if nothing was flagged
+    DASHBOARD_SNAPSHOT_POLL = int(os.environ.get('DASHBOARD_SNAPSHOT_POLL', 5))
+    DASHBOARD_SNAPSHOT_MAX_AGE = int(os.environ.get('DASHBOARD_SNAPSHOT_MAX_AGE', 60))
@@ -1,27 +1,60 @@
 # tests/conftest.py
-import os
+import sqlite3
+
 import pytest
+from sqlalchemy.pool import StaticPool
 
 import config
 # force in-memory database for tests before create_app reads it
 config.Config.SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+# background jobs are driven explicitly by tests
+config.Config.SCHEDULER_ENABLED = False
+# score the comfort model inline rather than in worker processes
+config.Config.INFERENCE_WORKERS = 0
 
 from app import create_app, db
 from app.debug_utils import reset_db
+from app.observer import clear_dashboard_notifications
 
-@pytest.fixture
-def app():
-    # create the Flask app with testing config
-    app = create_app()
-    app.config.update({
-        'TESTING': True,
-        'WTF_CSRF_ENABLED': False,       # disable CSRF for form posts in tests
-    })
+TEST_CONFIG = {
+    'TESTING': True,
+    'WTF_CSRF_ENABLED': False,       # disable CSRF for form posts in tests
+}
 
+
+@pytest.fixture(scope='session')
+def seed_template():
+    """
+    Seed one in-memory database per session (per worker under pytest-xdist).
+    reset_db hashes every seed user's password, so it runs once, not per test.
+    """
+    template = sqlite3.connect(':memory:', check_same_thread=False)
+    app = create_app(TEST_CONFIG)
     with app.app_context():
-        # reset_db drops/creates tables and seeds sample data
         reset_db()
-    return app
+        db.engine.raw_connection().driver_connection.backup(template)
+        db.engine.dispose()
+    yield template
+    template.close()
+
+
+@pytest.fixture
+def app(seed_template, tmp_path):
+    # Each test gets a private copy of the seeded template, cloned page by
+    # page with SQLite's backup API; nothing is shared between tests
+    conn = sqlite3.connect(':memory:', check_same_thread=False)
+    seed_template.backup(conn)
+    app = create_app(dict(TEST_CONFIG, SQLALCHEMY_ENGINE_OPTIONS={
+        'creator': lambda: conn,
+        'poolclass': StaticPool,
+    }, ARCHIVE_DIR=str(tmp_path / 'archive'), LIVE_TABLE_PATH=str(tmp_path / 'live.tbl')))
+    clear_dashboard_notifications()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+    if app.extensions.get('live_table') is not None:
+        app.extensions['live_table'].close()
+    conn.close()
 
 @pytest.fixture
 def client(app):
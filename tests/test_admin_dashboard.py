@@ -18,3 +18,10 @@ def test_admin_dashboard_forbidden(client):
     login_as('student1', client)
     rv = client.get('/admin')
     assert rv.status_code == 403
+
+def test_admin_dashboard_heating_zones(client):
+    """Positive: dashboard lists a suggestion per heating zone."""
+    login_as('admin1', client)
+    rv = client.get('/admin')
+    assert b'Heating Zones' in rv.data
+    assert b'Building 1 / Floor 1' in rv.data
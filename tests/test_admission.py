@@ -0,0 +1,116 @@
+# tests/test_admission.py
+from app import db
+from app.admission import ACCEPT, MERGE, FeedbackAdmission, TokenBucketLimiter
+from app.models import Feedback, Sensor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def login_as(username, client):
+    client.post(
+        '/login',
+        data={'username': username, 'password': 'password123'},
+        follow_redirects=True
+    )
+
+
+def test_token_bucket_bursts_refills_and_evicts():
+    """Positive: a bucket allows its burst, refills at its rate and is dropped when idle."""
+    limiter = TokenBucketLimiter(rate=1.0, burst=2)
+    assert [limiter.allow('a', 0.0) for _ in range(3)] == [True, True, False]
+    assert limiter.allow('a', 1.0) is True
+    assert limiter.allow('a', 1.5) is False
+    limiter.allow('b', 10.0)                 # 'a' has been idle long enough to be full
+    assert len(limiter) == 1
+
+
+def test_admission_merges_repeats_and_limits_sensors():
+    """Positive: repeats merge without a sensor token; negative: floods are rejected."""
+    clock = FakeClock()
+    admission = FeedbackAdmission(user_rate=1 / 60, user_burst=2, sensor_rate=0.0,
+                                  sensor_burst=2, dedup_seconds=600, clock=clock)
+    assert admission.admit(1, 7).action == ACCEPT
+    admission.remember(1, 7, feedback_id=99, rating='cold', submitted_at=None)
+
+    repeat = admission.admit(1, 7)
+    assert (repeat.action, repeat.feedback_id, repeat.previous_rating) == (MERGE, 99, 'cold')
+    assert admission.admit(2, 7).action == ACCEPT
+    assert admission.admit(3, 7).reason == 'sensor'           # sensor burst of 2 spent
+    assert admission.admit(1, 8).reason == 'user'             # user burst of 2 spent
+
+    clock.now += 601                                          # dedup window over
+    assert admission.admit(1, 7).reason == 'sensor'
+    assert admission.stats()['dedup_entries'] == 0
+    assert admission.counters == {'accepted': 2, 'merged': 1, 'rejected_user': 1, 'rejected_sensor': 2}
+
+
+def test_dedup_window_expires_after_out_of_order_remembers():
+    """Negative: re-remembering an older key does not keep it past the dedup window."""
+    clock = FakeClock()
+    admission = FeedbackAdmission(user_rate=10, user_burst=100, sensor_rate=10,
+                                  sensor_burst=100, dedup_seconds=600, clock=clock)
+    admission.remember(1, 7, feedback_id=1, rating='cold', submitted_at=None)
+    clock.now += 100
+    admission.remember(2, 7, feedback_id=2, rating='hot', submitted_at=None)
+    clock.now += 100
+    admission.remember(1, 7, feedback_id=1, rating='ok', submitted_at=None)   # merged repeat
+
+    clock.now += 450                     # 650 s after user 1's first rating, 550 after user 2's
+    assert admission.admit(1, 7).action == ACCEPT
+    assert admission.admit(2, 7).action == MERGE
+    assert admission.stats()['dedup_entries'] == 1
+
+
+def test_repeat_submission_updates_row_and_scores(app, client):
+    """Positive: a second rating in the window replaces the first everywhere."""
+    login_as('student1', client)
+    with app.app_context():
+        before = db.session.scalar(db.select(db.func.count(Feedback.id)))
+        scores_before = db.session.get(Sensor, 2).feedback_scores()
+
+    client.post('/feedback', data={'sensor_id': '2', 'rating': 'hot', 'comment': 'Stuffy'})
+    rv = client.post('/feedback', data={'sensor_id': '2', 'rating': 'cold', 'comment': ''},
+                     follow_redirects=True)
+    assert b'Your earlier feedback for this room has been updated.' in rv.data
+
+    with app.app_context():
+        assert db.session.scalar(db.select(db.func.count(Feedback.id))) == before + 1
+        fb = db.session.scalars(db.select(Feedback).order_by(Feedback.id.desc())).first()
+        assert (fb.rating, fb.comment) == ('cold', 'Stuffy')
+        scores = db.session.get(Sensor, 2).feedback_scores()
+        assert abs(scores['cold'] - scores_before['cold'] - 1.0) < 1e-3
+        assert abs(scores['hot'] - scores_before['hot']) < 1e-3
+
+
+def test_flood_is_rejected_before_writing(app, client):
+    """Negative: beyond the user's burst, submissions get 429 and no row."""
+    app.config['FEEDBACK_USER_BURST'] = 2
+    login_as('student1', client)
+    for sensor_id in ('1', '2'):
+        assert client.post('/feedback', data={'sensor_id': sensor_id, 'rating': 'ok'}).status_code == 302
+    with app.app_context():
+        count = db.session.scalar(db.select(db.func.count(Feedback.id)))
+
+    rv = client.post('/feedback', data={'sensor_id': '3', 'rating': 'ok'})
+    assert rv.status_code == 429
+    with app.app_context():
+        assert db.session.scalar(db.select(db.func.count(Feedback.id))) == count
+
+    client.get('/logout')
+    login_as('admin1', client)
+    stats = client.get('/admin/feedback_admission.json').get_json()
+    assert (stats['accepted'], stats['rejected_user']) == (2, 1)
+
+
+def test_unknown_sensor_is_a_form_error(client):
+    """Negative: a sensor id that does not exist is refused without loading all sensors first."""
+    login_as('student1', client)
+    rv = client.post('/feedback', data={'sensor_id': '9999', 'rating': 'ok'})
+    assert rv.status_code == 200
+    assert b'Not a valid choice' in rv.data
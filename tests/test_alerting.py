@@ -0,0 +1,93 @@
+# tests/test_alerting.py
+from app import db
+from app.alerting import AlertSuppressor, get_alert_suppressor
+from app.event_bus import OutboxTransport, register_outbox_events
+from app.models import Sensor
+from app.observer import SensorStatusSubject
+from app.observers import SuppressedAlerts, flush_status_alerts
+
+
+def login_as(username, client):
+    client.post(
+        '/login',
+        data={'username': username, 'password': 'password123'},
+        follow_redirects=True
+    )
+
+
+def test_short_blips_are_dropped_and_settled_changes_delivered():
+    """Positive: a change is delivered once it has lasted the dwell time; a reverted one never is."""
+    alerts = AlertSuppressor(min_dwell=60, flap_window=600, flap_threshold=4)
+    alerts.observe([(1, 'online', 'offline'), (2, 'online', 'offline')], now=0)
+    alerts.observe([(1, 'offline', 'online')], now=10)
+
+    assert alerts.flush(now=30).changes == []           # still dwelling
+    digest = alerts.flush(now=70)
+    assert digest.changes == [(2, 'online', 'offline')]
+    assert alerts.counters['suppressed'] == 1           # sensor 1 ended where it started
+    assert alerts.flush(now=500).changes == []
+
+
+def test_flapping_sensor_is_reported_once_and_held():
+    """Negative: rapid changes raise one flap notice and no per-change alerts."""
+    alerts = AlertSuppressor(min_dwell=60, flap_window=600, flap_threshold=4)
+    status = 'online'
+    for t in range(6):
+        new = 'offline' if status == 'online' else 'online'
+        alerts.observe([(5, status, new)], now=t * 30)
+        status = new
+    alerts.observe([(5, 'online', 'offline')], now=180)
+
+    digest = alerts.flush(now=300)
+    assert digest.flapping == [5] and digest.changes == []
+    assert alerts.flush(now=700).changes == []          # not quiet for a whole window yet
+    digest = alerts.flush(now=780)
+    assert digest.changes == [(5, 'online', 'offline')] and digest.flapping == []
+    assert alerts.stats()['flapping'] == 0
+
+
+def test_settled_changes_go_out_as_one_digest(app, client, capsys):
+    """Positive: status changes reach the notifiers as one grouped alert after the dwell."""
+    app.config['ALERT_MIN_DWELL_SECONDS'] = 0
+    login_as('admin1', client)
+    with app.app_context():
+        online = db.session.scalars(db.select(Sensor.id).where(Sensor.status == 'online')).all()
+    for sensor_id in online:
+        client.post('/sensors/toggle_status', data={'record_id': sensor_id})
+    capsys.readouterr()
+
+    with app.app_context():
+        digest = flush_status_alerts()
+        assert get_alert_suppressor().stats()['delivered'] == len(online)
+    out = capsys.readouterr().out
+    assert [c[2] for c in digest.changes] == ['offline'] * len(online)
+    assert out.count('ALERT:') == 1
+    assert f"ALERT: {len(online)} sensors are now offline" in out
+
+
+def test_suppression_sees_every_worker_once_under_outbox(app):
+    """Positive: changes published by different workers reach one suppressor, each exactly once."""
+    register_outbox_events()
+    with app.app_context():
+        workers = []
+        for name in ('a', 'b'):
+            subject = SensorStatusSubject(OutboxTransport(worker_id=name))
+            subject.attach(SuppressedAlerts())
+            workers.append(subject)
+        for worker in workers:
+            worker.transport.poll(worker)
+            worker.transport.poll_shared(worker)
+
+        status = 'online'
+        for t in range(4):
+            new = 'offline' if status == 'online' else 'online'
+            workers[t % 2].notify(5, status, new)
+            db.session.commit()
+            status = new
+        for worker in workers:
+            worker.transport.poll(worker)
+            worker.transport.poll_shared(worker)
+
+        suppressor = get_alert_suppressor()
+        assert suppressor.counters['changes'] == 4
+        assert suppressor.flush().flapping == [5]
@@ -0,0 +1,134 @@
+# tests/test_archive.py
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app import db
+from app.archive import archive_readings, get_reading_archive
+from app.history import load_historical_temps
+from app.models import Calibration, TemperatureReading
+
+
+def login_as(username, client):
+    client.post(
+        '/login',
+        data={'username': username, 'password': 'password123'},
+        follow_redirects=True
+    )
+
+
+def add_readings(sensor_id, start, count, step=timedelta(hours=6)):
+    db.session.add_all([
+        TemperatureReading(sensor_id=sensor_id, timestamp=start + i * step,
+                           temperature=20.0 + i * 0.125, raw_temperature=20.0 + i * 0.125)
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def test_archive_moves_old_readings_to_monthly_columns(app):
+    """Positive: readings before the cutoff leave the table for per-month files."""
+    with app.app_context():
+        add_readings(1, datetime(2024, 1, 25, 0, 0, 0, 250000), 40)   # 25 Jan .. 4 Feb
+        cutoff = datetime(2024, 2, 2)
+        live_before = db.session.scalar(db.select(db.func.count(TemperatureReading.id)))
+
+        moved = archive_readings(cutoff)
+
+        assert moved == 32
+        remaining = db.session.scalar(db.select(db.func.count(TemperatureReading.id)))
+        assert remaining == live_before - moved
+        assert db.session.scalar(db.select(db.func.min(TemperatureReading.timestamp))
+                                   .where(TemperatureReading.sensor_id == 1)) >= cutoff
+
+        archive = get_reading_archive()
+        assert archive.archived_before == cutoff
+        assert archive.months(1) == [datetime(2024, 1, 1), datetime(2024, 2, 1)]
+        ts, temp, raw = archive.open_month(1, datetime(2024, 1, 1))
+        assert isinstance(ts, np.memmap)
+        assert ts.dtype == np.uint32 and temp.dtype == np.float32
+        assert np.all(np.diff(ts) > 0)
+        assert os.path.getsize(os.path.join(archive.root, '1', '2024-01', 'ts.npy')) < 256
+
+
+def test_history_merges_archive_and_live_table(app):
+    """Positive: queries spanning the cutoff return one ordered series."""
+    with app.app_context():
+        start = datetime(2024, 1, 25, 0, 0, 0, 250000)
+        add_readings(1, start, 40)
+        expected = load_historical_temps(start, datetime(2024, 3, 1), sensor_ids=[1])[1]
+
+        archive_readings(datetime(2024, 2, 2))
+        merged = load_historical_temps(start, datetime(2024, 3, 1), sensor_ids=[1])[1]
+
+        assert [ts for ts, _ in merged] == [ts for ts, _ in expected]
+        assert np.allclose([t for _, t in merged], [t for _, t in expected])
+        # A window inside the archive reads only that slice
+        window = load_historical_temps(datetime(2024, 1, 30), datetime(2024, 1, 31), sensor_ids=[1])[1]
+        assert [ts.day for ts, _ in window] == [30] * 4
+
+
+def test_archived_readings_are_recalibrated(app):
+    """Positive: a calibration recorded later still corrects archived raw values."""
+    with app.app_context():
+        add_readings(1, datetime(2024, 1, 10), 4)
+        archive_readings(datetime(2024, 2, 1))
+        db.session.add(Calibration(sensor_id=1, offset=1.0, gain=1.0, effective_from=datetime(2024, 1, 1)))
+        db.session.commit()
+
+        temps = [t for _, t in load_historical_temps(datetime(2024, 1, 1), sensor_ids=[1])[1]][:4]
+        assert temps == [21.0, 21.125, 21.25, 21.375]
+
+
+def test_rearchiving_same_rows_is_idempotent(app):
+    """Negative: archiving readings that are already archived does not duplicate them."""
+    with app.app_context():
+        add_readings(1, datetime(2024, 1, 10), 4)
+        archive_readings(datetime(2024, 2, 1))
+        add_readings(1, datetime(2024, 1, 10), 4)      # e.g. an interrupted run left rows behind
+        archive_readings(datetime(2024, 2, 1))
+
+        ts, _, _ = get_reading_archive().open_month(1, datetime(2024, 1, 1))
+        assert len(ts) == 4
+
+
+def test_interrupted_writes_leave_history_readable(app):
+    """Negative: leftover work directories are skipped, and a month left aside is still read."""
+    with app.app_context():
+        add_readings(1, datetime(2024, 1, 10), 4)
+        archive_readings(datetime(2024, 2, 1))
+        archive = get_reading_archive()
+        sensor_dir = os.path.join(archive.root, '1')
+        os.makedirs(os.path.join(sensor_dir, '.2024-02.tmp'))             # run killed mid-write
+        os.makedirs(os.path.join(sensor_dir, '2024-03.tmp'))              # left by an older version
+        os.replace(os.path.join(sensor_dir, '2024-01'), os.path.join(sensor_dir, '.2024-01.old'))
+
+        assert archive.months(1) == [datetime(2024, 1, 1)]
+        assert len(load_historical_temps(datetime(2024, 1, 1), datetime(2024, 2, 1), sensor_ids=[1])[1]) == 4
+
+        # The next write of that month puts it back in place
+        add_readings(1, datetime(2024, 1, 20), 1)
+        archive_readings(datetime(2024, 2, 1))
+        assert sorted(os.listdir(sensor_dir)) == ['.2024-02.tmp', '2024-01', '2024-03.tmp']
+        assert len(archive.open_month(1, datetime(2024, 1, 1))[0]) == 5
+
+
+def test_archive_command_and_history_endpoint(app, client, runner):
+    """Positive: the CLI archives by age and the admin endpoint serves the merged history."""
+    with app.app_context():
+        add_readings(1, datetime.utcnow() - timedelta(days=60), 4)
+    result = runner.invoke(args=['archive-readings', '--older-than-days', '30'])
+    assert 'Archived' in result.output
+
+    login_as('admin1', client)
+    since = (datetime.utcnow() - timedelta(days=61)).isoformat()
+    rv = client.get(f'/sensors/1/history.json?since={since}')
+    assert rv.status_code == 200
+    readings = rv.get_json()['readings']
+    assert [r['temperature'] for r in readings[:4]] == [20.0, 20.125, 20.25, 20.375]
+
+    assert client.get('/sensors/1/history.json?since=yesterday').status_code == 400
+    client.get('/logout')
+    login_as('student1', client)
+    assert client.get('/sensors/1/history.json').status_code == 403
@@ -0,0 +1,76 @@
+# tests/test_bulk_load.py
+import json
+from datetime import datetime
+
+from app import db
+from app.heartbeat import sweep_stale_sensors
+from app.models import Sensor, TemperatureReading
+
+
+def count_readings(app, sensor_id):
+    with app.app_context():
+        return db.session.scalar(
+            db.select(db.func.count()).select_from(TemperatureReading)
+              .where(TemperatureReading.sensor_id == sensor_id)
+        )
+
+
+def test_load_csv_maps_names_and_rejects_bad_rows(app, runner, tmp_path):
+    """Positive: valid rows are inserted by sensor name or id; invalid ones are counted."""
+    path = tmp_path / 'readings.csv'
+    path.write_text(
+        'sensor,sensor_id,timestamp,temperature\n'
+        'Sensor A1,,2020-01-01T00:00:00,20.5\n'
+        'Sensor A1,,2020-01-01T00:10:00,20.7\n'
+        ',3,2020-01-01T00:00:00Z,19.0\n'
+        'Nope,,2020-01-01T00:00:00,19.0\n'
+        'Sensor A1,,not-a-date,19.0\n'
+        'Sensor A1,,2020-01-01T00:20:00,500\n'
+    )
+    before = count_readings(app, 1)
+    result = runner.invoke(args=['load-readings', str(path), '--chunk-size', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'Loaded 3 of 6 rows (3 rejected)' in result.output
+    assert count_readings(app, 1) == before + 2
+    with app.app_context():
+        indexes = db.session.execute(db.text(
+            "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='temperature_readings'"
+        )).scalars().all()
+        assert 'ix_temperature_readings_sensor_ts' in indexes
+
+
+def test_load_ndjson_ambiguous_name(app, runner, tmp_path):
+    """Negative: a name shared by two sensors is rejected rather than guessed."""
+    with app.app_context():
+        db.session.add(Sensor(name='Sensor A1', location='Elsewhere', status='online'))
+        db.session.commit()
+    path = tmp_path / 'readings.ndjson'
+    path.write_text('\n'.join(json.dumps(r) for r in [
+        {'sensor': 'Sensor A1', 'timestamp': '2020-01-01T00:00:00', 'temperature': 20},
+        {'sensor': 'Sensor B2', 'timestamp': '2020-01-01T00:00:00', 'temperature': 20},
+    ]))
+    result = runner.invoke(args=['load-readings', str(path)])
+    assert 'Loaded 1 of 2 rows (1 rejected)' in result.output
+
+
+def test_backfill_does_not_advance_heartbeats(app, runner, tmp_path):
+    """Negative: old readings leave last_seen alone, so the sweep does not take sensors offline."""
+    now = datetime.utcnow().replace(microsecond=0)
+    with app.app_context():
+        sensor = Sensor(name='Backfilled', location='Building 8 - Room 101', status='online')
+        db.session.add(sensor)
+        db.session.commit()
+        sensor_id = sensor.id
+    path = tmp_path / 'readings.csv'
+    path.write_text(
+        'sensor,sensor_id,timestamp,temperature\n'
+        f',{sensor_id},2020-01-01T00:00:00,20.5\n'
+        f',3,{now.isoformat()},19.0\n'
+    )
+    result = runner.invoke(args=['load-readings', str(path)])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert db.session.get(Sensor, sensor_id).last_seen is None
+        assert db.session.get(Sensor, 3).last_seen == now
+        sweep_stale_sensors()
+        assert db.session.get(Sensor, sensor_id).status == 'online'
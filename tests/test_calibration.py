@@ -0,0 +1,115 @@
+# tests/test_calibration.py
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app import db
+from app.calibration import get_calibration_cache
+from app.history import load_historical_temps
+from app.ingest import ingest_readings
+from app.models import Calibration, TemperatureReading
+
+
+def login_as(username, client):
+    client.post(
+        '/login',
+        data={'username': username, 'password': 'password123'},
+        follow_redirects=True
+    )
+
+
+def test_correct_applies_coefficients_by_effective_time(app):
+    """Positive: each reading uses the calibration in force at its timestamp."""
+    with app.app_context():
+        base = datetime(2024, 1, 1)
+        db.session.add_all([
+            Calibration(sensor_id=1, offset=1.0, gain=1.0, effective_from=base),
+            Calibration(sensor_id=1, offset=0.0, gain=2.0, effective_from=base + timedelta(hours=1)),
+            Calibration(sensor_id=2, notes='notes only'),
+        ])
+        db.session.commit()
+        t0 = base.timestamp()
+        corrected = get_calibration_cache().correct(
+            [1, 1, 1, 2, 3], [t0 - 60, t0 + 60, t0 + 3600, t0, t0], [20.0, 20.0, 10.0, 20.0, 20.0])
+        assert corrected.tolist() == [20.0, 21.0, 20.0, 20.0, 20.0]
+
+
+def test_cache_serves_batches_without_queries(app):
+    """Positive: once loaded, corrections need no further queries."""
+    with app.app_context():
+        cache = get_calibration_cache()
+        cache.correct([1, 2, 3], [0, 0, 0], [20.0, 20.0, 20.0])
+        statements = []
+        from sqlalchemy import event
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            cache.correct(np.repeat([1, 2, 3], 1000), np.zeros(3000), np.full(3000, 20.0))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        assert statements == []
+
+
+def test_invalidation_from_another_thread_does_not_break_corrections(app):
+    """Negative: entries dropped by another thread mid-batch do not raise KeyError."""
+    with app.app_context():
+        db.session.add(Calibration(sensor_id=1, offset=1.0, gain=1.0, effective_from=datetime(2020, 1, 1)))
+        db.session.commit()
+        cache = get_calibration_cache()
+        done = threading.Event()
+
+        def invalidate():
+            while not done.is_set():
+                cache.invalidate()
+
+        thread = threading.Thread(target=invalidate)
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        thread.start()
+        try:
+            ids = np.arange(1, 501)
+            for _ in range(50):
+                corrected = cache.correct(ids, np.full(500, datetime(2021, 1, 1).timestamp()), np.full(500, 20.0))
+                assert corrected[0] == 21.0 and (corrected[1:] == 20.0).all()
+        finally:
+            done.set()
+            thread.join()
+            sys.setswitchinterval(interval)
+
+
+def test_ingestion_stores_calibrated_and_raw(app):
+    """Positive: ingested readings are corrected and keep their raw value."""
+    with app.app_context():
+        db.session.add(Calibration(sensor_id=1, offset=-0.5, gain=1.0,
+                                   effective_from=datetime(2020, 1, 1)))
+        db.session.commit()
+        ts = datetime(2020, 6, 1, 12)
+        ingest_readings([(1, ts, 22.0)])
+        reading = db.session.scalars(
+            db.select(TemperatureReading).where(TemperatureReading.timestamp == ts)).one()
+        assert (reading.temperature, reading.raw_temperature) == (21.5, 22.0)
+
+
+def test_calibrate_view_invalidates_cache_and_recorrects_history(app, client):
+    """Positive: a backdated calibration corrects history once calibrate_sensor commits."""
+    login_as('admin1', client)
+    with app.app_context():
+        since = datetime.utcnow() - timedelta(hours=2)
+        before = dict(load_historical_temps(since)[1])
+    rv = client.post('/sensors/calibrate', data={
+        'sensor_id': '1', 'notes': 'Offset check', 'offset': '1.5',
+        'effective_from': (datetime.utcnow() - timedelta(hours=3)).strftime('%Y-%m-%dT%H:%M'),
+    }, follow_redirects=True)
+    assert b'offset +1.5' in rv.data
+    with app.app_context():
+        after = dict(load_historical_temps(since)[1])
+        assert all(abs(after[ts] - (temp + 1.5)) < 1e-9 for ts, temp in before.items())
+
+
+def test_calibrate_rejects_out_of_range_gain(client):
+    """Negative: an implausible gain is refused."""
+    login_as('admin1', client)
+    rv = client.post('/sensors/calibrate', data={'sensor_id': '1', 'gain': '5'}, follow_redirects=True)
+    assert b'Calibration recorded.' not in rv.data
@@ -0,0 +1,129 @@
+# tests/test_comfort_analytics.py
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app import db
+from app.comfort_analytics import (complaint_bands, compute_comfort_analytics, correlate_sensors,
+                                   forward_fill, load_hourly_matrix, zone_feedback_correlation)
+from app.models import Feedback, TemperatureReading
+from app.sensor_registry import get_sensor_registry
+
+
+def login_as(username, client):
+    client.post(
+        '/login',
+        data={'username': username, 'password': 'password123'},
+        follow_redirects=True
+    )
+
+
+def test_correlate_sensors_finds_neighbours_and_zone_coherence():
+    """Positive: blockwise correlations match the obvious structure of the data."""
+    hours = np.arange(24)
+    wave = np.sin(hours / 24 * 2 * np.pi)
+    temps = np.vstack([
+        20 + wave,                                  # 0, zone 0
+        21 + 2 * wave,                              # 1, zone 0: same shape
+        20 - wave,                                  # 2, zone 0: opposite
+        np.where(hours % 2, 22.0, 21.0),            # 3, zone 1
+        np.full(24, np.nan),                        # 4: never reported
+    ])
+    temps[1, 5] = np.nan                            # a missing hour is tolerated
+    rows, neighbours, r, coherence = correlate_sensors(
+        temps, np.array([0, 0, 0, 1, 1]), min_hours=6, top_k=2, block=2)
+
+    assert rows.tolist() == [0, 1, 2, 3]
+    assert neighbours[0, 0] == 1 and r[0, 0] > 0.99
+    assert r[2, 0] < 0.2                            # sensor 2 has no positive partner
+    assert abs(coherence[0]) < 0.05                 # mean of ~+1 and -1
+    assert np.isnan(coherence[3])                   # alone in its zone
+
+
+def test_feedback_correlation_and_bands():
+    """Positive: per-zone r and band rates come from vectorised sums."""
+    zones = np.array([0, 0, 0, 1, 1])
+    temps = np.array([18.5, 21.0, 25.2, 22.0, 22.0])
+    ratings = np.array(['cold', 'ok', 'hot', 'hot', 'cold'])
+    scores = np.array([-1.0, 0.0, 1.0, 1.0, -1.0])
+
+    counts, r = zone_feedback_correlation(zones, temps, scores, 2)
+    assert counts.tolist() == [3, 2]
+    assert r[0] > 0.95 and np.isnan(r[1])           # zone 1: temperature never varies
+
+    bands = complaint_bands(temps, ratings)
+    assert [b[:2] for b in bands] == [(18, 1), (21, 1), (22, 2), (25, 1)]
+    assert bands[2][2:] == (0.5, 0.5)
+
+
+def test_forward_fill_carries_last_value():
+    """Positive: gaps take the previous hour's value; leading gaps stay empty."""
+    filled = forward_fill(np.array([[np.nan, 1.0, np.nan, 3.0, np.nan]]))
+    assert np.isnan(filled[0, 0])
+    assert filled[0, 1:].tolist() == [1.0, 1.0, 3.0, 3.0]
+
+
+def test_correlation_scales_to_thousands_of_sensors():
+    """Positive: 3000 sensors x a week of hours runs blockwise without an S x S matrix."""
+    rng = np.random.default_rng(0)
+    temps = 21 + rng.normal(size=(3000, 168))
+    temps[rng.random(temps.shape) < 0.1] = np.nan
+    rows, neighbours, r, coherence = correlate_sensors(temps, rng.integers(0, 50, 3000), block=256)
+    assert neighbours.shape == (3000, 3)
+    assert np.all(r[:, 0] >= r[:, 1])
+    assert np.all(np.abs(coherence) < 0.2)
+
+
+def test_report_from_database_and_dashboard(app, client):
+    """Positive: rollups, feedback pairing and the dashboard card work end to end."""
+    now = datetime(2024, 5, 1, 12)
+    with app.app_context():
+        db.session.add_all([
+            TemperatureReading(sensor_id=sid, timestamp=now - timedelta(hours=h, minutes=m),
+                               temperature=base + (h % 6) * step, raw_temperature=base + (h % 6) * step)
+            for sid, base, step in ((1, 19.0, 1.0), (2, 20.0, 1.0), (3, 22.0, -0.5))
+            for h in range(1, 13) for m in (10, 40)
+        ])
+        db.session.add_all([
+            Feedback(user_id=3, sensor_id=1, rating='cold', submitted_at=now - timedelta(hours=6, minutes=5)),
+            Feedback(user_id=3, sensor_id=1, rating='hot', submitted_at=now - timedelta(hours=5, minutes=5)),
+        ])
+        db.session.commit()
+
+        matrix = load_hourly_matrix(now - timedelta(hours=12), now)
+        assert matrix.temps.shape == (3, 13)
+        report = compute_comfort_analytics(now)
+
+    assert report.sensors_analysed == 3
+    by_id = {row['sensor_id']: row for row in report.sensors}
+    assert by_id[1]['neighbours'][0] == {'sensor_id': 2, 'r': 1.0}
+    assert [b['band'] for b in report.bands] == [19, 24]
+    assert report.bands[0]['cold_rate'] == 1.0
+
+    login_as('admin1', client)
+    rv = client.get('/admin')
+    assert b'Complaints by Temperature' in rv.data
+
+
+def test_unknown_sensors_are_left_out(app):
+    """Negative: readings and feedback of a sensor missing from the registry join no zone."""
+    now = datetime(2024, 5, 1, 12)
+    with app.app_context():
+        db.session.add_all([
+            TemperatureReading(sensor_id=sid, timestamp=now - timedelta(hours=h, minutes=m),
+                               temperature=20.0 + (h % 4) + m / 60, raw_temperature=20.0)
+            for sid in (1, 2, 3) for h in range(1, 9) for m in (10, 40)
+        ])
+        db.session.add_all([
+            Feedback(user_id=3, sensor_id=sid, rating='hot', submitted_at=now - timedelta(hours=2))
+            for sid in (1, 3)
+        ])
+        db.session.commit()
+        get_sensor_registry().apply({3: None})          # removed since the registry loaded
+
+        matrix = load_hourly_matrix(now - timedelta(hours=8), now)
+        assert abs(matrix.temps[0, 4] - (20.0 + 3 + 25 / 60)) < 1e-9   # mean of :10 and :40
+        report = compute_comfort_analytics(now)
+
+    assert [row['sensor_id'] for row in report.sensors] == [1, 2]
+    assert sum(zone['feedback'] for zone in report.zones) == 1
@@ -0,0 +1,141 @@
+# tests/test_event_bus.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import EventCursor, Sensor
+from app.event_bus import OutboxTransport, SHARED_CURSOR, register_outbox_events
+from app.observer import SensorStatusObserver, SensorStatusSubject
+
+
+class Recorder(SensorStatusObserver):
+    def __init__(self, fail_on=None, deployment_wide=False):
+        self.events = []
+        self.fail_on = fail_on
+        self.deployment_wide = deployment_wide
+
+    def update(self, sensor_id, old_status, new_status):
+        if sensor_id == self.fail_on:
+            self.fail_on = None
+            raise RuntimeError('observer failed')
+        self.events.append((sensor_id, old_status, new_status))
+
+
+def make_worker(name, *observers):
+    register_outbox_events()
+    subject = SensorStatusSubject(OutboxTransport(worker_id=name, batch_size=2))
+    for observer in observers:
+        subject.attach(observer)
+    return subject
+
+
+def test_outbox_fans_out_to_other_workers(app):
+    """Positive: events published by one worker reach the others, not itself twice."""
+    with app.app_context():
+        a_seen, b_seen = Recorder(), Recorder()
+        worker_a, worker_b = make_worker('a', a_seen), make_worker('b', b_seen)
+        worker_b.transport.poll(worker_b)       # b starts at the current head
+
+        for sensor_id in (1, 2, 3):
+            worker_a.notify(sensor_id, 'online', 'offline')
+        db.session.commit()
+
+        assert worker_b.transport.poll(worker_b) == 3
+        assert b_seen.events == [(1, 'online', 'offline'), (2, 'online', 'offline'), (3, 'online', 'offline')]
+        assert worker_a.transport.poll(worker_a) == 0
+        assert len(a_seen.events) == 3          # delivered locally at publish time
+
+
+def test_outbox_redelivers_after_observer_failure(app):
+    """Negative: a failing observer does not lose the event; it is retried next poll."""
+    with app.app_context():
+        worker_a = make_worker('a', Recorder())
+        flaky = Recorder(fail_on=2)
+        worker_b = make_worker('b', flaky)
+        worker_b.transport.poll(worker_b)
+
+        worker_a.notify(1, 'online', 'offline')
+        worker_a.notify(2, 'online', 'offline')
+        db.session.commit()
+
+        with pytest.raises(RuntimeError):
+            worker_b.transport.poll(worker_b)
+        assert worker_b.transport.poll(worker_b) == 1
+        assert [e[0] for e in flaky.events] == [1, 2]
+
+
+def test_status_change_commits_outbox_row(app):
+    """Positive: Sensor.set_status writes the outbox row in the same transaction."""
+    from app.observer import sensor_status_subject
+    from app.models import SensorStatusEvent
+    previous = sensor_status_subject.transport
+    sensor_status_subject.set_transport(OutboxTransport(worker_id='web-1'))
+    try:
+        with app.app_context():
+            db.session.get(Sensor, 1).set_status('offline')
+            db.session.rollback()
+            assert db.session.scalar(db.select(db.func.count()).select_from(SensorStatusEvent)) == 0
+            db.session.get(Sensor, 1).set_status('offline')
+            db.session.commit()
+            event = db.session.scalars(db.select(SensorStatusEvent)).one()
+            assert (event.sensor_id, event.new_status, event.origin) == (1, 'offline', 'web-1')
+    finally:
+        sensor_status_subject.set_transport(previous)
+
+
+def test_outbox_batch_is_dispatched_once_locally(app):
+    """Positive: a batch is one local notification and one outbox row per change."""
+    with app.app_context():
+        a_seen, b_seen = Recorder(), Recorder()
+        worker_a, worker_b = make_worker('a', a_seen), make_worker('b', b_seen)
+        worker_b.transport.poll(worker_b)
+
+        worker_a.notify_batch([(1, 'online', 'offline'), (2, 'online', 'offline')])
+        db.session.commit()
+
+        assert a_seen.events == [(1, 'online', 'offline'), (2, 'online', 'offline')]
+        assert worker_b.transport.poll(worker_b) == 2
+        assert b_seen.events == a_seen.events
+
+
+def test_outbox_dispatches_locally_only_after_commit(app):
+    """Negative: a rolled-back change never reaches this worker's observers."""
+    with app.app_context():
+        seen = Recorder()
+        worker = make_worker('a', seen)
+        worker.notify(1, 'online', 'offline')
+        assert seen.events == []
+        db.session.rollback()
+        assert seen.events == []
+
+        worker.notify_batch([(2, 'online', 'offline')])
+        db.session.commit()
+        assert seen.events == [(2, 'online', 'offline')]
+
+
+def test_deployment_wide_observers_run_on_one_worker(app):
+    """Positive: alerting sees each event once, from whichever worker holds the shared cursor."""
+    with app.app_context():
+        a_alerts, b_alerts = Recorder(deployment_wide=True), Recorder(deployment_wide=True)
+        worker_a, worker_b = make_worker('a', a_alerts), make_worker('b', b_alerts)
+        assert worker_a.transport.poll_shared(worker_a) == 0    # a takes the cursor at the head
+
+        worker_a.notify(1, 'online', 'offline')
+        worker_b.notify(2, 'online', 'offline')
+        db.session.commit()
+        assert a_alerts.events == [] and b_alerts.events == []  # not dispatched at publish time
+
+        assert worker_b.transport.poll_shared(worker_b) == 0
+        assert worker_a.transport.poll_shared(worker_a) == 2
+        assert a_alerts.events == [(1, 'online', 'offline'), (2, 'online', 'offline')]
+
+        # a stops renewing; b takes over after the last event a delivered
+        worker_b.notify(3, 'online', 'offline')
+        db.session.commit()
+        db.session.execute(db.update(EventCursor).where(EventCursor.worker_id == SHARED_CURSOR)
+                             .values(updated_at=datetime.utcnow() - timedelta(minutes=5)))
+        db.session.commit()
+        assert worker_b.transport.poll_shared(worker_b) == 1
+        assert b_alerts.events == [(3, 'online', 'offline')]
+        assert worker_a.transport.poll_shared(worker_a) == 0
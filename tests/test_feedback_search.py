@@ -0,0 +1,113 @@
+# tests/test_feedback_search.py
+from datetime import datetime
+
+from app import db
+from app import feedback_search
+from app.feedback_search import fts_query, rebuild_feedback_index, search_feedback
+from app.models import Feedback
+
+
+def login_as(username, client):
+    client.post(
+        '/login',
+        data={'username': username, 'password': 'password123'},
+        follow_redirects=True
+    )
+
+
+def add_feedback(sensor_id, rating, comment, submitted_at=None):
+    fb = Feedback(user_id=3, sensor_id=sensor_id, rating=rating, comment=comment,
+                  submitted_at=submitted_at or datetime.utcnow())
+    db.session.add(fb)
+    db.session.commit()
+    return fb
+
+
+def test_index_follows_inserts_updates_and_deletes(app):
+    """Positive: the FTS triggers keep search results in step with the table."""
+    with app.app_context():
+        fb = add_feedback(1, 'cold', 'Radiator rattles all night')
+        assert [h.feedback.id for h in search_feedback('radiator').hits] == [fb.id]
+
+        fb.comment = 'Window draught by the desk'
+        db.session.commit()
+        assert search_feedback('radiator').total == 0
+        assert search_feedback('draughts').total == 1       # porter stemming
+
+        db.session.delete(fb)
+        db.session.commit()
+        assert search_feedback('draught').total == 0
+
+
+def test_search_ranks_and_filters(app):
+    """Positive: bm25 ranking, filters and snippets with highlighted terms."""
+    with app.app_context():
+        weak = add_feedback(1, 'hot', 'Stuffy in the afternoon but the heater seems fine',
+                            datetime(2024, 3, 1, 12))
+        strong = add_feedback(1, 'hot', 'Heater stuck on, heater too hot, turn the heater down',
+                              datetime(2024, 3, 2, 12))
+        other = add_feedback(2, 'cold', 'Heater broken', datetime(2024, 3, 3, 12))
+
+        page = search_feedback('heater', sensor_id=1)
+        assert [h.feedback.id for h in page.hits] == [strong.id, weak.id]
+        assert page.hits[0].rank < page.hits[1].rank
+        assert '<mark>heater</mark>' in str(page.hits[1].highlighted)
+
+        assert [h.feedback.id for h in search_feedback('heat*', rating='cold').hits] == [other.id]
+        assert [h.feedback.id for h in search_feedback('heater', since=datetime(2024, 3, 2),
+                                                       until=datetime(2024, 3, 3)).hits] == [strong.id]
+        # Filters alone list newest first
+        assert search_feedback(sensor_id=2, until=datetime(2024, 4, 1)).hits[0].feedback.id == other.id
+
+
+def test_search_falls_back_to_like_without_fts(app, monkeypatch):
+    """Negative: on a database without FTS5, keywords still match via LIKE, newest first."""
+    monkeypatch.setattr(feedback_search, 'has_fts_index', lambda: False)
+    with app.app_context():
+        old = add_feedback(1, 'hot', 'Heater stuck ON', datetime(2024, 3, 1, 12))
+        new = add_feedback(1, 'hot', 'the heaters hum; 100% annoying', datetime(2024, 3, 2, 12))
+        add_feedback(2, 'cold', 'Window draught', datetime(2024, 3, 3, 12))
+
+        page = search_feedback('HEATER', until=datetime(2024, 4, 1))
+        assert [h.feedback.id for h in page.hits] == [new.id, old.id]
+        assert page.hits[0].rank is None and page.hits[0].snippet is None
+        assert [h.feedback.id for h in search_feedback('heat* stuck').hits] == [old.id]
+        assert [h.feedback.id for h in search_feedback('100%').hits] == [new.id]
+        assert search_feedback('1_0%').total == 0        # LIKE wildcards are literal
+        assert rebuild_feedback_index() is False
+
+
+def test_search_paginates(app):
+    """Positive: results are split into pages with a total count."""
+    with app.app_context():
+        for i in range(7):
+            add_feedback(1, 'ok', f'Printer noise number {i}')
+        first = search_feedback('printer', per_page=3)
+        last = search_feedback('printer', per_page=3, page=3)
+        assert (first.total, first.pages, len(first.hits), first.has_next) == (7, 3, 3, True)
+        assert (len(last.hits), last.has_next, last.has_prev) == (1, False, True)
+
+
+def test_query_syntax_is_escaped(app):
+    """Negative: FTS operators in user input are matched literally, not parsed."""
+    assert fts_query('heater OR "cold') == '"heater" "OR" "cold"'
+    assert fts_query('rad* -') == '"rad"*'
+    with app.app_context():
+        add_feedback(1, 'cold', 'Cold radiator')
+        assert search_feedback('radiator NEAR(').total == 0
+        assert search_feedback('"radiator').total == 1
+
+
+def test_search_page_for_admins_only(app, client):
+    """Positive: admins get highlighted results; negative: students are refused."""
+    with app.app_context():
+        add_feedback(2, 'cold', 'Freezing <b>lab</b> bench')
+    login_as('admin1', client)
+    rv = client.get('/feedbacks/search?q=freezing&rating=cold&sensor_id=0')
+    assert rv.status_code == 200
+    assert b'1 result' in rv.data
+    assert b'<mark>Freezing</mark> &lt;b&gt;lab&lt;/b&gt; bench' in rv.data
+
+    client.get('/logout')
+    login_as('student1', client)
+    assert client.get('/feedbacks/search?q=freezing').status_code == 403
@@ -0,0 +1,110 @@
+# tests/test_forecast.py
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.forecast import SensorForecaster, get_forecaster
+from app.ingest import ingest_readings
+
+
+def test_batched_fit_recovers_trend_and_outdoor_term():
+    """Positive: every sensor's trend and outdoor sensitivity are recovered."""
+    rng = np.random.default_rng(1)
+    forecaster = SensorForecaster(half_life_minutes=10_000, horizon_minutes=60)
+    start = 1_700_000_000.0
+    sensors = np.arange(200)
+    slopes = rng.uniform(-1, 1, len(sensors))
+    for step in range(24):
+        t = start + step * 600
+        outdoor = 5.0 + 3 * np.sin(step / 4)
+        temps = 21.0 + slopes * (step / 6) + 0.2 * (outdoor - 10.0)
+        forecaster.observe(sensors, np.full(len(sensors), t), temps, np.full(len(sensors), outdoor))
+    last = start + 23 * 600
+    forecasts = forecaster.forecast(sensors.tolist(), now=last, outdoor_temp=10.0)
+    assert len(forecasts) == len(sensors)
+    for sid in (0, 57, 199):
+        expected = 21.0 + slopes[sid] * (23 / 6 + 1)
+        assert abs(forecasts[sid].temp - expected) < 0.05
+        assert abs(forecasts[sid].slope - slopes[sid]) < 0.02
+
+
+def test_incremental_updates_match_single_batch():
+    """Positive: out-of-order incremental batches give the same fit as one batch."""
+    times = 1_700_000_000.0 + np.arange(12) * 300.0
+    temps = 20.0 + 0.05 * np.arange(12) + np.sin(np.arange(12))
+    ids = [7] * 12
+    whole = SensorForecaster()
+    whole.observe(ids, times, temps)
+    parts = SensorForecaster()
+    order = [5, 6, 7, 8, 9, 10, 11, 0, 1, 2, 3, 4]
+    for chunk in (order[:4], order[4:7], order[7:]):
+        parts.observe([7] * len(chunk), times[chunk], temps[chunk])
+    now = times[-1] + 60
+    assert abs(whole.forecast([7], now)[7].temp - parts.forecast([7], now)[7].temp) < 1e-9
+
+
+def test_concurrent_observers_keep_every_reading():
+    """Negative: threads adding new sensors at once neither share slots nor lose readings."""
+    forecaster = SensorForecaster(half_life_minutes=10_000, capacity=1)
+    t = 1_700_000_000.0
+
+    def feed(offset):
+        for sid in range(offset, 2000, 4):
+            forecaster.observe([sid, sid], [t, t], [20.0, 20.0])
+
+    threads = [threading.Thread(target=feed, args=(offset,)) for offset in range(4)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert sorted(forecaster._slots.values()) == list(range(2000))
+    assert np.allclose(forecaster._gram[:2000, 0, 0], 2.0)
+
+
+def test_sensor_needs_minimum_readings():
+    """Negative: a sensor with too few readings is not forecast."""
+    forecaster = SensorForecaster(min_readings=3)
+    forecaster.observe([1, 1], [1000.0, 1300.0], [20.0, 21.0])
+    assert forecaster.forecast([1, 2], now=1300.0) == {}
+
+
+def test_silent_sensor_ages_out_and_is_reseeded():
+    """Negative: a sensor that stops reporting is not projected forward; fresh history refits it."""
+    forecaster = SensorForecaster(half_life_minutes=60, max_age_minutes=180)
+    start = datetime(2024, 5, 1, 8)
+    times = [(start + timedelta(minutes=10 * i)).timestamp() for i in range(7)]
+    forecaster.observe([1] * 7, times, [20.0 + 0.1 * i for i in range(7)])
+    last = times[-1]
+    assert 1 in forecaster.forecast([1], now=last + 3600)
+    assert forecaster.forecast([1], now=last + 24 * 3600) == {}
+
+    # Another worker kept ingesting: history from the database replaces the stale fit
+    later = start + timedelta(hours=24)
+    history = {1: [(later + timedelta(minutes=10 * i), 18.0) for i in range(6)]}
+    forecaster.seed(history, now=(later + timedelta(hours=1)).timestamp())
+    refit = forecaster.forecast([1], now=(later + timedelta(hours=1)).timestamp())[1]
+    assert abs(refit.temp - 18.0) < 0.01 and abs(refit.slope) < 0.01
+
+
+def test_ingestion_updates_forecasts(app):
+    """Positive: ingested readings refit the app's forecaster."""
+    with app.app_context():
+        now = datetime.utcnow()
+        ingest_readings([(1, now - timedelta(minutes=50 - 10 * i), 20.0 + 0.5 * i) for i in range(6)])
+        forecast = get_forecaster().forecast([1])[1]
+        assert forecast.slope > 2.5 and forecast.temp > 23.0
+
+
+def test_dashboard_shows_forecasts(client):
+    """Positive: the admin dashboard renders the forecast column."""
+    client.post('/login', data={'username': 'admin1', 'password': 'password123'})
+    rv = client.get('/admin')
+    assert rv.status_code == 200
+    assert 'Forecast (°C)'.encode() in rv.data
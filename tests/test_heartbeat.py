@@ -0,0 +1,66 @@
+# tests/test_heartbeat.py
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Sensor
+from app.heartbeat import record_heartbeats, sweep_stale_sensors
+from app.scheduler import BackgroundScheduler
+from app.ingest import ingest_readings
+from app.observer import get_dashboard_notifications
+
+
+def test_heartbeats_never_move_backwards(app):
+    """Positive: last_seen only advances, even for backfilled readings."""
+    now = datetime(2025, 1, 1, 12)
+    with app.app_context():
+        record_heartbeats({1: now, 2: now})
+        record_heartbeats({1: now - timedelta(hours=1), 2: now + timedelta(minutes=5)})
+        db.session.commit()
+        assert db.session.get(Sensor, 1).last_seen == now
+        assert db.session.get(Sensor, 2).last_seen == now + timedelta(minutes=5)
+
+
+def test_sweep_marks_silent_sensors_offline(app):
+    """Positive: only sensors past the timeout transition; never-seen ones are left alone."""
+    app.config['SENSOR_TIMEOUT_SECONDS'] = 600
+    now = datetime(2025, 1, 1, 12)
+    with app.app_context():
+        record_heartbeats({1: now - timedelta(minutes=30), 3: now - timedelta(minutes=5)})
+        db.session.commit()
+        assert sweep_stale_sensors(now) == 1
+        assert db.session.get(Sensor, 1).status == 'offline'
+        assert db.session.get(Sensor, 3).status == 'online'
+        # already offline: nothing left to sweep
+        assert sweep_stale_sensors(now) == 0
+
+
+def test_swept_sensor_comes_back_online_when_it_reports(app):
+    """Positive: sweep -> new reading -> online again, with observers notified."""
+    app.config['SENSOR_TIMEOUT_SECONDS'] = 600
+    now = datetime.utcnow()
+    with app.app_context():
+        record_heartbeats({1: now - timedelta(minutes=30)})
+        db.session.commit()
+        assert sweep_stale_sensors(now) == 1
+
+        # A backfilled old reading is not a sign of life
+        ingest_readings([(1, now - timedelta(minutes=20), 21.0)])
+        assert db.session.get(Sensor, 1).status == 'offline'
+
+        ingest_readings([(1, now, 21.0)])
+        assert db.session.get(Sensor, 1).status == 'online'
+    last = get_dashboard_notifications()[-1]
+    assert (last['sensor_id'], last['old_status'], last['new_status']) == (1, 'offline', 'online')
+
+
+def test_scheduler_runs_due_jobs(app):
+    """Positive: run_pending only runs jobs whose interval has elapsed."""
+    now = [0.0]
+    runs = []
+    scheduler = BackgroundScheduler(app, clock=lambda: now[0])
+    scheduler.add_job('count', lambda: runs.append(1), interval=10)
+    scheduler.run_pending()
+    now[0] = 10
+    scheduler.run_pending()
+    scheduler.run_pending()
+    assert runs == [1]
@@ -0,0 +1,58 @@
+# tests/test_inference.py
+import atexit
+
+import numpy as np
+
+from app.analysis import SensorFeatureVector
+from app.inference import LinearComfortModel, ModelRunner, FEATURE_FIELDS
+
+
+def make_vector(sensor_id, temp, hot=0.0, cold=0.0):
+    return SensorFeatureVector(
+        sensor_id=sensor_id, location='Lab', timestamp=None, current_temp=temp,
+        avg_temp_1h=temp, hot_feedback_count=0, cold_feedback_count=0,
+        ok_feedback_count=0, total_feedback_count=0, hot_score=hot, cold_score=cold
+    )
+
+
+class CountingModel(LinearComfortModel):
+    calls = []
+
+    def predict(self, rows):
+        self.calls.append(len(rows))
+        return super().predict(rows)
+
+
+def test_linear_model_fit_recovers_coefficients():
+    """Positive: the local regression model fits offline data."""
+    rng = np.random.default_rng(0)
+    rows = rng.normal(20, 3, size=(200, len(FEATURE_FIELDS)))
+    targets = 2.0 - 0.4 * rows[:, 0] + 0.1 * rows[:, 2]
+    model = LinearComfortModel().fit(rows, targets)
+    assert np.allclose(model.predict(rows), targets, atol=1e-6)
+
+
+def test_runner_caches_unchanged_rows():
+    """Positive: only sensors whose features changed are re-scored."""
+    model = CountingModel()
+    runner = ModelRunner(model)
+    first = runner.predict([make_vector(1, 25.0), make_vector(2, 22.0, hot=2.0)])
+    assert first[1] < 0 and first[2] < 0
+    second = runner.predict([make_vector(1, 25.0), make_vector(2, 19.0)])
+    assert second[1] == first[1]
+    assert model.calls == [2, 1]
+    assert (runner.hits, runner.misses) == (1, 3)
+
+
+def test_runner_process_pool_matches_inline(monkeypatch):
+    """Positive: scoring in worker processes gives the same results, and the pool is shut down at exit."""
+    registered = []
+    monkeypatch.setattr(atexit, 'register', registered.append)
+    vectors = [make_vector(i, 18.0 + i / 10, hot=i % 3) for i in range(50)]
+    inline = ModelRunner(LinearComfortModel()).predict(vectors)
+    pooled = ModelRunner(LinearComfortModel(), workers=2)
+    try:
+        assert pooled.predict(vectors) == inline
+        assert registered == [pooled.close]
+    finally:
+        pooled.close()
@@ -0,0 +1,89 @@
+# tests/test_ingest.py
+import random
+import threading
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Sensor, TemperatureReading
+from app.anomaly import AnomalyMonitor, RATE, ZSCORE, FLATLINE, RECOVERED
+from app.observer import get_dashboard_notifications
+
+API_HEADERS = {'X-API-Key': 'dev-ingest-key'}
+
+
+def test_detector_flags_spike_and_recovers():
+    """Positive: a sudden jump is reported once, then recovery after steady readings."""
+    monitor = AnomalyMonitor(warmup=5, recovery=3)
+    events = [monitor.observe(1, t * 60.0, 21.0 + 0.1 * (t % 2)) for t in range(10)]
+    assert events == [None] * 10
+    assert monitor.observe(1, 600.0, 35.0) == RATE
+    assert monitor.observe(1, 660.0, 35.0) is None      # still faulty, not re-reported
+    events = [monitor.observe(1, 660.0 + t * 600.0, 21.0 + 0.1 * (t % 2)) for t in range(1, 8)]
+    assert RECOVERED in events
+
+
+def test_detector_ignores_jitter_between_frequent_readings():
+    """Negative: load-generator noise every 10 s is not a fast change; a real jump still is."""
+    rng = random.Random(0)
+    monitor = AnomalyMonitor()
+    events = [monitor.observe(sid, t * 10.0, round(21.0 + rng.gauss(0, 0.3), 2))
+              for sid in range(50) for t in range(360)]
+    assert RATE not in events
+    assert monitor.observe(0, 3600.0, 25.0) == RATE
+
+
+def test_detector_flags_zscore_and_flatline():
+    """Positive: a slow drift outside the band and a stuck value are both detected."""
+    monitor = AnomalyMonitor(warmup=5, max_rate=100.0, flatline_seconds=3600)
+    for t in range(20):
+        monitor.observe(1, t * 600.0, 21.0 + 0.1 * (t % 2))
+    assert monitor.observe(1, 20 * 600.0, 24.0) == ZSCORE
+    events = [monitor.observe(2, t * 600.0, 20.0) for t in range(8)]
+    assert events.index(FLATLINE) == 6
+    assert events.count(FLATLINE) == 1
+
+
+def test_detector_updates_are_serialised():
+    """Negative: a reading is not folded into a detector while another thread is updating it."""
+    monitor = AnomalyMonitor()
+    observer = threading.Thread(target=monitor.observe, args=(1, 0.0, 21.0))
+    with monitor._lock:         # as if another ingest thread were mid-update
+        observer.start()
+        observer.join(0.1)
+        assert observer.is_alive() and len(monitor) == 0
+    observer.join()
+    assert len(monitor) == 1 and not monitor.is_faulty(1)
+
+
+def test_ingest_api_marks_sensor_faulty(client, app):
+    """Positive: posted readings are stored and a misbehaving sensor turns faulty."""
+    start = datetime(2020, 1, 1, 12)
+    readings = [
+        {'sensor_id': 1, 'temperature': 21.0, 'timestamp': (start + timedelta(minutes=i)).isoformat()}
+        for i in range(12)
+    ]
+    readings.append({'sensor_id': 1, 'temperature': 60.0,
+                     'timestamp': (start + timedelta(minutes=12)).isoformat()})
+    rv = client.post('/api/readings', json={'readings': readings}, headers=API_HEADERS)
+    assert rv.status_code == 202
+    assert rv.get_json()['accepted'] == 13
+    assert rv.get_json()['faults'] == {'1': 'rate'}
+    with app.app_context():
+        assert db.session.get(Sensor, 1).status == 'faulty'
+        count = db.session.scalar(
+            db.select(db.func.count()).select_from(TemperatureReading)
+              .where(TemperatureReading.timestamp < datetime(2021, 1, 1))
+        )
+        assert count == 13
+    assert get_dashboard_notifications()[-1]['new_status'] == 'faulty'
+
+
+def test_ingest_api_rejects_bad_input(client):
+    """Negative: wrong key is forbidden; unknown sensors and bad values are rejected."""
+    rv = client.post('/api/readings', json={'sensor_id': 1, 'temperature': 20}, headers={'X-API-Key': 'nope'})
+    assert rv.status_code == 403
+    rv = client.post('/api/readings', json=[
+        {'sensor_id': 999, 'temperature': 20},
+        {'sensor_id': 1, 'temperature': 'warm'},
+    ], headers=API_HEADERS)
+    assert rv.get_json() == {'accepted': 0, 'rejected': 2, 'faults': {}}
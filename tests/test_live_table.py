@@ -0,0 +1,129 @@
+# tests/test_live_table.py
+import multiprocessing
+from datetime import datetime, timedelta
+
+from app import db
+from app.live_table import LiveTable, get_live_table, reload_live_table
+from app.models import Sensor
+
+API_HEADERS = {'X-API-Key': 'dev-ingest-key'}
+
+
+def login_as(username, client):
+    client.post(
+        '/login',
+        data={'username': username, 'password': 'password123'},
+        follow_redirects=True
+    )
+
+
+def write_from_child(path):
+    table = LiveTable(path, slots=64)
+    table.record_readings({7: (datetime(2024, 5, 1, 12), 23.5)})
+    table.record_statuses({7: 'faulty'})
+    table.close()
+
+
+def test_readings_statuses_and_clear(tmp_path):
+    """Positive: only newer readings replace a slot; statuses and removal apply per slot."""
+    table = LiveTable(str(tmp_path / 'live.tbl'), slots=64)
+    assert table.created
+    noon = datetime(2024, 5, 1, 12)
+    table.record_readings({1: (noon, 21.0), 2: (noon, 19.5), 99: (noon, 30.0)})
+    table.record_readings({1: (noon - timedelta(minutes=5), 25.0), 2: (noon + timedelta(minutes=1), 20.0)})
+    table.record_statuses({1: 'offline', 3: 'online'})
+
+    values = table.snapshot([1, 2, 3, 4, 99])
+    assert sorted(values) == [1, 2, 3]                  # 4 never written, 99 out of range
+    assert (values[1].temp, values[1].temp_at, values[1].status) == (21.0, noon, 'offline')
+    assert (values[2].temp, values[2].last_seen) == (20.0, noon + timedelta(minutes=1))
+    assert values[3].temp is None and values[3].status == 'online'
+
+    table.clear([2])
+    assert sorted(table.snapshot([1, 2, 3])) == [1, 3]
+
+    # Reopening keeps the contents
+    table.close()
+    reopened = LiveTable(str(tmp_path / 'live.tbl'), slots=64)
+    assert not reopened.created
+    assert reopened.snapshot([1])[1].temp == 21.0
+    reopened.close()
+
+
+def test_snapshot_skips_slot_mid_write(tmp_path):
+    """Negative: a slot with an odd sequence number is never returned half-written."""
+    table = LiveTable(str(tmp_path / 'live.tbl'), slots=64)
+    table.record_readings({1: (datetime(2024, 5, 1), 21.0), 2: (datetime(2024, 5, 1), 22.0)})
+    table._slots['seq'][1] += 1                         # writer stalled inside slot 1
+    table._slots['temp'][1] = 99.0
+    assert sorted(table.snapshot([1, 2], retries=3)) == [2]
+
+    table._slots['seq'][1] += 1                         # write finished
+    assert table.snapshot([1])[1].temp == 99.0
+    table.close()
+
+
+def test_writes_are_visible_to_other_processes(tmp_path):
+    """Positive: a value written by another process is read without any database."""
+    path = str(tmp_path / 'live.tbl')
+    reader = LiveTable(path, slots=64)
+    child = multiprocessing.get_context('fork').Process(target=write_from_child, args=(path,))
+    child.start()
+    child.join(10)
+    assert child.exitcode == 0
+
+    value = reader.snapshot([7])[7]
+    assert (value.temp, value.temp_at, value.status) == (23.5, datetime(2024, 5, 1, 12), 'faulty')
+    reader.close()
+
+
+def test_ingest_feeds_sensor_list_and_dashboard(app, client):
+    """Positive: ingested readings and status toggles reach the pages through the table."""
+    now = datetime.utcnow()
+    rv = client.post('/api/readings', json={'readings': [
+        {'sensor_id': 1, 'temperature': 21.0, 'timestamp': (now - timedelta(minutes=2)).isoformat()},
+        {'sensor_id': 1, 'temperature': 21.5, 'timestamp': now.isoformat()},
+    ]}, headers=API_HEADERS)
+    assert rv.status_code == 202
+    with app.app_context():
+        table = get_live_table()
+        value = table.snapshot([1])[1]
+    assert value.temp_at == now and value.last_seen == now
+
+    login_as('admin1', client)
+    assert f"{value.temp:.1f} °C".encode() in client.get('/sensors').data
+
+    client.post('/sensors/toggle_status', data={'record_id': 1})
+    assert table.snapshot([1])[1].status == 'offline'
+
+    # Once the snapshot exists, newer values are overlaid without a rebuild
+    client.get('/admin')
+    table.record_readings({2: (datetime.utcnow(), 27.25)})
+    assert b'27.25\xc2\xb0C' in client.get('/admin').data
+
+
+def test_only_committed_statuses_reach_the_table(app):
+    """Negative: a status change that is rolled back never shows in the table."""
+    with app.app_context():
+        table = get_live_table()
+        db.session.get(Sensor, 1).set_status('faulty')
+        db.session.flush()
+        assert table.snapshot([1])[1].status == 'online'
+        db.session.rollback()
+        assert table.snapshot([1])[1].status == 'online'
+
+        db.session.get(Sensor, 1).set_status('offline')
+        db.session.commit()
+        assert table.snapshot([1])[1].status == 'offline'
+
+
+def test_reload_replaces_rows_from_the_database(app):
+    """Positive: reloading drops sensors the database no longer has and restores statuses."""
+    with app.app_context():
+        table = get_live_table()
+        table.record_statuses({1: 'faulty', 50: 'online'})
+        table.record_readings({50: (datetime.utcnow(), 30.0)})
+        reload_live_table()
+        values = table.snapshot([1, 50])
+        assert sorted(values) == [1]
+        assert values[1].status == db.session.get(Sensor, 1).status
@@ -0,0 +1,40 @@
+# tests/test_loadgen.py
+import asyncio
+
+from app.loadgen import SensorFleet, run_load
+
+
+class FakeSender:
+    def __init__(self):
+        self.batches = []
+
+    async def send(self, readings):
+        self.batches.append(readings)
+        return '500' if len(self.batches) % 5 == 0 else '202'
+
+    def close(self):
+        pass
+
+
+def test_fleet_round_robin_and_dropouts():
+    """Positive: batches cycle through the fleet; dropped sensors go quiet."""
+    fleet = SensorFleet([1, 2, 3], seed=1, dropout_rate=0.0)
+    first = fleet.batch(2, clock=0.0)
+    second = fleet.batch(2, clock=0.0)
+    assert [r['sensor_id'] for r in first + second] == [1, 2, 3, 1]
+    assert all(15.0 < r['temperature'] < 30.0 for r in first + second)
+
+    fleet = SensorFleet([1, 2, 3], seed=1, dropout_rate=1.0, dropout_seconds=60)
+    assert fleet.batch(3, clock=0.0) == []
+
+
+def test_run_load_reports_rate_latency_and_errors():
+    """Positive: report counts requests, errors and latency percentiles."""
+    sender = FakeSender()
+    fleet = SensorFleet(list(range(10)), dropout_rate=0.0)
+    report = asyncio.run(run_load(sender, fleet, rate=200, duration=0.1, batch_size=2))
+    assert report.sent == 20
+    assert report.errors == 4
+    assert report.readings == 32
+    assert report.percentile(50) <= report.percentile(99)
+    assert 'p99=' in report.summary()
@@ -0,0 +1,88 @@
+# tests/test_read_routing.py
+import sqlite3
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from app.models import Sensor
+from app.read_routing import read_uri, reads_from_replica
+
+
+@pytest.fixture
+def file_app(seed_template, tmp_path):
+    """An app over a SQLite file (seeded from the template), so it gets a read engine."""
+    path = tmp_path / 'campus.sqlite'
+    target = sqlite3.connect(path)
+    seed_template.backup(target)
+    target.close()
+    app = create_app({
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'ARCHIVE_DIR': str(tmp_path / 'archive'),
+    })
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+    app.extensions['read_engine'].dispose()
+
+
+def count_statements(engine):
+    statements = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+def test_read_uri_for_each_backend():
+    """Positive: SQLite files read through mode=ro; replicas win; memory has none."""
+    assert read_uri({'SQLALCHEMY_DATABASE_URI': 'sqlite:////srv/campus.sqlite'}) == \
+        'sqlite:///file:/srv/campus.sqlite?mode=ro&uri=true'
+    assert read_uri({'SQLALCHEMY_DATABASE_URI': 'postgresql://primary/campus',
+                     'SQLALCHEMY_READ_URI': 'postgresql://replica/campus'}) == 'postgresql://replica/campus'
+    assert read_uri({'SQLALCHEMY_DATABASE_URI': 'postgresql://primary/campus'}) is None
+    assert read_uri({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'}) is None
+
+
+def test_selects_use_read_engine_and_writes_the_primary(file_app):
+    """Positive: routed SELECTs hit the read-only pool; flushes still reach the primary."""
+    read_engine = file_app.extensions['read_engine']
+    with file_app.app_context():
+        assert db.session.execute(db.text('PRAGMA journal_mode')).scalar() == 'wal'
+        reads = count_statements(read_engine)
+        writes = count_statements(db.engine)
+        with reads_from_replica():
+            assert db.session.scalar(db.select(db.func.count(Sensor.id))) == 3
+            db.session.add(Sensor(name='Routed', location='Building 9 - Room 1', status='online'))
+            db.session.commit()
+            assert db.session.scalar(db.select(db.func.count(Sensor.id))) == 4
+        assert reads and all(s.lstrip().upper().startswith('SELECT') for s in reads)
+        assert any(s.startswith('INSERT INTO sensors') for s in writes)
+
+        # Outside the block everything uses the primary
+        reads.clear()
+        db.session.scalar(db.select(Sensor).limit(1))
+        assert reads == []
+
+
+def test_read_engine_refuses_writes(file_app):
+    """Negative: the read side is read-only even if a write is sent to it."""
+    with file_app.app_context():
+        with file_app.extensions['read_engine'].connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("UPDATE sensors SET status = 'offline'")
+
+
+def test_dashboard_and_history_read_from_replica(file_app):
+    """Positive: the dashboard build runs its queries on the read engine."""
+    reads = count_statements(file_app.extensions['read_engine'])
+    client = file_app.test_client()
+    client.post('/login', data={'username': 'admin1', 'password': 'password123'})
+    assert client.get('/admin').status_code == 200
+    assert any('temperature_readings' in s for s in reads)
+
+    reads.clear()
+    assert client.get('/sensors/1/history.json').status_code == 200
+    assert any('temperature_readings' in s for s in reads)
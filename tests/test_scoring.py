@@ -0,0 +1,91 @@
+# tests/test_scoring.py
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app import create_app, db
+from app.models import Sensor
+
+
+def login_as_student(client):
+    client.post(
+        '/login',
+        data={'username': 'student1', 'password': 'password123'},
+        follow_redirects=True
+    )
+
+
+def test_scores_halve_every_half_life(app):
+    """Positive: a rating loses half its weight per configured half-life."""
+    app.config['FEEDBACK_HALF_LIFE_HOURS'] = 2
+    with app.app_context():
+        sensor = Sensor(name='Decay', location='Lab 1', status='online')
+        start = datetime(2025, 1, 1, 12)
+        sensor.record_feedback('hot', start)
+        sensor.record_feedback('cold', start + timedelta(hours=2))
+        scores = sensor.feedback_scores(start + timedelta(hours=4))
+        assert abs(scores['hot'] - 0.25) < 1e-9
+        assert abs(scores['cold'] - 0.5) < 1e-9
+        assert scores['ok'] == 0.0
+
+
+def test_late_feedback_is_aged(app):
+    """Negative: an out-of-order rating does not count as brand new."""
+    app.config['FEEDBACK_HALF_LIFE_HOURS'] = 1
+    with app.app_context():
+        sensor = Sensor(name='Late', location='Lab 1', status='online')
+        now = datetime(2025, 1, 1, 12)
+        sensor.record_feedback('ok', now)
+        sensor.record_feedback('ok', now - timedelta(hours=1))
+        assert abs(sensor.feedback_scores(now)['ok'] - 1.5) < 1e-9
+
+
+def test_submit_feedback_updates_scores(client, app):
+    """Positive: submitting feedback bumps the sensor's decayed score."""
+    with app.app_context():
+        before = db.session.get(Sensor, 1).feedback_scores()['cold']
+    login_as_student(client)
+    client.post('/feedback', data={'sensor_id': '1', 'rating': 'cold'}, follow_redirects=True)
+    with app.app_context():
+        after = db.session.get(Sensor, 1).feedback_scores()['cold']
+    assert after > before + 0.99
+
+
+def test_concurrent_submissions_keep_every_rating(seed_template, tmp_path):
+    """Negative: two transactions scoring the same sensor at once do not lose an update."""
+    path = tmp_path / 'campus.sqlite'
+    target = sqlite3.connect(path)
+    seed_template.backup(target)
+    target.close()
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'ARCHIVE_DIR': str(tmp_path / 'archive'),
+        'FEEDBACK_HALF_LIFE_HOURS': 1e6,
+    })
+    now = datetime.utcnow()
+    with app.app_context():
+        before = db.session.get(Sensor, 1).feedback_scores(now)['hot']
+    first_locked = threading.Event()
+
+    def submit(wait_for=None):
+        with app.app_context():
+            if wait_for is not None:
+                wait_for.wait(5)
+            sensor = Sensor.get_for_update(1)
+            if wait_for is None:
+                first_locked.set()
+                time.sleep(0.3)             # the other transaction reads meanwhile
+            sensor.record_feedback('hot', now)
+            db.session.commit()
+
+    threads = [threading.Thread(target=submit), threading.Thread(target=submit, args=(first_locked,))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    with app.app_context():
+        assert abs(db.session.get(Sensor, 1).feedback_scores(now)['hot'] - (before + 2)) < 1e-3
+        db.engine.dispose()
+    app.extensions['read_engine'].dispose()
@@ -0,0 +1,130 @@
+# tests/test_sensor_bulk.py
+import io
+
+from sqlalchemy import event
+
+from app import db
+from app.models import Sensor
+from app.observer import SensorStatusObserver, sensor_status_subject
+from app.zones import get_zone_hierarchy
+
+
+def login_as(username, client):
+    client.post(
+        '/login',
+        data={'username': username, 'password': 'password123'},
+        follow_redirects=True
+    )
+
+
+def upload(client, text, default_status='offline'):
+    return client.post(
+        '/sensors/import',
+        data={'file': (io.BytesIO(text.encode()), 'sensors.csv'), 'default_status': default_status},
+        content_type='multipart/form-data',
+        follow_redirects=True
+    )
+
+
+class BatchRecorder(SensorStatusObserver):
+    def __init__(self):
+        self.batches = []
+
+    def update(self, sensor_id, old_status, new_status):
+        self.batches.append([(sensor_id, old_status, new_status)])
+
+    def update_batch(self, changes):
+        self.batches.append(list(changes))
+
+
+def test_import_sensors_csv(app, client):
+    """Positive: every row of a valid CSV becomes a sensor."""
+    login_as('admin1', client)
+    rows = '\n'.join(f'Hall {i},Building 9 - Room {100 + i},,Building 9,1' for i in range(50))
+    rv = upload(client, 'name,location,status,building,floor\n' + rows + '\nHall X,Building 9 - Room 1,online,,\n')
+    assert b'Imported 51 sensors.' in rv.data
+    with app.app_context():
+        statuses = db.session.scalars(db.select(Sensor.status).where(Sensor.location.startswith('Building 9'))).all()
+        assert len(statuses) == 51
+        assert statuses.count('online') == 1
+
+
+def test_import_rejects_whole_file_on_bad_row(app, client):
+    """Negative: one invalid row imports nothing and reports the line."""
+    login_as('admin1', client)
+    with app.app_context():
+        before = db.session.scalar(db.select(db.func.count()).select_from(Sensor))
+    rv = upload(client, 'name,location,status\nGood,Building 9 - Room 1,online\n,Building 9 - Room 2,online\n'
+                        'Odd,Building 9 - Room 3,broken\n')
+    assert b'Line 3: name is required' in rv.data
+    assert b'Line 4: unknown status' in rv.data
+    with app.app_context():
+        assert db.session.scalar(db.select(db.func.count()).select_from(Sensor)) == before
+
+
+def test_bulk_status_by_building_notifies_once(app, client):
+    """Positive: a building's sensors change in one transaction and one notification."""
+    recorder = BatchRecorder()
+    sensor_status_subject.attach(recorder)
+    try:
+        login_as('admin1', client)
+        upload(client, 'name,location,building\n' + '\n'.join(
+            f'Lab {i},Building 9 - Room {i},Building 9' for i in range(20)))
+        rv = client.post('/sensors/bulk_status', data={'building': 'Building 9', 'status': 'online'},
+                         follow_redirects=True)
+        assert b'20 sensors set to online.' in rv.data
+        assert len(recorder.batches) == 1 and len(recorder.batches[0]) == 20
+        with app.app_context():
+            assert db.session.scalar(
+                db.select(db.func.count()).select_from(Sensor)
+                  .where(Sensor.building == 'Building 9', Sensor.status == 'online')) == 20
+    finally:
+        sensor_status_subject.detach(recorder)
+
+
+def test_bulk_status_matches_building_from_location(app, client):
+    """Positive: sensors without a building column are matched by the building in their location."""
+    login_as('admin1', client)
+    upload(client, 'name,location,building\nTagged,Building 9 - Room 1,Building 9\n'
+                   'Untagged,Building 9 - Room 2,\nOther,Building 90 - Room 1,\n')
+    rv = client.post('/sensors/bulk_status', data={'building': 'Building 9', 'status': 'online'},
+                     follow_redirects=True)
+    assert b'2 sensors set to online.' in rv.data
+    with app.app_context():
+        statuses = dict(db.session.execute(
+            db.select(Sensor.name, Sensor.status).where(Sensor.location.startswith('Building 9'))).all())
+        assert statuses == {'Tagged': 'online', 'Untagged': 'online', 'Other': 'offline'}
+
+
+def test_import_adds_sensors_to_hierarchy_without_reloading_them(app, client):
+    """Positive: imported sensors are placed in the zone hierarchy with no query per sensor."""
+    login_as('admin1', client)
+    with app.app_context():
+        get_zone_hierarchy()
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        rv = upload(client, 'name,location\n' + '\n'.join(f'Hall {i},Building 9 - Room {100 + i}' for i in range(20)))
+    finally:
+        with app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', listener)
+    assert b'Imported 20 sensors.' in rv.data
+    assert not any('WHERE sensors.id' in s for s in statements)
+    with app.app_context():
+        assert 'Building 9' in get_zone_hierarchy().buildings
+
+
+def test_bulk_status_requires_filter(client):
+    """Negative: a bulk change without a building or prefix is refused."""
+    login_as('admin1', client)
+    rv = client.post('/sensors/bulk_status', data={'status': 'offline'}, follow_redirects=True)
+    assert b'Enter a building or a location prefix.' in rv.data
+
+
+def test_bulk_endpoints_admin_only(client):
+    """Negative: students cannot use the bulk endpoints."""
+    login_as('student1', client)
+    assert client.post('/sensors/bulk_status', data={'building': 'B', 'status': 'offline'}).status_code == 403
+    assert client.post('/sensors/import').status_code == 403
@@ -0,0 +1,105 @@
+# tests/test_sensor_registry.py
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app import db
+from app.models import Sensor
+from app.sensor_registry import SensorRecord, SensorRegistry, get_sensor_registry
+
+
+def login_as(username, client):
+    client.post(
+        '/login',
+        data={'username': username, 'password': 'password123'},
+        follow_redirects=True
+    )
+
+
+def test_indexes_follow_updates_and_removals():
+    """Positive: replacing or removing a record moves it between index buckets."""
+    registry = SensorRegistry([
+        SensorRecord(2, 'B', 'Building 1 - Room 101', 'online', building='Building 1'),
+        SensorRecord(1, 'A', 'Building 1 - Room 101', 'online', building='Building 1'),
+        SensorRecord(3, 'C', 'Building 2 - Room 201', 'offline', building='Building 2'),
+    ])
+    assert [r.id for r in registry.at_location('Building 1 - Room 101')] == [1, 2]
+    assert registry.status_counts() == {'online': 2, 'offline': 1}
+
+    registry.apply({2: SensorRecord(2, 'B', 'Building 2 - Room 202', 'faulty', building='Building 2'),
+                    3: None})
+    assert [r.id for r in registry.in_building('Building 2')] == [2]
+    assert [r.id for r in registry.with_status('faulty')] == [2]
+    assert registry.with_status('offline') == [] and 3 not in registry
+    assert registry.status_counts() == {'online': 1, 'faulty': 1}
+    assert not hasattr(registry.get(1), '__dict__')
+
+
+def test_building_index_uses_derived_building():
+    """Positive: a sensor with no building column is found under the building in its location."""
+    registry = SensorRegistry([
+        SensorRecord(1, 'A', 'Building 1 - Room 101', 'online'),
+        SensorRecord(2, 'B', 'Annex - Room 5', 'online', building='Building 1'),
+        SensorRecord(3, 'C', 'Building 10 - Room 101', 'online'),
+    ])
+    assert [r.id for r in registry.in_building('Building 1')] == [1, 2]
+    assert registry.in_building('Annex') == []
+    registry.apply({1: SensorRecord(1, 'A', 'Building 2 - Room 101', 'online')})
+    assert [r.id for r in registry.in_building('Building 2')] == [1]
+    assert [r.id for r in registry.in_building('Building 1')] == [2]
+
+
+def test_records_match_orm_sensors(app):
+    """Positive: records resolve zones and decayed scores exactly like Sensor."""
+    now = datetime.utcnow()
+    with app.app_context():
+        sensor = db.session.get(Sensor, 1)
+        sensor.record_feedback('hot', now)
+        db.session.commit()
+        record = get_sensor_registry().get(1)
+        assert (record.zone_path, record.zone_name) == (sensor.zone_path, sensor.zone_name)
+        assert record.feedback_scores(now) == sensor.feedback_scores(now)
+
+
+def test_commits_update_registry_and_rollbacks_do_not(app):
+    """Negative: only committed sensor changes reach the registry."""
+    with app.app_context():
+        registry = get_sensor_registry()
+        sensor = Sensor(name='New', location='Building 7 - Room 310', status='online')
+        db.session.add(sensor)
+        db.session.commit()
+        assert registry.get(sensor.id).zone_name == 'Building 7 / Floor 3'
+
+        sensor.set_status('offline')
+        db.session.flush()
+        db.session.rollback()
+        assert registry.get(sensor.id).status == 'online'
+
+        db.session.get(Sensor, sensor.id).set_status('faulty')
+        db.session.commit()
+        assert [r.id for r in registry.with_status('faulty')] == [sensor.id]
+
+        db.session.delete(db.session.get(Sensor, sensor.id))
+        db.session.commit()
+        assert sensor.id not in registry
+        assert get_sensor_registry() is registry
+
+
+def test_student_page_served_from_registry(app, client):
+    """Positive: once loaded, the sensor choices need no query on sensors."""
+    statements = []
+    with app.app_context():
+        get_sensor_registry()
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+    login_as('student1', client)
+    statements.clear()
+    rv = client.get('/student')
+    assert rv.status_code == 200
+    assert b'Building 1' in rv.data
+    assert not any('FROM sensors' in s for s in statements)
+
+    # An expired registry is reloaded with one column query
+    app.config['SENSOR_REGISTRY_TTL'] = 0
+    client.get('/student')
+    assert sum('FROM sensors' in s for s in statements) == 1
@@ -0,0 +1,82 @@
+# tests/test_snapshot.py
+import re
+from datetime import datetime, timedelta
+
+from app import db
+from app.ingest import ingest_readings
+from app.models import DashboardSnapshot, Feedback
+from app.snapshot import build_dashboard_data, refresh_dashboard_snapshot, rebuild_dashboard_snapshot
+
+
+def login_as(username, client):
+    client.post(
+        '/login',
+        data={'username': username, 'password': 'password123'},
+        follow_redirects=True
+    )
+
+
+def test_dashboard_json_conditional_get(client):
+    """Positive: polling clients get 304 until the snapshot changes."""
+    login_as('admin1', client)
+    rv = client.get('/admin/dashboard.json')
+    assert rv.status_code == 200
+    assert rv.get_json()['sensor_count'] == len(rv.get_json()['sensors'])
+    etag = rv.headers['ETag']
+
+    rv = client.get('/admin/dashboard.json', headers={'If-None-Match': etag})
+    assert rv.status_code == 304
+    assert rv.data == b''
+
+
+def test_data_change_marks_snapshot_stale(app, client):
+    """Positive: ingesting readings flags the snapshot and the next view rebuilds it."""
+    login_as('admin1', client)
+    first = client.get('/admin/dashboard.json')
+    with app.app_context():
+        ingest_readings([(1, datetime.utcnow(), 31.5)])
+        assert db.session.get(DashboardSnapshot, 1).stale
+    rv = client.get('/admin/dashboard.json', headers={'If-None-Match': first.headers['ETag']})
+    assert rv.status_code == 200
+    assert rv.get_json()['sensors'][0]['temp'] == 31.5
+
+
+def test_refresh_job_skips_fresh_snapshot(app):
+    """Positive: the job only rebuilds missing, stale or expired snapshots."""
+    with app.app_context():
+        now = datetime.utcnow()
+        assert refresh_dashboard_snapshot(now)
+        assert not refresh_dashboard_snapshot(now + timedelta(seconds=1))
+        max_age = app.config['DASHBOARD_SNAPSHOT_MAX_AGE']
+        assert refresh_dashboard_snapshot(now + timedelta(seconds=max_age + 1))
+
+
+def test_feedback_counts_are_grouped_in_the_database(app):
+    """Positive: the dashboard's feedback totals and badges match the stored rows."""
+    with app.app_context():
+        feedbacks = db.session.scalars(db.select(Feedback)).all()
+        data = build_dashboard_data()
+    assert data['feedback_count'] == len(feedbacks)
+    for rating in ('hot', 'ok', 'cold'):
+        assert data[f'{rating}_count'] == sum(fb.rating == rating for fb in feedbacks)
+    badges = {row['id']: row['feedback'] for row in data['sensors']}
+    for fb in feedbacks:
+        assert badges[fb.sensor_id][fb.rating] >= 1
+    assert sum(sum(counts.values()) for counts in badges.values()) == len(feedbacks)
+    assert f"Total feedbacks: {len(feedbacks)};" in data['feedback_summary']
+
+
+def test_dashboard_shows_snapshot_age(app, client):
+    """Positive: the page renders from the stored snapshot and shows its age."""
+    login_as('admin1', client)
+    with app.app_context():
+        rebuild_dashboard_snapshot(datetime.utcnow() - timedelta(seconds=42))
+    rv = client.get('/admin')
+    age = int(re.search(rb'Updated (\d+)s ago', rv.data).group(1))
+    assert 42 <= age < 50
+
+
+def test_dashboard_json_forbidden_for_students(client):
+    """Negative: students cannot read the dashboard data."""
+    login_as('student1', client)
+    assert client.get('/admin/dashboard.json').status_code == 403
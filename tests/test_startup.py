@@ -0,0 +1,36 @@
+# tests/test_startup.py
+import subprocess
+import sys
+
+from app import create_app
+from app.observer import sensor_status_subject
+
+
+def test_observers_registered_once(app):
+    """Positive: creating more apps does not attach observers twice."""
+    count = len(sensor_status_subject._observers)
+    create_app()
+    create_app()
+    assert len(sensor_status_subject._observers) == count
+
+
+def test_create_app_does_not_load_analysis_stack():
+    """Positive: NumPy and the analysis modules load on first use, not at startup."""
+    probe = (
+        "import sys, config; config.Config.SCHEDULER_ENABLED = False\n"
+        "from app import create_app; create_app()\n"
+        "print(','.join(m for m in ('numpy', 'app.analysis', 'app.ingest') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ''
+
+
+def test_scheduler_is_opt_in():
+    """Negative: without SCHEDULER_ENABLED, create_app (and so every CLI command) starts no jobs."""
+    probe = (
+        "import os; os.environ.pop('SCHEDULER_ENABLED', None)\n"
+        "from app import create_app; app = create_app()\n"
+        "print(app.extensions['scheduler'].running)"
+    )
+    out = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == 'False'
@@ -0,0 +1,67 @@
+# tests/test_suggestions.py
+import threading
+
+from app.suggestions import SuggestionEngine
+
+
+def run(engine, temps, now, hot=(0.0,), cold=(0.0,), low=20.0, high=24.0):
+    n = len(temps)
+    return engine.evaluate(list(range(1, n + 1)), ['Z'] * n, temps, [low] * n, [high] * n,
+                           list(hot) * n if len(hot) == 1 else hot,
+                           list(cold) * n if len(cold) == 1 else cold, now=now)
+
+
+def test_hysteresis_keeps_lowering_inside_deadband():
+    """Positive: lowering starts above the band and only stops deadband below it."""
+    engine = SuggestionEngine(deadband=0.5, cooldown=0)
+    assert run(engine, [24.5], now=0)[0].action == 'lower'
+    assert run(engine, [23.8], now=1)[0].action == 'lower'     # inside band, within deadband
+    assert run(engine, [23.4], now=2)[0].action == 'hold'
+    assert run(engine, [23.8], now=3)[0].action == 'hold'      # no flip-flop back
+
+
+def test_cooldown_blocks_rapid_changes():
+    """Negative: an action cannot change again before the cooldown has passed."""
+    engine = SuggestionEngine(cooldown=600)
+    assert run(engine, [25.0], now=0)[0].action == 'lower'
+    decision = run(engine, [18.0], now=100)[0]
+    assert (decision.action, decision.reason) == ('lower', 'cooldown')
+    # same inputs, but the cooldown has now expired: the pending change applies
+    assert run(engine, [18.0], now=700)[0].action == 'raise'
+
+
+def test_feedback_and_zone_bands_in_one_pass():
+    """Positive: per-sensor bands and decayed feedback are evaluated together."""
+    engine = SuggestionEngine(cooldown=0)
+    decisions = engine.evaluate(
+        [1, 2, 3, 4], ['A', 'A', 'B', 'B'],
+        [22.0, 22.0, 22.0, float('nan')],
+        [20.0, 20.0, 22.5, 20.0], [24.0, 24.0, 26.0, 24.0],
+        [3.0, 0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 0.0], now=0
+    )
+    assert [(d.action, d.reason) for d in decisions] == [
+        ('lower', 'feedback'), ('hold', 'in-band'), ('raise', 'temperature'), ('hold', 'no-data')
+    ]
+    assert decisions[0].delta == -1.0
+    assert decisions[2].setpoint_low == 22.5
+
+
+def test_unchanged_inputs_return_cached_decisions():
+    """Positive: identical inputs reuse the cached result list."""
+    engine = SuggestionEngine()
+    first = run(engine, [21.0, 25.0], now=0)
+    assert run(engine, [21.0, 25.0], now=5) is first
+    assert run(engine, [21.0, 25.5], now=5) is not first
+
+
+def test_evaluations_are_serialised():
+    """Negative: an evaluation never reads the per-sensor state while another one is updating it."""
+    engine = SuggestionEngine(cooldown=600)
+    results = []
+    evaluation = threading.Thread(target=lambda: results.append(run(engine, [30.0], now=0)))
+    with engine._lock:          # as if a concurrent evaluation were in progress
+        evaluation.start()
+        evaluation.join(0.1)
+        assert evaluation.is_alive() and not results
+    evaluation.join()
+    assert results[0][0].action == 'lower'
@@ -0,0 +1,62 @@
+# tests/test_weather.py
+import json
+from datetime import datetime, timedelta
+
+from app.weather import (OutdoorCondition, OutdoorTimeline, CachedOutdoorSource,
+                         FileOutdoorProvider, OutdoorDataProvider)
+
+
+def make_condition(hour, temp):
+    return OutdoorCondition(
+        timestamp=datetime(2025, 1, 1, hour),
+        temp=temp,
+        humidity=50,
+        code='Cloudy'
+    )
+
+
+def test_timeline_nearest_join():
+    """Positive: nearest() picks the closest condition regardless of input order."""
+    timeline = OutdoorTimeline([make_condition(12, 3.0), make_condition(8, 1.0), make_condition(10, 2.0)])
+    assert timeline.latest().temp == 3.0
+    assert timeline.nearest(datetime(2025, 1, 1, 8, 50)).temp == 1.0
+    assert timeline.nearest(datetime(2025, 1, 1, 9, 40)).temp == 2.0
+    assert timeline.nearest(datetime(2025, 1, 2)).temp == 3.0
+    assert OutdoorTimeline().nearest(datetime(2025, 1, 1)) is None
+
+
+def test_cached_source_respects_ttl():
+    """Positive: the provider is only refetched once the TTL has expired."""
+    calls = []
+
+    class CountingProvider(OutdoorDataProvider):
+        def fetch(self):
+            calls.append(1)
+            return [make_condition(8, 1.0)]
+
+    now = [0.0]
+    source = CachedOutdoorSource(CountingProvider(), ttl=60, clock=lambda: now[0])
+    source.timeline()
+    now[0] = 59
+    source.timeline()
+    assert len(calls) == 1
+    now[0] = 60
+    source.timeline()
+    assert len(calls) == 2
+
+
+def test_file_provider_reads_json(tmp_path):
+    """Positive: local JSON file is parsed into conditions."""
+    path = tmp_path / 'outdoor.json'
+    ts = datetime(2025, 1, 1, 8)
+    path.write_text(json.dumps([
+        {'timestamp': (ts + timedelta(hours=1)).isoformat(), 'temp': 4.5, 'humidity': 70, 'code': 'Rain'},
+        {'timestamp': ts.isoformat(), 'temp': 3.5, 'humidity': 72, 'code': 'Fog'},
+    ]))
+    timeline = OutdoorTimeline(FileOutdoorProvider(str(path)).fetch())
+    assert [c.code for c in timeline] == ['Fog', 'Rain']
+
+
+def test_file_provider_missing_file(tmp_path):
+    """Negative: a missing file yields no data instead of an error."""
+    assert FileOutdoorProvider(str(tmp_path / 'nope.json')).fetch() == []
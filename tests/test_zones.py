@@ -0,0 +1,130 @@
+# tests/test_zones.py
+import sys
+import threading
+
+from app import db
+from app.models import Feedback, Sensor, Student
+from app.zones import ZoneHierarchy, get_zone_hierarchy, parse_location
+from app.analysis import suggest_zone_adjustments, suggest_thermostat_adjustments
+
+
+def make_sensor(sensor_id, location, **kwargs):
+    sensor = Sensor(name=f'S{sensor_id}', location=location, status='online', **kwargs)
+    sensor.id = sensor_id
+    return sensor
+
+
+def test_parse_location():
+    """Positive: building, floor and room are derived from the location string."""
+    assert parse_location('Building 1 - Room 101') == ('Building 1', '1', 'Room 101')
+    assert parse_location('Lab 42') == ('Lab 42', '0', 'Lab 42')
+
+
+def test_rollups_are_incremental():
+    """Positive: two sensors in one room both count and updates replace old values."""
+    sensors = [
+        make_sensor(1, 'Building 1 - Room 101'),
+        make_sensor(2, 'Building 1 - Room 101'),
+        make_sensor(3, 'Building 1 - Room 205', heating_zone='East Wing'),
+    ]
+    zones = ZoneHierarchy.build(sensors, [(1, 'hot', 2), (3, 'cold', 1)])
+    zones.record_temperatures({1: 20.0, 2: 22.0, 3: 18.0})
+    room = zones.buildings['Building 1'].children['1'].children['Room 101']
+    assert room.rollup.avg_temp == 21.0
+    assert zones.buildings['Building 1'].rollup.temp_count == 3
+
+    zones.record_temperature(2, 26.0)
+    assert room.rollup.avg_temp == 23.0
+    zones.remove_sensor(1)
+    assert room.rollup.avg_temp == 26.0
+    assert set(zones.heating_zones) == {'Building 1 / Floor 1', 'East Wing'}
+    assert zones.heating_zones['East Wing'].rollup.cold == 1
+
+
+def test_removed_sensor_takes_its_feedback_along():
+    """Negative: a removed sensor's ratings leave every rollup; a moved one keeps them."""
+    sensors = [make_sensor(1, 'Building 1 - Room 101'), make_sensor(2, 'Building 1 - Room 101')]
+    zones = ZoneHierarchy.build(sensors, [(1, 'hot', 2), (2, 'hot', 1), (2, 'cold', 1)])
+    zones.record_feedback(1, 'ok')
+    building = zones.buildings['Building 1']
+    zone = zones.heating_zones['Building 1 / Floor 1']
+    assert (building.rollup.hot, building.rollup.ok, building.rollup.cold) == (3, 1, 1)
+
+    zones.remove_sensor(1)
+    for rollup in (building.rollup, building.children['1'].rollup, zone.rollup):
+        assert (rollup.hot, rollup.ok, rollup.cold) == (1, 0, 1)
+
+    zones.add_sensor(make_sensor(2, 'Building 2 - Room 301'))
+    assert building.rollup.feedback_total == 0
+    assert zones.buildings['Building 2'].rollup.feedback_total == 2
+    assert zones.heating_zones['Building 2 / Floor 3'].rollup.cold == 1
+
+
+def test_concurrent_updates_and_reads_stay_consistent():
+    """Negative: sensors added and removed while another thread reads never break the rollups."""
+    zones = ZoneHierarchy.build([make_sensor(1, 'Building 1 - Room 101')])
+    done = threading.Event()
+    errors = []
+
+    def churn():
+        sid = 2
+        while not done.is_set():
+            zones.add_sensor(make_sensor(sid, f'Building 1 - Room {100 + sid % 50}', heating_zone=f'Zone {sid}'))
+            zones.record_feedback(sid, 'hot')
+            zones.remove_sensor(sid)
+            sid += 1
+
+    thread = threading.Thread(target=churn)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    thread.start()
+    try:
+        for _ in range(300):
+            zones.record_temperatures({1: 21.0})
+            try:
+                zones.zone_rollups()
+            except RuntimeError as exc:
+                errors.append(exc)
+                break
+    finally:
+        done.set()
+        thread.join()
+        sys.setswitchinterval(interval)
+    assert errors == []
+    assert zones.buildings['Building 1'].rollup.hot == 0
+    assert all(rollup.hot == 0 for _, _, rollup in zones.zone_rollups())
+
+
+def test_hierarchy_is_rebuilt_after_ttl(app):
+    """Positive: feedback written by another worker reaches the rollups once the hierarchy expires."""
+    with app.app_context():
+        zones = get_zone_hierarchy()
+        before = zones.buildings['Building 1'].rollup.hot
+        student = db.session.scalar(db.select(Student).limit(1))
+        db.session.add(Feedback(user_id=student.id, sensor_id=1, rating='hot'))
+        db.session.commit()
+        assert get_zone_hierarchy() is zones
+
+        app.config['ZONE_HIERARCHY_TTL'] = 0
+        rebuilt = get_zone_hierarchy()
+        assert rebuilt is not zones
+        assert rebuilt.buildings['Building 1'].rollup.hot == before + 1
+
+
+def test_zone_suggestions():
+    """Positive: one suggestion per heating zone from the rollups."""
+    sensors = [make_sensor(1, 'Building 1 - Room 101'), make_sensor(2, 'Building 2 - Room 101')]
+    zones = ZoneHierarchy.build(sensors)
+    zones.record_temperatures({1: 26.0, 2: 21.0})
+    suggestions = suggest_zone_adjustments(zones)
+    assert 'lowering' in suggestions['Building 1 / Floor 1']
+    assert 'within' in suggestions['Building 2 / Floor 1']
+
+
+def test_sensor_suggestions_keyed_by_id(app):
+    """Negative: sensors sharing a location no longer overwrite each other."""
+    sensors = [make_sensor(1, 'Room 1'), make_sensor(2, 'Room 1')]
+    with app.app_context():
+        suggestions = suggest_thermostat_adjustments(sensors, {1: 26.0, 2: 18.0})
+    assert suggestions[1].action == 'lower'
+    assert suggestions[2].action == 'raise'